@@ -0,0 +1,249 @@
+extends SceneTree
+## GodotWorker - Persistent headless job server for godot_worker.py
+##
+## Launched once per session as
+##   godot --headless --path <project> -s res://addons/godot_worker/godot_worker.gd -- --port N
+## it connects back to the Python pool on 127.0.0.1:N and runs jobs sent as one
+## JSON object per line: {"id": 1, "op": "run_tests", ...}. Every job answers
+## with zero or more {"id", "event": ...} frames and exactly one
+## {"id", "event": "result", "ok": ...} frame, so engine startup and project
+## load are paid once instead of once per command.
+##
+## Ops: ping, run_tests {dirs, tests, junit, results}, check_scene {path},
+## reload {paths}, quit. A {"op": "cancel", "job": id} frame is handled as
+## soon as it arrives and winds down that job's GUT suite.
+
+const HOST: String = "127.0.0.1"
+
+## Idle workers poll the socket; no need to spin a core doing it
+const MAX_FPS: int = 120
+
+## GUT has no stop call; a test and inner-class filter nothing matches makes
+## it skip everything after the current test
+const CANCEL_FILTER: String = "__godot_worker_cancelled__"
+
+## Directories never scanned for edited scripts
+const SKIP_DIRS: PackedStringArray = [".godot", ".git", "addons"]
+
+var _peer: StreamPeerTCP = StreamPeerTCP.new()
+var _pending: PackedByteArray = PackedByteArray()
+var _jobs: Array[Dictionary] = []
+var _busy: bool = false
+var _current_test: String = ""
+var _gut: GutMain = null
+var _gut_job: int = 0
+var _cancelled: bool = false
+## Cancels that arrived before their job started
+var _cancel_ids: Dictionary = {}
+var _script_mtimes: Dictionary = {}
+
+
+func _initialize() -> void:
+	Engine.max_fps = MAX_FPS
+	var args := OS.get_cmdline_user_args()
+	var at := args.find("--port")
+	var port := args[at + 1].to_int() if at != -1 and at + 1 < args.size() else 0
+	if port <= 0 or _peer.connect_to_host(HOST, port) != OK:
+		printerr("godot_worker: no pool to connect to (pass -- --port N)")
+		quit(1)
+		return
+	_refresh_scripts()
+
+
+func _process(_delta: float) -> bool:
+	_peer.poll()
+	var status := _peer.get_status()
+	if status == StreamPeerTCP.STATUS_CONNECTING:
+		return false
+	if status != StreamPeerTCP.STATUS_CONNECTED:
+		# The pool went away; nobody is left to serve
+		return true
+	_read_jobs()
+	if not _busy and not _jobs.is_empty():
+		_run(_jobs.pop_front())
+	return false
+
+
+# --- Protocol ---
+
+func _read_jobs() -> void:
+	var available := _peer.get_available_bytes()
+	if available <= 0:
+		return
+	var received: Array = _peer.get_data(available)
+	if received[0] != OK:
+		return
+	_pending.append_array(received[1])
+	var newline := _pending.find(10)
+	while newline != -1:
+		var line := _pending.slice(0, newline).get_string_from_utf8()
+		_pending = _pending.slice(newline + 1)
+		var job: Variant = JSON.parse_string(line)
+		if job is Dictionary and job.get("op") == "cancel":
+			_cancel_job(int(job.get("job", 0)))
+		elif job is Dictionary:
+			_jobs.append(job)
+		else:
+			_send({"id": -1, "event": "result", "ok": false, "error": "malformed job: " + line})
+		newline = _pending.find(10)
+
+
+func _send(frame: Dictionary) -> void:
+	_peer.put_data((JSON.stringify(frame) + "\n").to_utf8_buffer())
+
+
+func _run(job: Dictionary) -> void:
+	_busy = true
+	var id: int = int(job.get("id", -1))
+	var started := Time.get_ticks_usec()
+	var reloaded := _refresh_scripts()
+	if not reloaded.is_empty():
+		_send({"id": id, "event": "reloaded", "paths": reloaded})
+
+	var result: Dictionary
+	match str(job.get("op", "")):
+		"ping":
+			result = {"ok": true, "version": Engine.get_version_info().string}
+		"check_scene":
+			result = _check_scene(str(job.get("path", "")))
+		"reload":
+			result = _reload(job.get("paths", []))
+		"run_tests":
+			result = await _run_tests(id, job)
+		"quit":
+			_send({"id": id, "event": "result", "ok": true})
+			quit(0)
+			return
+		var op:
+			result = {"ok": false, "error": "unknown op: " + str(op)}
+
+	result["id"] = id
+	result["event"] = "result"
+	result["seconds"] = (Time.get_ticks_usec() - started) / 1000000.0
+	_send(result)
+	_busy = false
+
+
+# --- Jobs ---
+
+func _check_scene(path: String) -> Dictionary:
+	if not ResourceLoader.exists(path):
+		return {"ok": false, "path": path, "error": "not found"}
+	# Deep replace so an edited scene or any of its scripts is read from disk again
+	var scene := ResourceLoader.load(path, "PackedScene", ResourceLoader.CACHE_MODE_REPLACE_DEEP) as PackedScene
+	if scene == null:
+		return {"ok": false, "path": path, "error": "failed to load"}
+	var instance := scene.instantiate()
+	if instance == null:
+		return {"ok": false, "path": path, "error": "failed to instantiate"}
+	var nodes := _count_nodes(instance)
+	instance.free()
+	return {"ok": true, "path": path, "nodes": nodes}
+
+
+func _count_nodes(node: Node) -> int:
+	var total := 1
+	for child in node.get_children():
+		total += _count_nodes(child)
+	return total
+
+
+## Drop cached copies of resources re-imported by another process
+func _reload(paths: Array) -> Dictionary:
+	var failed: Array[String] = []
+	for path: String in paths:
+		if ResourceLoader.load(path, "", ResourceLoader.CACHE_MODE_REPLACE) == null:
+			failed.append(path)
+	return {"ok": failed.is_empty(), "reloaded": paths.size() - failed.size(), "failed": failed}
+
+
+func _run_tests(id: int, job: Dictionary) -> Dictionary:
+	var config: Object = load("res://addons/gut/gut_config.gd").new()
+	config.load_options(config.options.config_file)
+	config.options.should_exit = false
+	config.options.include_subdirs = true
+	if job.has("dirs") or job.has("tests"):
+		config.options.dirs = job.get("dirs", [])
+		config.options.tests = job.get("tests", [])
+	if config.options.dirs.is_empty() and config.options.tests.is_empty():
+		config.options.dirs = ["res://tests"]
+
+	# A fresh GutMain per job; GUT keeps per-run state on the instance
+	var gut := GutMain.new()
+	gut.ignore_pause_before_teardown = true
+	get_root().add_child(gut)
+	config.apply_options(gut)
+	var script_started := [0, ""]
+	gut.start_script.connect(func(script: Variant) -> void:
+		script_started[0] = Time.get_ticks_usec()
+		script_started[1] = str(script.path)
+		_send({"id": id, "event": "script", "path": script_started[1]}))
+	gut.end_script.connect(func() -> void:
+		_send({"id": id, "event": "script_done", "path": script_started[1],
+			"seconds": (Time.get_ticks_usec() - script_started[0]) / 1000000.0}))
+	gut.start_test.connect(func(test_name: String) -> void:
+		_current_test = test_name)
+	gut.end_test.connect(func() -> void:
+		_send({"id": id, "event": "test", "name": _current_test,
+			"passed": gut.get_pass_count(), "failed": gut.get_fail_count()}))
+
+	_gut = gut
+	_gut_job = id
+	_cancelled = false
+	if _cancel_ids.has(id):
+		_cancel_tests()
+	# Jobs run one at a time, so any other pending cancel is for a finished job
+	_cancel_ids.clear()
+	GutErrorTracker.register_logger(gut.error_tracker)
+	gut.test_scripts(true)
+	await gut.end_run
+	GutErrorTracker.deregister_logger(gut.error_tracker)
+	_gut = null
+
+	var totals: Dictionary = gut.get_summary().get_totals()
+	var result := {"ok": totals.failing == 0 and totals.errors == 0, "totals": totals,
+		"cancelled": _cancelled}
+	if job.get("junit", false):
+		result["junit"] = GutUtils.JunitXmlExport.new().get_results_xml(gut)
+	if job.get("results", false):
+		result["results"] = GutUtils.ResultExporter.new().get_results_dictionary(gut)
+	gut.queue_free()
+	return result
+
+
+func _cancel_job(id: int) -> void:
+	if _gut != null and _gut_job == id:
+		_cancel_tests()
+	else:
+		_cancel_ids[id] = true
+
+
+func _cancel_tests() -> void:
+	_cancelled = true
+	_gut.unit_test_name = CANCEL_FILTER
+	_gut.inner_class_name = CANCEL_FILTER
+
+
+# --- Script freshness ---
+
+## Reload scripts edited since the previous job so a long-lived worker never
+## runs stale code. Returns the reloaded paths.
+func _refresh_scripts(dir: String = "res://") -> PackedStringArray:
+	var reloaded := PackedStringArray()
+	for file in DirAccess.get_files_at(dir):
+		if file.get_extension() != "gd":
+			continue
+		var path := dir.path_join(file)
+		var modified := FileAccess.get_modified_time(path)
+		var seen: Variant = _script_mtimes.get(path)
+		_script_mtimes[path] = modified
+		if seen == null or seen == modified or not ResourceLoader.has_cached(path):
+			continue
+		var script := load(path) as GDScript
+		script.source_code = FileAccess.get_file_as_string(path)
+		if script.reload(true) == OK:
+			reloaded.append(path)
+	for sub in DirAccess.get_directories_at(dir):
+		if not sub.begins_with(".") and not sub in SKIP_DIRS:
+			reloaded.append_array(_refresh_scripts(dir.path_join(sub)))
+	return reloaded
@@ -2,12 +2,20 @@
 # -*- coding: utf-8 -*-
 """
 Project Analyzer - Uses local Ollama to analyze the Godot project structure and code.
+
+The report is written to disk while the reply streams in. Completed sections
+(the map notes of a chunked run) are kept in a sidecar state file, so an
+interrupted run picks up from the last completed section when re-run with
+the same project summary, model and options.
 """
 
 import sys
 import os
 import json
-from pathlib import Path
+import time
+import asyncio
+import hashlib
+import argparse
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
@@ -17,14 +25,229 @@ if sys.platform == 'win32':
 # Import our tools
 try:
     from godot_ai_connector import GodotProjectAnalyzer
-    from ollama_client import OllamaClient
+    from ollama_client import OllamaClient, AsyncOllamaClient
+    from ollama_cache import ResponseCache, CACHE_FILE
+    from project_summarizer import ProjectSummarizer, DEFAULT_BUDGET, estimate_tokens
 except ImportError:
-    print("Error: Could not import required modules. Make sure 'godot_ai_connector.py' and 'ollama_client.py' are in the same directory.")
+    print("Error: Could not import required modules. Make sure 'godot_ai_connector.py', 'ollama_client.py' and 'project_summarizer.py' are in the same directory.")
     sys.exit(1)
 
+SYSTEM_PROMPT = """You are a senior Godot Game Developer and Software Architect. 
+Your task is to analyze the provided Godot project structure and metadata.
+Provide a comprehensive assessment including:
+1. **Architecture Review**: Evaluate the organization of scenes and scripts.
+2. **Code Quality**: Identify potential improvements based on script names and structure.
+3. **Recommendations**: Suggest best practices or missing components for a game of this type.
+4. **Next Steps**: Propose logical next steps for development.
+
+Be concise, professional, and actionable."""
+
+MAP_PROMPT = """You are a senior Godot Game Developer reviewing one part of a larger project.
+The JSON uses minified keys explained in its "legend". Reply with at most 15 terse bullet
+points covering architecture observations, code-quality issues and risks in THIS part only.
+No introduction, no summary."""
+
+REPORT_FILE = "project_analysis_report.md"
+STATE_FILE = REPORT_FILE + ".state.json"
+
+QUESTION_PROMPT = """You are a senior Godot Game Developer answering a question about a project.
+You get the project overview (minified JSON, keys explained in "legend") and the GDScript
+functions most relevant to the question, each headed by its path and line. Base the answer
+on that code, cite paths and line numbers, and say so when the excerpts are not enough."""
+
+
+class RunState:
+    """
+    Sidecar file of completed sections. It belongs to one set of inputs
+    (the fingerprint); a run with different inputs starts over.
+    """
+    
+    def __init__(self, path, fingerprint):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.sections = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            if data.get('fingerprint') == fingerprint:
+                self.sections = data.get('sections', {})
+    
+    def get(self, section):
+        return self.sections.get(section)
+    
+    def save(self, section, text):
+        self.sections[section] = text
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"fingerprint": self.fingerprint, "sections": self.sections}, f)
+        os.replace(tmp, self.path)  # Never leave a half-written state file behind
+    
+    def finish(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ReportWriter:
+    """Streams the report to disk: header first, then the reply chunk by chunk"""
+    
+    def __init__(self, path, model, question=None):
+        self.path = path
+        self.model = model
+        self.question = question
+        self.file = None
+        self.complete = False
+    
+    def __enter__(self):
+        self.file = open(self.path, "w", encoding="utf-8")
+        self.file.write(f"# Project Analysis Report\n\nDate: {os.path.basename(os.getcwd())}\nModel: {self.model}\n\n")
+        if self.question:
+            self.file.write(f"Question: {self.question}\n\n")
+        self.file.flush()
+        return self
+    
+    def write(self, text):
+        self.file.write(text)
+        self.file.flush()
+    
+    def finish(self, stats):
+        self.file.write(f"\n\n## Run Statistics\n\n```\n{_format_stats(stats)}\n```\n")
+        self.complete = True
+    
+    def __exit__(self, *exc):
+        if not self.complete:
+            self.file.write("\n\n_(Interrupted before the reply finished; re-run to resume.)_\n")
+        self.file.close()
+
+
+def _fingerprint(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _record(stats, stage, messages, stream, start):
+    """Append one stats row; stream is the OllamaStream/AsyncStream (None if the request failed)"""
+    final = stream.final if stream else {}
+    stats.append({
+        "stage": stage,
+        "prompt_chars": sum(len(m['content']) for m in messages),
+        "prompt_tokens_est": estimate_tokens(''.join(m['content'] for m in messages)),
+        "prompt_tokens": final.get('prompt_eval_count'),
+        "output_tokens": final.get('eval_count'),
+        "first_token_s": stream.ttft if stream else None,
+        "tokens_per_s": stream.tokens_per_second if stream else None,
+        "seconds": time.perf_counter() - start,
+        "cached": bool(final.get('cached')),
+    })
+
+
+def _chat(client, messages, model, num_ctx, stats, stage, echo=False, sink=None):
+    """
+    Run one chat request, recording prompt size and latency; returns the reply
+    text. Each piece of the reply also goes to sink (e.g. ReportWriter.write).
+    """
+    start = time.perf_counter()
+    reply = []
+    
+    stream = client.chat(messages, model=model, stream=True, options={"num_ctx": num_ctx})
+    for chunk in stream or []:
+        if 'message' in chunk and 'content' in chunk['message']:
+            content = chunk['message']['content']
+            if echo:
+                print(content, end='', flush=True)
+            if sink:
+                sink(content)
+            reply.append(content)
+    
+    if not stream or not stream.final:
+        # Keep a failed section out of the run state so a re-run retries it
+        raise RuntimeError(f"{stage}: no complete reply from Ollama")
+    _record(stats, stage, messages, stream, start)
+    return ''.join(reply)
+
+
+async def _map_parallel(pending, total, model, num_ctx, stats, parallel, state, cache=None):
+    """
+    Map stage with up to `parallel` requests in flight (Ollama needs
+    OLLAMA_NUM_PARALLEL >= parallel). Each note is saved to the run state as
+    soon as it completes.
+    """
+    async with AsyncOllamaClient(concurrency=parallel, cache=cache) as client:
+        async def review(item):
+            i, chunk = item
+            messages = [{"role": "system", "content": MAP_PROMPT}, {"role": "user", "content": chunk}]
+            start = time.perf_counter()
+            reply = []
+            async with client.stream_chat(messages, model=model, options={"num_ctx": num_ctx}) as stream:
+                async for frame in stream:
+                    reply.append(frame.get('message', {}).get('content') or '')
+            _record(stats, f"map {i}", messages, stream, start)
+            state.save(f"map {i}", ''.join(reply))
+            print(f"[-] Map {i}/{total} done in {time.perf_counter() - start:.1f}s")
+
+        await client.map(review, pending)
+    stats.sort(key=lambda s: int(s['stage'].split()[1]))
+
+
+def _retrieve(analyzer, client, question, header, budget, top_k, embed_model):
+    """Code excerpts most relevant to the question, as much as fits the budget after the header"""
+    from semantic_index import SemanticIndex
+
+    index = SemanticIndex(analyzer.project_root, client, embed_model)
+    index.build(analyzer.function_sources())
+    room = budget - estimate_tokens(header) - estimate_tokens(question) - 200
+    excerpts = []
+    for score, entry in index.search(question, top_k):
+        excerpt = f"### {entry['path']}:{entry['line']} ({entry['function']}, score {score:.2f})\n" \
+                  f"```gdscript\n{index.chunk_source(entry)}\n```"
+        cost = estimate_tokens(excerpt)
+        if cost > room:
+            continue    # Smaller, lower-ranked excerpts may still fit
+        excerpts.append(excerpt)
+        room -= cost
+    print(f"[-] Retrieved {len(excerpts)} relevant function(s) for the question")
+    return "\n\n".join(excerpts)
+
+
+def _format_stats(stats) -> str:
+    def cell(value, fmt):
+        return '-' if value is None else format(value, fmt)
+    
+    lines = [f"{'Stage':<10} {'Prompt chars':>12} {'Est. tok':>9} {'Prompt tok':>10} "
+             f"{'Out tok':>8} {'TTFT s':>7} {'Tok/s':>7} {'Total s':>8}  Cache"]
+    for s in stats:
+        lines.append(f"{s['stage']:<10} {s['prompt_chars']:>12,} {s['prompt_tokens_est']:>9,} "
+                     f"{cell(s['prompt_tokens'], ','):>10} {cell(s['output_tokens'], ','):>8} "
+                     f"{cell(s['first_token_s'], '.2f'):>7} {cell(s['tokens_per_s'], '.1f'):>7} "
+                     f"{s['seconds']:>8.2f}  {'hit' if s.get('cached') else '-'}")
+    lines.append(f"{'total':<10} {sum(s['prompt_chars'] for s in stats):>12,} "
+                 f"{sum(s['prompt_tokens_est'] for s in stats):>9,} {'':>10} {'':>8} {'':>7} {'':>7} "
+                 f"{sum(s['seconds'] for s in stats):>8.2f}")
+    return "\n".join(lines)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Analyze the Godot project with a local Ollama model")
+    parser.add_argument("--model", "-m", default="qwen2.5-coder:32b", help="Ollama model (default: qwen2.5-coder:32b)")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                        help=f"Token budget per prompt; larger summaries are chunked (default: {DEFAULT_BUDGET})")
+    parser.add_argument("--num-ctx", type=int, default=8192, help="Context window requested from Ollama")
+    parser.add_argument("--include-vendor", action="store_true", help="List addon scripts individually")
+    parser.add_argument("--parallel", type=int, default=1,
+                        help="Chunks reviewed concurrently in the map stage (default: 1)")
+    parser.add_argument("--cache", metavar="FILE", nargs="?", const=CACHE_FILE,
+                        help=f"Reuse responses when the prompt is unchanged (default file: {CACHE_FILE})")
+    parser.add_argument("--question", "-q",
+                        help="Answer a question using only the most relevant functions (semantic retrieval)")
+    parser.add_argument("--top-k", type=int, default=12, help="Functions retrieved for --question (default: 12)")
+    parser.add_argument("--embed-model", default="nomic-embed-text",
+                        help="Ollama embedding model for --question (default: nomic-embed-text)")
+    parser.add_argument("--dry-run", action="store_true", help="Report prompt sizes without calling Ollama")
+    args = parser.parse_args()
+    
     # Configuration
-    model = "qwen2.5-coder:32b"  # Best model found locally
+    model = args.model
     project_root = os.getcwd()
     
     print(f"[*] Starting Project Analysis using {model}...")
@@ -35,61 +258,95 @@ def main():
         analyzer = GodotProjectAnalyzer(project_root)
         analysis_data = analyzer.analyze()
         
-        # Simplify data for LLM context window if needed
-        # For now, we'll send the summary which is relatively compact
-        project_summary = json.dumps(analysis_data, indent=2)
+        # Compact and, if needed, chunk the summary to fit the context budget
+        summarizer = ProjectSummarizer(analysis_data, args.budget, args.include_vendor)
+        chunks = summarizer.chunks()
+        size = summarizer.stats()
         
     except Exception as e:
         print(f"[!] Analysis failed: {e}")
         sys.exit(1)
 
-    # 2. Construct Prompt
-    print("[-] Preparing prompt for Ollama...")
+    print(f"[-] Summary: {size['original_chars']:,} chars -> {size['compact_chars']:,} chars "
+          f"(~{size['compact_tokens']:,} tokens) in {len(chunks)} chunk(s) of <= {args.budget} tokens")
+    if args.dry_run:
+        return
+
+    # 2. Query Ollama (map over chunks first when the summary did not fit)
+    cache = ResponseCache(args.cache) if args.cache else None
+    client = OllamaClient(cache=cache)
+    stats = []
     
-    system_prompt = """You are a senior Godot Game Developer and Software Architect. 
-Your task is to analyze the provided Godot project structure and metadata.
-Provide a comprehensive assessment including:
-1. **Architecture Review**: Evaluate the organization of scenes and scripts.
-2. **Code Quality**: Identify potential improvements based on script names and structure.
-3. **Recommendations**: Suggest best practices or missing components for a game of this type.
-4. **Next Steps**: Propose logical next steps for development.
+    try:
+        if args.question:
+            excerpts = _retrieve(analyzer, client, args.question, summarizer.header_text(),
+                                 args.budget, args.top_k, args.embed_model)
+            system_prompt, stage = QUESTION_PROMPT, "question"
+            user_prompt = f"""Project overview:
 
-Be concise, professional, and actionable."""
+{summarizer.header_text()}
 
-    user_prompt = f"""Here is the JSON summary of my Godot project:
+Relevant code:
 
-{project_summary}
+{excerpts}
+
+Question: {args.question}"""
+        elif len(chunks) == 1:
+            user_prompt = f"""Here is the JSON summary of my Godot project (keys explained in "legend"):
+
+{chunks[0]}
 
 Please analyze this project."""
+        else:
+            state = RunState(STATE_FILE, _fingerprint(model, args.num_ctx, MAP_PROMPT, chunks))
+            pending = [(i, c) for i, c in enumerate(chunks, 1) if state.get(f"map {i}") is None]
+            if len(pending) < len(chunks):
+                print(f"[-] Resuming: {len(chunks) - len(pending)}/{len(chunks)} map section(s) "
+                      f"already done in {STATE_FILE}")
+            if args.parallel > 1 and pending:
+                print(f"[-] Mapping {len(pending)} chunks, {args.parallel} at a time...")
+                asyncio.run(_map_parallel(pending, len(chunks), model, args.num_ctx, stats,
+                                          args.parallel, state, cache))
+            else:
+                for i, chunk in pending:
+                    print(f"[-] Map {i}/{len(chunks)}: analyzing {len(chunk):,} chars...")
+                    state.save(f"map {i}", _chat(client, [{"role": "system", "content": MAP_PROMPT},
+                                                          {"role": "user", "content": chunk}],
+                                                 model, args.num_ctx, stats, f"map {i}"))
+            notes = [state.get(f"map {i}") for i in range(1, len(chunks) + 1)]
+            merged = "\n\n".join(f"### Part {i}\n{n.strip()}" for i, n in enumerate(notes, 1))
+            user_prompt = f"""Here is the overview of my Godot project (keys explained in "legend"):
 
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": user_prompt}
-    ]
+{summarizer.header_text()}
 
-    # 3. Query Ollama
-    print(f"[-] Sending request to Ollama (Model: {model})...")
-    print("\n" + "="*80 + "\n")
-    
-    client = OllamaClient()
-    
-    try:
-        # Stream the response
-        full_response = ""
-        for chunk in client.chat(messages, model=model, stream=True):
-            if 'message' in chunk and 'content' in chunk['message']:
-                content = chunk['message']['content']
-                print(content, end='', flush=True)
-                full_response += content
-        
-        print("\n\n" + "="*80 + "\n")
-        print("[*] Analysis Complete.")
-        
-        # Optional: Save report
-        with open("project_analysis_report.md", "w", encoding="utf-8") as f:
-            f.write(f"# Project Analysis Report\n\nDate: {os.path.basename(os.getcwd())}\nModel: {model}\n\n")
-            f.write(full_response)
-        print("[-] Report saved to 'project_analysis_report.md'")
+The project was too large for one request, so each part was reviewed separately. Notes per part:
+
+{merged}
+
+Please merge these into one analysis of the whole project."""
+
+        if not args.question:
+            system_prompt, stage = SYSTEM_PROMPT, "reduce" if len(chunks) > 1 else "analyze"
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+        print(f"[-] Sending request to Ollama (Model: {model})...")
+        print("\n" + "="*80 + "\n")
+        with ReportWriter(REPORT_FILE, model, args.question) as report:
+            _chat(client, messages, model, args.num_ctx, stats, stage, echo=True, sink=report.write)
+            
+            print("\n\n" + "="*80 + "\n")
+            print("[*] Analysis Complete.")
+            print(_format_stats(stats))
+            if cache:
+                hits = sum(1 for s in stats if s['cached'])
+                print(f"[-] Cache: {hits}/{len(stats)} request(s) served from {args.cache}")
+            report.finish(stats)
+        if len(chunks) > 1 and not args.question:
+            state.finish()
+        print(f"[-] Report saved to '{REPORT_FILE}'")
 
     except KeyboardInterrupt:
         print("\n[!] Analysis aborted by user.")
@@ -3,28 +3,19 @@
 
 from PIL import Image
 
+from transparency_engine import load_rgba, store_rgba, key_black
+
 def black_to_transparent(input_path, output_path):
     """Convert black pixels to transparent"""
     print(f"Converting: {input_path}")
     
     img = Image.open(input_path).convert('RGBA')
-    pixels = img.load()
-    width, height = img.size
+    rgba = load_rgba(img)
     
     # Convert black (and near-black) to transparent
     threshold = 30  # Pixels darker than this become transparent
-    transparent_count = 0
-    
-    for y in range(height):
-        for x in range(width):
-            r, g, b, a = pixels[x, y]
-            
-            # If pixel is very dark (near black), make transparent
-            if r < threshold and g < threshold and b < threshold:
-                pixels[x, y] = (0, 0, 0, 0)
-                transparent_count += 1
-            else:
-                pixels[x, y] = (r, g, b, 255)
+    transparent_count = key_black(rgba, threshold)
+    store_rgba(img, rgba)
     
     img.save(output_path)
     print(f"  [OK] {transparent_count} pixels made transparent")
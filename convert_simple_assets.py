@@ -3,26 +3,18 @@
 
 from PIL import Image
 
+from transparency_engine import load_rgba, store_rgba, key_black
+
 def black_to_transparent(input_path, output_path):
     """Convert black pixels to transparent"""
     print(f"Converting: {input_path}")
     
     img = Image.open(input_path).convert('RGBA')
-    pixels = img.load()
-    width, height = img.size
+    rgba = load_rgba(img)
     
     threshold = 30
-    transparent_count = 0
-    
-    for y in range(height):
-        for x in range(width):
-            r, g, b, a = pixels[x, y]
-            
-            if r < threshold and g < threshold and b < threshold:
-                pixels[x, y] = (0, 0, 0, 0)
-                transparent_count += 1
-            else:
-                pixels[x, y] = (r, g, b, 255)
+    key_black(rgba, threshold)
+    store_rgba(img, rgba)
     
     img.save(output_path)
     print(f"  [OK] Saved to: {output_path}")
@@ -2,101 +2,237 @@
 """
 Fix Godot Image Imports - Validates and fixes image import issues
 This script checks PNG files and regenerates proper import settings for Godot 4.x
+
+PNGs are validated from their bytes alone: signature, IHDR fields, the CRC
+of every chunk and a closing IEND. Large files are memory-mapped, files are
+checked on a thread pool, and only images whose color mode has to change
+are decoded (with Pillow) and rewritten. Results are collected into one
+summary (--json FILE for a machine-readable report).
 """
 
+import json
+import mmap
 import os
+import struct
 import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from PIL import Image
+from typing import Any, Dict, List, Optional
 import hashlib
 
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Files at least this big are memory-mapped instead of read into memory
+MMAP_THRESHOLD = 4 * 1024 * 1024
+
+# Color modes Godot imports as-is; anything else is converted to RGBA
+SUPPORTED_MODES = ('RGB', 'RGBA', 'P', 'L')
+
+
+class PngError(ValueError):
+    """The bytes are not a well-formed PNG"""
+
+
+@dataclass
+class PngHeader:
+    width: int
+    height: int
+    bit_depth: int
+    color_type: int
+    interlaced: bool
+    mode: str               # Pillow's name for the color type / depth
+
+
+def _png_mode(color_type: int, bit_depth: int) -> str:
+    if color_type == 0:
+        return {1: '1', 16: 'I;16'}.get(bit_depth, 'L')
+    modes = {2: 'RGB', 3: 'P', 4: 'LA', 6: 'RGBA'}
+    if color_type not in modes:
+        raise PngError(f"invalid color type {color_type}")
+    return modes[color_type]
+
+
+def parse_png(data) -> PngHeader:
+    """Validate PNG bytes chunk by chunk (lengths, CRCs, IHDR first, IDAT, IEND) without decoding"""
+    buf = memoryview(data)
+    try:
+        if len(buf) < len(PNG_SIGNATURE) or buf[:len(PNG_SIGNATURE)] != PNG_SIGNATURE:
+            raise PngError("not a PNG file (bad signature)")
+        pos = len(PNG_SIGNATURE)
+        header = None
+        has_data = False
+        while True:
+            if pos + 8 > len(buf):
+                raise PngError("truncated: no IEND chunk")
+            length, kind = struct.unpack_from(">I4s", buf, pos)
+            end = pos + 12 + length
+            if end > len(buf):
+                raise PngError(f"truncated {kind.decode('latin-1')} chunk at byte {pos}")
+            (crc,) = struct.unpack_from(">I", buf, end - 4)
+            if zlib.crc32(buf[pos + 4:end - 4]) != crc:
+                raise PngError(f"CRC mismatch in {kind.decode('latin-1')} chunk at byte {pos}")
+            if header is None:
+                if kind != b'IHDR' or length != 13:
+                    raise PngError("first chunk is not a valid IHDR")
+                width, height, depth, color_type, _, _, interlace = struct.unpack_from(">IIBBBBB", buf, pos + 8)
+                if not width or not height:
+                    raise PngError(f"invalid size {width}x{height}")
+                header = PngHeader(width, height, depth, color_type, interlace == 1,
+                                   _png_mode(color_type, depth))
+            elif kind == b'IDAT':
+                has_data = True
+            elif kind == b'IEND':
+                break
+            pos = end
+        if not has_data:
+            raise PngError("no IDAT chunk")
+        return header
+    finally:
+        buf.release()
+
+
+def inspect_png(path: Path) -> PngHeader:
+    """parse_png on a file; big files are memory-mapped rather than read"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            return parse_png(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return parse_png(mapped)
+
 
 class GodotImageFixer:
     """Fixes Godot image import issues"""
     
-    def __init__(self, project_root: str):
+    def __init__(self, project_root: str, skip_unused: bool = False, workers: Optional[int] = None):
         self.project_root = Path(project_root)
         self.assets_dir = self.project_root / "assets"
+        self.skip_unused = skip_unused
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
         self.issues_found = []
         self.fixed_count = 0
+        self.results: List[Dict[str, Any]] = []
         
-    def validate_and_fix(self):
-        """Main validation and fix routine"""
-        print("[*] Godot Image Import Fixer")
-        print(f"[*] Project: {self.project_root}\n")
+    def validate_and_fix(self, verbose: bool = False, quiet: bool = False) -> Dict[str, Any]:
+        """Main validation and fix routine; returns the summary"""
+        start = time.perf_counter()
         
         # Find all PNG files
-        png_files = list(self.assets_dir.rglob("*.png"))
-        print(f"[+] Found {len(png_files)} PNG files\n")
+        png_files = sorted(self.assets_dir.rglob("*.png"))
+        skipped = 0
+        if self.skip_unused:
+            from godot_dependencies import unused_files
+            unused = unused_files(self.project_root, ('.png',))
+            used = [p for p in png_files if p.resolve() not in unused]
+            skipped = len(png_files) - len(used)
+            png_files = used
         
-        for png_file in png_files:
-            self._check_image(png_file)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            self.results = list(pool.map(self._check_image, png_files))
         
-        # Summary
-        print("\n" + "="*60)
+        self.issues_found = [f"{r['path']} - {issue}" for r in self.results for issue in r['issues']]
+        self.fixed_count = sum(r['converted'] + r['import_regenerated'] for r in self.results)
+        summary = self.summary(time.perf_counter() - start, skipped)
+        if not quiet:
+            self._print_summary(summary, verbose)
+        return summary
+    
+    def summary(self, seconds: float = 0.0, skipped: int = 0) -> Dict[str, Any]:
+        """Machine-readable totals; per-file records only for files with issues"""
+        return {
+            "project": str(self.project_root),
+            "files": len(self.results),
+            "skipped_unused": skipped,
+            "valid": sum(r['status'] != "invalid" for r in self.results),
+            "invalid": sum(r['status'] == "invalid" for r in self.results),
+            "converted": sum(r['converted'] for r in self.results),
+            "imports_regenerated": sum(r['import_regenerated'] for r in self.results),
+            "missing_import": sum(r['import'] == "missing" for r in self.results),
+            "seconds": round(seconds, 3),
+            "issues": [r for r in self.results if r['issues']],
+        }
+    
+    def _print_summary(self, summary: Dict[str, Any], verbose: bool):
+        print("[*] Godot Image Import Fixer")
+        print(f"[*] Project: {self.project_root}")
+        skipped = f", {summary['skipped_unused']} unreferenced skipped" if summary['skipped_unused'] else ""
+        print(f"[+] Checked {summary['files']} PNG files in {summary['seconds']:.2f}s "
+              f"({self.workers} threads{skipped})")
+        if verbose:
+            for r in self.results:
+                size = f"{r['width']}x{r['height']}, mode={r['mode']}" if r['mode'] else r['status']
+                print(f"    {r['path']}: {size}")
+        
+        print("="*60)
         if self.issues_found:
             print(f"[!] Found {len(self.issues_found)} issues:")
             for issue in self.issues_found:
                 print(f"    - {issue}")
         else:
             print("[SUCCESS] All images validated successfully!")
+        if summary['missing_import']:
+            print(f"[INFO] {summary['missing_import']} PNGs have no import file yet (Godot creates them)")
         
         if self.fixed_count > 0:
-            print(f"\n[+] Fixed {self.fixed_count} import files")
+            print(f"\n[+] Converted {summary['converted']} images, regenerated {summary['imports_regenerated']} import files")
             print("\n[ACTION REQUIRED] Please:")
             print("  1. Close Godot if it's open")
-            print("  2. Delete the .godot/imported folder")
-            print("  3. Reopen Godot to reimport all assets")
+            print("  2. Run quick_fix_imports.py to reimport the changed assets")
+            print("  3. Reopen Godot")
         
         print("="*60)
     
-    def _check_image(self, png_path: Path):
-        """Check and fix a single image"""
-        rel_path = png_path.relative_to(self.project_root)
+    def _check_image(self, png_path: Path) -> Dict[str, Any]:
+        """Check and fix a single image; runs on a worker thread, so it only returns a record"""
+        rel_path = png_path.relative_to(self.project_root).as_posix()
         import_path = Path(str(png_path) + ".import")
+        record = {"path": rel_path, "status": "ok", "width": None, "height": None, "mode": None,
+                  "converted": False, "import": None, "import_regenerated": False, "issues": []}
         
-        print(f"[*] Checking: {rel_path}")
-        
-        # Check if file exists and is readable
-        if not png_path.exists():
-            self.issues_found.append(f"{rel_path} - File not found")
-            print(f"    [ERROR] File not found!")
-            return
-        
-        # Validate PNG format
+        # Validate PNG structure from the bytes alone
         try:
-            with Image.open(png_path) as img:
-                width, height = img.size
-                mode = img.mode
-                print(f"    [OK] {width}x{height}, mode={mode}")
-                
-                # Check for common issues
-                if mode not in ['RGB', 'RGBA', 'P', 'L']:
-                    self.issues_found.append(f"{rel_path} - Unusual color mode: {mode}")
-                    print(f"    [WARN] Unusual color mode: {mode}")
-                    
-                    # Convert to RGBA
-                    print(f"    [FIX] Converting to RGBA...")
-                    rgba_img = img.convert('RGBA')
-                    rgba_img.save(png_path, 'PNG')
-                    print(f"    [OK] Converted and saved")
-                    self.fixed_count += 1
-                
-        except Exception as e:
-            self.issues_found.append(f"{rel_path} - Invalid PNG: {e}")
-            print(f"    [ERROR] Invalid PNG: {e}")
-            return
+            header = inspect_png(png_path)
+        except FileNotFoundError:
+            record.update(status="invalid", issues=["File not found"])
+            return record
+        except (PngError, OSError) as e:
+            record.update(status="invalid", issues=[f"Invalid PNG: {e}"])
+            return record
+        record.update(width=header.width, height=header.height, mode=header.mode)
+        
+        # Only an unsupported color mode needs a full decode
+        if header.mode not in SUPPORTED_MODES:
+            record['issues'].append(f"Unusual color mode: {header.mode}")
+            try:
+                self._convert_to_rgba(png_path)
+                record.update(status="converted", converted=True, mode="RGBA")
+            except Exception as e:
+                record.update(status="invalid")
+                record['issues'].append(f"Conversion failed: {e}")
+                return record
         
         # Check import file
+        record['import'] = "ok"
         if import_path.exists():
-            with open(import_path, 'r', encoding='utf-8') as f:
-                import_content = f.read()
-                
+            import_content = import_path.read_text(encoding='utf-8')
             if 'valid=false' in import_content:
-                print(f"    [WARN] Import marked as invalid")
+                record['import'] = "invalid"
+                record['issues'].append("Import marked as invalid")
                 self._fix_import_file(png_path, import_path)
+                record['import_regenerated'] = True
         else:
-            print(f"    [INFO] No import file (will be created by Godot)")
+            record['import'] = "missing"
+        return record
+    
+    @staticmethod
+    def _convert_to_rgba(png_path: Path):
+        from PIL import Image
+        with Image.open(png_path) as img:
+            rgba_img = img.convert('RGBA')
+        rgba_img.save(png_path, 'PNG')
     
     def _fix_import_file(self, png_path: Path, import_path: Path):
         """Fix or regenerate import file"""
@@ -150,21 +286,31 @@ detect_3d/compress_to=0
         # Write fixed import file
         with open(import_path, 'w', encoding='utf-8', newline='\n') as f:
             f.write(import_content)
-        
-        print(f"    [FIX] Regenerated import file")
-        self.fixed_count += 1
 
 
 def main():
     """Main entry point"""
-    if len(sys.argv) > 1:
-        project_root = sys.argv[1]
-    else:
-        project_root = os.getcwd()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Validate PNGs and fix their Godot import files")
+    parser.add_argument("project_root", nargs="?", default=os.getcwd(), help="Project root directory")
+    parser.add_argument("--skip-unused", action="store_true",
+                        help="Skip PNGs no scene, resource or script references (see godot_dependencies.py)")
+    parser.add_argument("--workers", type=int, help="Threads checking files (default: CPU count + 4, max 32)")
+    parser.add_argument("--json", metavar="FILE", help="Write the summary as JSON ('-' for stdout)")
+    parser.add_argument("--verbose", action="store_true", help="List every file, not just the ones with issues")
+    args = parser.parse_args()
     
     try:
-        fixer = GodotImageFixer(project_root)
-        fixer.validate_and_fix()
+        fixer = GodotImageFixer(args.project_root, args.skip_unused, args.workers)
+        summary = fixer.validate_and_fix(verbose=args.verbose, quiet=args.json == "-")
+        if args.json == "-":
+            print(json.dumps(summary, indent=2))
+        elif args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2)
+            print(f"[OK] Summary written to {args.json}")
+        sys.exit(1 if summary["invalid"] else 0)
         
     except Exception as e:
         print(f"[ERROR] {e}")
@@ -9,7 +9,7 @@ from pathlib import Path
 from PIL import Image
 
 
-def fix_sprite_transparency(project_root: str):
+def fix_sprite_transparency(project_root: str, skip_unused: bool = False):
     """Convert all sprite sheets to RGBA with proper transparency"""
     project_root = Path(project_root)
     sprites_dir = project_root / "assets" / "sprites"
@@ -18,6 +18,11 @@ def fix_sprite_transparency(project_root: str):
     
     # Find all PNG files
     png_files = list(sprites_dir.rglob("*.png"))
+    if skip_unused:
+        from godot_dependencies import unused_files
+        unused = unused_files(project_root, ('.png',))
+        png_files = [p for p in png_files if p.resolve() not in unused]
+        print(f"   [INFO] Skipping unreferenced sprites, {len(png_files)} left")
     fixed_count = 0
     
     for png_path in png_files:
@@ -65,13 +70,16 @@ def fix_sprite_transparency(project_root: str):
 
 
 def main():
-    if len(sys.argv) > 1:
-        project_root = sys.argv[1]
-    else:
-        project_root = os.getcwd()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Convert sprite sheets to RGBA with transparency")
+    parser.add_argument("project_root", nargs="?", default=os.getcwd(), help="Project root directory")
+    parser.add_argument("--skip-unused", action="store_true",
+                        help="Skip sprites no scene, resource or script references (see godot_dependencies.py)")
+    args = parser.parse_args()
     
     try:
-        fix_sprite_transparency(project_root)
+        fix_sprite_transparency(args.project_root, args.skip_unused)
     except Exception as e:
         print(f"[ERROR] {e}")
         import traceback
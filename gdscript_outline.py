@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GDScript Outline Parser
+Streaming, single-pass, indentation-aware outline of a GDScript file: classes,
+functions, signals, exports, vars, consts and enums with their line spans.
+Shared by performance_analyzer.py and godot_project_index.py so each file is
+tokenized once instead of being regex-scanned repeatedly.
+
+Run directly to benchmark:
+    python gdscript_outline.py [paths...]      (default: scripts/ and addons/gut/)
+    python gdscript_outline.py --dump file.gd  (print the outline tree)
+"""
+
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+TAB_WIDTH = 4
+
+# Per-line classification (ScriptOutline.line_kinds)
+LINE_BLANK = 0
+LINE_COMMENT = 1
+LINE_CODE = 2
+LINE_CONTINUATION = 3   # Inside brackets or after a trailing backslash
+LINE_STRING = 4         # Starts inside a multi-line string
+
+# Annotations that stand alone instead of applying to the next declaration
+STANDALONE_ANNOTATIONS = ('@tool', '@icon', '@static_unload', '@export_category',
+                          '@export_group', '@export_subgroup')
+
+_TOKEN = re.compile(r'''
+    (?P<triple>"""|\'\'\')
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<comment>\#)
+  | (?P<open>[(\[{])
+  | (?P<close>[)\]}])
+''', re.X)
+_QUOTE_OR_COMMENT = re.compile(r'["\'#]')
+_BRACKET = re.compile(r'[()\[\]{}]')
+
+_ANNOTATION = re.compile(r'@\w+(?:\([^)]*\))?\s*')
+_DECLARATION = re.compile(r'(?P<static>static\s+)?(?P<kw>func|class_name|class|extends|signal|var|const|enum)\b\s*(?P<rest>.*)', re.S)
+_FUNC = re.compile(r'(?P<name>\w+)\s*\((?P<params>.*?)\)\s*(?:->\s*(?P<returns>[^:]+?))?\s*:', re.S)
+_CLASS = re.compile(r'''(?P<name>\w+)(?:\s+extends\s+(?P<extends>"[^"]*"|'[^']*'|[\w.]+))?''')
+_NAME = re.compile(r'\w+')
+_VAR = re.compile(r'(?P<name>\w+)\s*(?::\s*(?P<type>[^=:]+?))?\s*(?:(?P<infer>:=)|=|:|$)', re.S)
+
+
+@dataclass
+class OutlineNode:
+    """One declaration. Spans are 1-based, inclusive physical line numbers."""
+    kind: str                   # script, class, func, signal, var, const, enum
+    name: str
+    line: int
+    end_line: int
+    indent: int = 0             # Columns, tabs expanded to TAB_WIDTH
+    body_line: int = 0          # First line after the header (class/func only)
+    detail: str = ""            # extends / return type / declared var type
+    static: bool = False
+    annotations: List[str] = field(default_factory=list)
+    children: List['OutlineNode'] = field(default_factory=list)
+
+    @property
+    def exported(self) -> bool:
+        return any(a.startswith('@export') for a in self.annotations)
+
+    def walk(self):
+        """Pre-order traversal of this node and its descendants"""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+@dataclass
+class ScriptOutline:
+    """Parse result for a whole file"""
+    root: OutlineNode
+    class_name: Optional[str]
+    extends: Optional[str]
+    line_kinds: bytearray
+
+    def nodes(self, kind: str = None) -> List[OutlineNode]:
+        """All nodes of a kind (any kind if None) in source order, inner classes included"""
+        return [n for n in self.root.walk() if n is not self.root and (kind is None or n.kind == kind)]
+
+    def functions(self) -> List[OutlineNode]:
+        return self.nodes('func')
+
+    def signals(self) -> List[OutlineNode]:
+        return self.nodes('signal')
+
+    def exports(self) -> List[OutlineNode]:
+        return [n for n in self.nodes('var') if n.exported]
+
+
+def _indent_width(line: str) -> int:
+    lead = line[:len(line) - len(line.lstrip(' \t'))]
+    return len(lead.expandtabs(TAB_WIDTH)) if '\t' in lead else len(lead)
+
+
+class _Parser:
+    def __init__(self, name: str):
+        self.root = OutlineNode('script', name, 1, 1, indent=-1)
+        self.stack = [self.root]          # Open class/func containers
+        self.line_kinds = bytearray()
+        self.last_content = 0
+        self.pending_annotations = []
+        self.class_name = None
+        self.extends = None
+
+        # Logical statement being accumulated
+        self.stmt_parts = []
+        self.stmt_line = 0
+        self.stmt_indent = 0
+        self.depth = 0
+        self.in_string = None             # Open triple-quote delimiter
+        self.backslash = False
+
+    def feed(self, line_no: int, line: str):
+        line = line.rstrip('\r\n')
+
+        if self.in_string:
+            kind = LINE_STRING
+            close = line.find(self.in_string)
+            self.in_string = None if close >= 0 else self.in_string
+            code = self._scan(line[close + 3:]) if close >= 0 else ''
+            self.stmt_parts.append(code)
+        elif self.depth > 0 or self.backslash:
+            kind = LINE_CONTINUATION
+            self.stmt_parts.append(self._scan(line))
+        else:
+            stripped = line.strip()
+            if not stripped:
+                self.line_kinds.append(LINE_BLANK)
+                return
+            if stripped[0] == '#':
+                self.line_kinds.append(LINE_COMMENT)
+                return
+
+            kind = LINE_CODE
+            indent = _indent_width(line)
+            self._close_blocks(indent)
+            self.stmt_line = line_no
+            self.stmt_indent = indent
+            self.stmt_parts = [self._scan(line)]
+
+        self.line_kinds.append(kind)
+        self.last_content = line_no
+
+        if not self.in_string and self.depth <= 0 and not self.backslash:
+            self.depth = 0
+            self._statement(''.join(self.stmt_parts).strip(), line_no)
+            self.stmt_parts = []
+
+    def _scan(self, text: str) -> str:
+        """Update string/bracket state for a line; returns its code without comments"""
+        self.backslash = False
+        if not _QUOTE_OR_COMMENT.search(text):
+            # No strings or comments: brackets can be counted directly
+            if _BRACKET.search(text):
+                self.depth += (text.count('(') + text.count('[') + text.count('{')
+                               - text.count(')') - text.count(']') - text.count('}'))
+            self.backslash = text.rstrip().endswith('\\')
+            return text.rstrip().rstrip('\\') + ' '
+
+        for m in _TOKEN.finditer(text):
+            group = m.lastgroup
+            if group == 'open':
+                self.depth += 1
+            elif group == 'close':
+                self.depth -= 1
+            elif group == 'comment':
+                return text[:m.start()] + ' '
+            elif group == 'triple':
+                close = text.find(m.group(), m.end())
+                if close < 0:
+                    self.in_string = m.group()
+                    return text[:m.start()] + '""'
+                # Closed on the same line: rescan what follows
+                return text[:m.start()] + '""' + self._scan(text[close + 3:])
+
+        self.backslash = text.rstrip().endswith('\\')
+        return text.rstrip().rstrip('\\') + ' '
+
+    def _close_blocks(self, indent: int):
+        while len(self.stack) > 1 and indent <= self.stack[-1].indent:
+            node = self.stack.pop()
+            node.end_line = max(node.line, self.last_content)
+
+    def _statement(self, text: str, end_line: int):
+        container = self.stack[-1]
+        if container.kind == 'func':
+            return  # Function bodies hold locals and lambdas, not declarations
+
+        annotations = []
+        while text.startswith('@'):
+            m = _ANNOTATION.match(text)
+            if not m:
+                break
+            annotations.append(m.group().strip())
+            text = text[m.end():]
+        annotations = [a for a in annotations if not a.startswith(STANDALONE_ANNOTATIONS)]
+
+        if not text:
+            self.pending_annotations.extend(annotations)
+            return
+        annotations = self.pending_annotations + annotations
+        self.pending_annotations = []
+
+        m = _DECLARATION.match(text)
+        if not m:
+            return
+        kw, rest = m.group('kw'), m.group('rest')
+        node = None
+
+        if kw == 'func':
+            fm = _FUNC.match(rest) or _NAME.match(rest)
+            if fm:
+                returns = fm.group('returns') if fm.re is _FUNC else ''
+                node = OutlineNode('func', fm.group('name') if fm.re is _FUNC else fm.group(),
+                                   self.stmt_line, end_line, detail=(returns or '').strip())
+        elif kw == 'class':
+            cm = _CLASS.match(rest)
+            if cm:
+                node = OutlineNode('class', cm.group('name'), self.stmt_line, end_line,
+                                   detail=_unquote(cm.group('extends') or ''))
+        elif kw == 'class_name':
+            cm = _CLASS.match(rest)
+            if cm and container is self.root:
+                self.class_name = cm.group('name')
+                if cm.group('extends'):
+                    self.extends = _unquote(cm.group('extends'))
+            return
+        elif kw == 'extends':
+            target = _unquote(rest.split()[0].rstrip(':')) if rest.split() else ''
+            if container is self.root:
+                self.extends = target
+            container.detail = target
+            return
+        elif kw == 'var':
+            vm = _VAR.match(rest)
+            if vm:
+                node = OutlineNode('var', vm.group('name'), self.stmt_line, end_line,
+                                   detail=(vm.group('type') or ('inferred' if vm.group('infer') else '')).strip())
+        else:  # signal, const, enum
+            nm = _NAME.match(rest)
+            node = OutlineNode(kw, nm.group() if nm else '', self.stmt_line, end_line)
+
+        if node is None:
+            return
+        node.indent = self.stmt_indent
+        node.static = bool(m.group('static'))
+        node.annotations = annotations
+        container.children.append(node)
+
+        if kw in ('func', 'class'):
+            node.body_line = end_line + 1
+            self.stack.append(node)
+
+    def finish(self) -> ScriptOutline:
+        if self.stmt_parts:
+            self._statement(''.join(self.stmt_parts).strip(), self.last_content)
+        self._close_blocks(-1)
+        self.root.end_line = max(1, len(self.line_kinds))
+        if self.extends:
+            self.root.detail = self.extends
+        if self.class_name:
+            self.root.name = self.class_name
+        return ScriptOutline(self.root, self.class_name, self.extends, self.line_kinds)
+
+
+def mask_strings(line: str) -> str:
+    """
+    A physical line with string literal contents blanked, so code patterns
+    cannot match inside text. Quotes stay in place; a comment or an unclosed
+    triple-quoted string is cut off.
+    """
+    if not _QUOTE_OR_COMMENT.search(line):
+        return line
+    parts = []
+    pos = 0
+    for m in _TOKEN.finditer(line):
+        if m.start() < pos:
+            continue        # Inside a triple-quoted string already blanked
+        group = m.lastgroup
+        if group == 'comment':
+            parts.append(line[pos:m.start()])
+            return ''.join(parts)
+        if group == 'string':
+            text = m.group()
+            parts.append(line[pos:m.start()] + text[0] + ' ' * (len(text) - 2) + text[-1])
+            pos = m.end()
+        elif group == 'triple':
+            close = line.find(m.group(), m.end())
+            if close < 0:
+                return ''.join(parts) + line[pos:m.end()]
+            parts.append(line[pos:m.end()] + ' ' * (close - m.end()) + m.group())
+            pos = close + 3
+    parts.append(line[pos:])
+    return ''.join(parts)
+
+
+def _unquote(text: str) -> str:
+    return text.strip().strip('"\'')
+
+
+def parse_lines(lines: Iterable[str], name: str = '') -> ScriptOutline:
+    """Parse an iterable of physical lines (e.g. an open file) in a single pass"""
+    parser = _Parser(name)
+    for line_no, line in enumerate(lines, 1):
+        parser.feed(line_no, line)
+    return parser.finish()
+
+
+def parse_source(source: str, name: str = '') -> ScriptOutline:
+    return parse_lines(source.split('\n'), name)
+
+
+def parse_file(path) -> ScriptOutline:
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_lines(f, path.stem)
+
+
+def _dump(node: OutlineNode, depth: int = 0):
+    flags = ' '.join(node.annotations + (['static'] if node.static else []))
+    detail = f" : {node.detail}" if node.detail else ''
+    print(f"{'  ' * depth}{node.kind} {node.name}{detail}  [{node.line}-{node.end_line}] {flags}".rstrip())
+    for child in node.children:
+        _dump(child, depth + 1)
+
+
+def benchmark(paths: List[str]):
+    """Parse every .gd file under the given paths and report throughput"""
+    files = []
+    for p in paths:
+        p = Path(p)
+        files.extend([p] if p.is_file() else sorted(p.rglob("*.gd")))
+    sources = [f.read_text(encoding='utf-8') for f in files]
+    total_lines = sum(s.count('\n') + 1 for s in sources)
+
+    start = time.perf_counter()
+    outlines = [parse_source(s) for s in sources]
+    elapsed = time.perf_counter() - start
+
+    print("=" * 60)
+    print(f"GDScript Outline Benchmark - {', '.join(paths)}")
+    print("=" * 60)
+    print(f"  Files:      {len(files)}")
+    print(f"  Lines:      {total_lines}")
+    print(f"  Functions:  {sum(len(o.functions()) for o in outlines)}")
+    print(f"  Classes:    {sum(len(o.nodes('class')) for o in outlines)}")
+    print(f"  Parse time: {elapsed * 1000:.1f} ms ({total_lines / max(elapsed, 1e-9):,.0f} lines/s)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == '--dump':
+        _dump(parse_file(sys.argv[2]).root)
+    else:
+        benchmark(sys.argv[1:] or ['scripts', 'addons/gut'])
@@ -5,20 +5,268 @@ Analyzes existing images and creates emission/glow maps by manipulating color ch
 Follows Godot 4.x standards for emission and glow effects
 """
 
-from PIL import Image, ImageEnhance, ImageFilter
+from PIL import Image, ImageEnhance
 import numpy as np
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import glob
+import hashlib
+import json
+import os
+import struct
 import sys
+import zlib
 import argparse
 
 
+# Suffixes this tool writes; batch discovery skips them so outputs never become inputs
+OUTPUT_MARKERS = ('_emission', '_glow_', '_edge_glow', '_hdr_emission')
+
+# Bump whenever a generator's pixel output changes so cached maps are rebuilt
+GLOW_CACHE_VERSION = 1
+
+
+# OpenEXR constants (scanline, single part)
+EXR_MAGIC = 20000630
+EXR_HALF = 1
+EXR_ZIP_COMPRESSION = 3
+EXR_ZIP_LINES = 16
+
+
+def _exr_attribute(name: str, type_name: str, value: bytes) -> bytes:
+    return (name.encode('ascii') + b'\0' + type_name.encode('ascii') + b'\0'
+            + struct.pack('<i', len(value)) + value)
+
+
+def _exr_header(width: int, height: int, channels: str) -> bytes:
+    chlist = b''.join(name.encode('ascii') + b'\0' + struct.pack('<iB3xii', EXR_HALF, 0, 1, 1)
+                      for name in channels) + b'\0'
+    window = struct.pack('<iiii', 0, 0, width - 1, height - 1)
+    return b''.join([
+        struct.pack('<ii', EXR_MAGIC, 2),
+        _exr_attribute('channels', 'chlist', chlist),
+        _exr_attribute('compression', 'compression', bytes([EXR_ZIP_COMPRESSION])),
+        _exr_attribute('dataWindow', 'box2i', window),
+        _exr_attribute('displayWindow', 'box2i', window),
+        _exr_attribute('lineOrder', 'lineOrder', bytes([0])),
+        _exr_attribute('pixelAspectRatio', 'float', struct.pack('<f', 1.0)),
+        _exr_attribute('screenWindowCenter', 'v2f', struct.pack('<ff', 0.0, 0.0)),
+        _exr_attribute('screenWindowWidth', 'float', struct.pack('<f', 1.0)),
+        b'\0',
+    ])
+
+
+def _exr_zip_block(raw: bytes) -> bytes:
+    """OpenEXR ZIP codec: byte interleave, delta predictor, then zlib"""
+    data = np.frombuffer(raw, dtype=np.uint8)
+    reordered = np.concatenate([data[0::2], data[1::2]])
+    predicted = reordered.copy()
+    predicted[1:] = (reordered[1:].astype(np.int16) - reordered[:-1] + 128) & 0xFF
+    packed = zlib.compress(predicted.tobytes())
+    # Readers treat a block as uncompressed when it is not smaller than the raw data
+    return packed if len(packed) < len(raw) else raw
+
+
+def write_exr(output_path: Path, width: int, height: int, rows_fn, tile_rows: int = 256):
+    """
+    Write an RGBA half-float OpenEXR file from float32 rows
+    
+    rows_fn(y0, y1) must return a (y1 - y0, width, 4) float32 array. It is called
+    one row tile at a time, so peak memory is bounded by tile_rows regardless of
+    image height.
+    """
+    tile_rows = max(EXR_ZIP_LINES, tile_rows - tile_rows % EXR_ZIP_LINES)
+    block_count = (height + EXR_ZIP_LINES - 1) // EXR_ZIP_LINES
+    channels = 'ABGR'  # EXR stores channels in alphabetical order
+    channel_index = [3, 2, 1, 0]
+    
+    with open(output_path, 'wb') as f:
+        f.write(_exr_header(width, height, channels))
+        table_pos = f.tell()
+        f.write(b'\0' * 8 * block_count)  # offset table, filled in below
+        offsets = []
+        
+        for tile_start in range(0, height, tile_rows):
+            tile_end = min(tile_start + tile_rows, height)
+            tile = rows_fn(tile_start, tile_end).astype('<f2')
+            # (rows, width, RGBA) -> (rows, ABGR, width): each scanline is one channel after another
+            planar = np.ascontiguousarray(tile[:, :, channel_index].transpose(0, 2, 1))
+            
+            for block_start in range(tile_start, tile_end, EXR_ZIP_LINES):
+                block_end = min(block_start + EXR_ZIP_LINES, tile_end)
+                data = _exr_zip_block(planar[block_start - tile_start:block_end - tile_start].tobytes())
+                offsets.append(f.tell())
+                f.write(struct.pack('<ii', block_start, len(data)))
+                f.write(data)
+        
+        f.seek(table_pos)
+        f.write(struct.pack(f'<{len(offsets)}Q', *offsets))
+    
+    return output_path
+
+
+def find_project_root(path: Path):
+    """Nearest parent directory containing project.godot, or None"""
+    for parent in Path(path).resolve().parents:
+        if (parent / "project.godot").exists():
+            return parent
+    return None
+
+
+def write_hdr_import(texture_path: Path):
+    """
+    Write a Godot 4.x .import file that keeps an HDR texture in float format
+    
+    VRAM Uncompressed stores the texture as RGBAH so values above 1.0 survive;
+    lossless/lossy modes would quantize it. Returns None outside a Godot project.
+    """
+    project_root = find_project_root(texture_path)
+    if project_root is None:
+        print(f"  [WARN] No project.godot above {texture_path}, skipping .import")
+        return None
+    
+    res_path = "res://" + Path(texture_path).resolve().relative_to(project_root).as_posix()
+    imported = f"res://.godot/imported/{Path(texture_path).name}-{hashlib.md5(res_path.encode()).hexdigest()}.ctex"
+    import_path = Path(str(texture_path) + ".import")
+    
+    import_content = f"""[remap]
+
+importer="texture"
+type="CompressedTexture2D"
+path="{imported}"
+metadata={{
+"vram_texture": false
+}}
+
+[deps]
+
+source_file="{res_path}"
+dest_files=["{imported}"]
+
+[params]
+
+compress/mode=3
+compress/high_quality=false
+compress/lossy_quality=0.7
+compress/hdr_compression=0
+compress/normal_map=0
+compress/channel_pack=0
+mipmaps/generate=false
+mipmaps/limit=-1
+roughness/mode=0
+roughness/src_normal=""
+process/fix_alpha_border=false
+process/premult_alpha=false
+process/normal_map_invert_y=false
+process/hdr_as_srgb=false
+process/hdr_clamp_exposure=false
+process/size_limit=0
+detect_3d/compress_to=0
+"""
+    
+    with open(import_path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(import_content)
+    
+    return import_path
+
+
+def _find_edges(alpha: np.ndarray, y0: int, y1: int) -> np.ndarray:
+    """
+    ImageFilter.FIND_EDGES on rows [y0, y1) of a full uint8 plane.
+    Like PIL, pixels on the image border are copied from the source unchanged.
+    """
+    height, width = alpha.shape
+    lo, hi = max(y0 - 1, 0), min(y1 + 1, height)
+    padded = np.pad(alpha[lo:hi].astype(np.int16),
+                    ((1 if lo == y0 else 0, 1 if hi == y1 else 0), (1, 1)), mode='edge')
+    
+    # 8 * center - 8 neighbours == 9 * center - 3x3 box sum
+    rows = y1 - y0
+    box = sum(padded[dy:dy + rows, dx:dx + width] for dy in range(3) for dx in range(3))
+    edges = np.clip(9 * padded[1:rows + 1, 1:width + 1] - box, 0, 255).astype(np.uint8)
+    
+    edges[:, [0, -1]] = alpha[y0:y1][:, [0, -1]]
+    if y0 == 0:
+        edges[0] = alpha[0]
+    if y1 == height:
+        edges[-1] = alpha[-1]
+    return edges
+
+
+def _running_max(values: np.ndarray, window: int, axis: int) -> np.ndarray:
+    """
+    Centered sliding max along one axis, window clipped at the borders
+    
+    van Herk/Gil-Werman: per-block prefix and suffix maxima give every window
+    in two lookups, so cost is independent of the window size.
+    """
+    if window <= 1:
+        return values
+    
+    radius = window // 2
+    values = np.moveaxis(values, axis, 0)
+    length = values.shape[0]
+    blocks = -(-(length + 2 * radius) // window)
+    
+    # Zero padding acts as clipping since values are non-negative
+    padded = np.zeros((blocks * window,) + values.shape[1:], dtype=values.dtype)
+    padded[radius:radius + length] = values
+    shaped = padded.reshape((blocks, window) + values.shape[1:])
+    prefix = np.maximum.accumulate(shaped, axis=1).reshape(padded.shape)
+    suffix = np.maximum.accumulate(shaped[:, ::-1], axis=1)[:, ::-1].reshape(padded.shape)
+    
+    result = np.maximum(suffix[:length], prefix[window - 1:window - 1 + length])
+    return np.moveaxis(result, 0, axis)
+
+
 class GodotGlowGenerator:
     """Generate glow/emission maps from existing sprites"""
     
-    def __init__(self, input_path: str, output_dir: str = None):
+    def __init__(self, input_path: str, output_dir: str = None, verbose: bool = True):
         self.input_path = Path(input_path)
         self.output_dir = Path(output_dir) if output_dir else self.input_path.parent
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.verbose = verbose
+        self._rgba = None
+    
+    @property
+    def rgba(self) -> np.ndarray:
+        """Source sprite as an (H, W, 4) uint8 array, decoded once and shared by every map"""
+        if self._rgba is None:
+            with Image.open(self.input_path) as img:
+                self._rgba = np.array(img.convert('RGBA'), dtype=np.uint8)
+        return self._rgba
+    
+    def output_path_for(self, method: str, kwargs: dict = None) -> Path:
+        """Path a plan step writes to, without running it"""
+        kwargs = kwargs or {}
+        if method == 'generate_emission_map':
+            suffix = "_emission"
+        elif method == 'generate_color_glow':
+            target_color = kwargs['target_color']
+            suffix = f"_glow_r{target_color[0]}g{target_color[1]}b{target_color[2]}"
+        elif method == 'generate_edge_glow':
+            suffix = "_edge_glow"
+        elif method == 'generate_hdr_emission':
+            suffix = "_hdr_emission"
+            if kwargs.get('hdr_format', 'exr') == 'exr':
+                return self.output_dir / f"{self.input_path.stem}{suffix}.exr"
+        else:
+            raise ValueError(f"Unknown glow method: {method}")
+        return self.output_dir / f"{self.input_path.stem}{suffix}.png"
+    
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
+    
+    def run(self, plan: list) -> list:
+        """
+        Run a list of (method_name, kwargs) steps against the shared source array
+        
+        Returns:
+            List of output paths, in plan order
+        """
+        return [getattr(self, method)(**kwargs) for method, kwargs in plan]
     
     def generate_emission_map(self, brightness_threshold: float = 0.7, 
                              intensity_multiplier: float = 2.0,
@@ -31,17 +279,10 @@ class GodotGlowGenerator:
             intensity_multiplier: How much to boost glow intensity (1.0-5.0)
             color_boost: (R, G, B) multipliers for specific color channels
         """
-        print(f"[*] Generating emission map from: {self.input_path.name}")
-        
-        # Load image
-        img = Image.open(self.input_path).convert('RGBA')
-        width, height = img.size
+        self._log(f"[*] Generating emission map from: {self.input_path.name}")
         
-        # Create emission map (start with black/transparent)
-        emission = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        
-        # Convert to numpy for easier processing
-        img_array = np.array(img, dtype=np.float32) / 255.0
+        # Convert to float for easier processing
+        img_array = self.rgba.astype(np.float32) / 255.0
         emission_array = np.zeros_like(img_array)
         
         # Calculate brightness for each pixel
@@ -71,9 +312,9 @@ class GodotGlowGenerator:
         emission = Image.fromarray(emission_array, 'RGBA')
         
         # Save emission map
-        output_path = self.output_dir / f"{self.input_path.stem}_emission.png"
+        output_path = self.output_path_for('generate_emission_map')
         emission.save(output_path, 'PNG')
-        print(f"  [OK] Emission map saved: {output_path.name}")
+        self._log(f"  [OK] Emission map saved: {output_path.name}")
         
         return output_path
     
@@ -87,14 +328,9 @@ class GodotGlowGenerator:
             tolerance: How close colors need to be to target (0-255)
             intensity: Glow intensity multiplier
         """
-        print(f"[*] Generating color-specific glow for RGB{target_color}")
-        
-        img = Image.open(self.input_path).convert('RGBA')
-        width, height = img.size
+        self._log(f"[*] Generating color-specific glow for RGB{target_color}")
         
-        emission = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        
-        img_array = np.array(img, dtype=np.float32)
+        img_array = self.rgba.astype(np.float32)
         emission_array = np.zeros_like(img_array)
         
         # Calculate color distance from target
@@ -118,63 +354,60 @@ class GodotGlowGenerator:
         emission_array = emission_array.astype(np.uint8)
         emission = Image.fromarray(emission_array, 'RGBA')
         
-        color_name = f"r{target_color[0]}g{target_color[1]}b{target_color[2]}"
-        output_path = self.output_dir / f"{self.input_path.stem}_glow_{color_name}.png"
+        output_path = self.output_path_for('generate_color_glow', {'target_color': target_color})
         emission.save(output_path, 'PNG')
-        print(f"  [OK] Color glow saved: {output_path.name}")
+        self._log(f"  [OK] Color glow saved: {output_path.name}")
         
         return output_path
     
-    def generate_edge_glow(self, edge_thickness: int = 2, intensity: float = 2.5):
+    def generate_edge_glow(self, edge_thickness: int = 2, intensity: float = 2.5,
+                           tile_rows: int = 256):
         """
         Generate glow along sprite edges (outline glow effect)
-        """
-        print(f"[*] Generating edge glow")
-        
-        img = Image.open(self.input_path).convert('RGBA')
-        
-        # Extract alpha channel for edge detection
-        alpha = img.split()[3]
-        
-        # Find edges using filter
-        edges = alpha.filter(ImageFilter.FIND_EDGES)
         
-        # Dilate edges to make them thicker
-        for _ in range(edge_thickness):
-            edges = edges.filter(ImageFilter.MaxFilter(3))
-        
-        # Create emission map from edges
-        emission = Image.new('RGBA', img.size, (0, 0, 0, 0))
-        
-        # Get original colors at edge positions
-        img_array = np.array(img, dtype=np.float32) / 255.0
-        edges_array = np.array(edges, dtype=np.float32) / 255.0
-        emission_array = np.zeros_like(img_array)
-        
-        # Apply edge mask with intensity
-        for i in range(3):
-            emission_array[:, :, i] = img_array[:, :, i] * edges_array * intensity
-        
-        emission_array[:, :, 3] = edges_array * 255
+        Equivalent to FIND_EDGES followed by edge_thickness MaxFilter(3) passes,
+        but the dilation is one separable running max whose cost does not grow
+        with thickness, and float work is done in row tiles of tile_rows.
+        """
+        self._log(f"[*] Generating edge glow")
+        
+        alpha = self.rgba[:, :, 3]
+        height, width = alpha.shape
+        window = 2 * edge_thickness + 1
+        emission_array = np.empty((height, width, 4), dtype=np.uint8)
+        
+        for y0 in range(0, height, tile_rows):
+            y1 = min(y0 + tile_rows, height)
+            
+            # Edges for the tile plus a halo of edge_thickness rows on each side
+            s0, s1 = max(0, y0 - edge_thickness), min(height, y1 + edge_thickness)
+            edges = _running_max(_find_edges(alpha, s0, s1), window, axis=0)[y0 - s0:y1 - s0]
+            edges = _running_max(edges, window, axis=1)
+            
+            # Get original colors at edge positions
+            img_array = self.rgba[y0:y1].astype(np.float32) / 255.0
+            edges_array = edges.astype(np.float32) / 255.0
+            tile = np.zeros_like(img_array)
+            
+            # Apply edge mask with intensity
+            for i in range(3):
+                tile[:, :, i] = img_array[:, :, i] * edges_array * intensity
+            
+            tile[:, :, 3] = edges_array * 255
+            
+            emission_array[y0:y1] = np.clip(tile * 255, 0, 255).astype(np.uint8)
         
-        emission_array = np.clip(emission_array * 255, 0, 255).astype(np.uint8)
         emission = Image.fromarray(emission_array, 'RGBA')
         
-        output_path = self.output_dir / f"{self.input_path.stem}_edge_glow.png"
+        output_path = self.output_path_for('generate_edge_glow')
         emission.save(output_path, 'PNG')
-        print(f"  [OK] Edge glow saved: {output_path.name}")
+        self._log(f"  [OK] Edge glow saved: {output_path.name}")
         
         return output_path
     
-    def generate_hdr_emission(self, hdr_multiplier: float = 5.0):
-        """
-        Generate HDR emission map (values > 1.0 for bloom effect)
-        Saves as EXR format for HDR support in Godot
-        """
-        print(f"[*] Generating HDR emission map")
-        
-        img = Image.open(self.input_path).convert('RGBA')
-        img_array = np.array(img, dtype=np.float32) / 255.0
+    def _hdr_rows(self, y0: int, y1: int, hdr_multiplier: float) -> np.ndarray:
+        """HDR emission for source rows [y0, y1) as float32 (values can exceed 1.0)"""
+        img_array = self.rgba[y0:y1].astype(np.float32) / 255.0
         
         # Calculate brightness
         brightness = np.mean(img_array[:, :, :3], axis=2)
@@ -191,22 +424,218 @@ class GodotGlowGenerator:
             )
         
         hdr_emission[:, :, 3] = np.where(bright_mask, img_array[:, :, 3], 0)
+        return hdr_emission
+    
+    def generate_hdr_emission(self, hdr_multiplier: float = 5.0, hdr_format: str = 'exr'):
+        """
+        Generate HDR emission map (values > 1.0 for bloom effect)
         
-        # Save as PNG with high bit depth (Godot will interpret as HDR)
-        hdr_emission_8bit = np.clip(hdr_emission * 255, 0, 255).astype(np.uint8)
-        hdr_img = Image.fromarray(hdr_emission_8bit, 'RGBA')
-        
-        output_path = self.output_dir / f"{self.input_path.stem}_hdr_emission.png"
-        hdr_img.save(output_path, 'PNG')
-        print(f"  [OK] HDR emission saved: {output_path.name}")
-        print(f"      Note: Set emission energy to {hdr_multiplier} in Godot material")
+        Args:
+            hdr_multiplier: Brightness multiplier baked into the emission values
+            hdr_format: 'exr' writes half-float OpenEXR plus a matching .import,
+                        'png' writes the legacy 8-bit map (values clipped to 1.0)
+        """
+        self._log(f"[*] Generating HDR emission map")
+        
+        output_path = self.output_path_for('generate_hdr_emission', {'hdr_format': hdr_format})
+        height, width = self.rgba.shape[:2]
+        
+        if hdr_format == 'exr':
+            # Float rows go straight to disk in row tiles, never through uint8
+            write_exr(output_path, width, height,
+                      lambda y0, y1: self._hdr_rows(y0, y1, hdr_multiplier))
+            import_path = write_hdr_import(output_path)
+            self._log(f"  [OK] HDR emission saved: {output_path.name}")
+            if import_path:
+                self._log(f"  [OK] Import settings saved: {import_path.name}")
+        else:
+            # 8-bit PNG clips everything above 1.0
+            hdr_emission_8bit = np.clip(self._hdr_rows(0, height, hdr_multiplier) * 255,
+                                        0, 255).astype(np.uint8)
+            hdr_img = Image.fromarray(hdr_emission_8bit, 'RGBA')
+            hdr_img.save(output_path, 'PNG')
+            self._log(f"  [OK] HDR emission saved: {output_path.name}")
+            self._log(f"      Note: Set emission energy to {hdr_multiplier} in Godot material")
         
         return output_path
 
 
+def _file_hash(path: Path) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class GlowManifest:
+    """
+    Persistent record of generated glow maps
+    
+    Each output is keyed on the source sprite's content hash plus the generator
+    method and its parameters. A step is skipped when that key is unchanged and
+    the output on disk still matches the hash recorded when it was written.
+    """
+    
+    def __init__(self, manifest_path: str):
+        self.path = Path(manifest_path)
+        self.root = self.path.parent
+        self.outputs = {}
+        self._source_hashes = {}
+        
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == GLOW_CACHE_VERSION:
+                    self.outputs = data.get('outputs', {})
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Ignoring unreadable glow manifest {self.path}: {e}")
+    
+    def _rel(self, path: Path) -> str:
+        return Path(os.path.relpath(Path(path).resolve(), self.root.resolve())).as_posix()
+    
+    def source_hash(self, source: Path) -> str:
+        key = self._rel(source)
+        if key not in self._source_hashes:
+            self._source_hashes[key] = _file_hash(source)
+        return self._source_hashes[key]
+    
+    def step_key(self, source: Path, method: str, kwargs: dict) -> str:
+        payload = json.dumps({
+            'version': GLOW_CACHE_VERSION,
+            'source_hash': self.source_hash(source),
+            'method': method,
+            'params': kwargs,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def is_current(self, source: Path, output: Path, method: str, kwargs: dict) -> bool:
+        entry = self.outputs.get(self._rel(output))
+        if not entry or not output.exists():
+            return False
+        if entry.get('key') != self.step_key(source, method, kwargs):
+            return False
+        return entry.get('output_hash') == _file_hash(output)
+    
+    def stale_steps(self, generator: GodotGlowGenerator, plan: list) -> list:
+        """Subset of plan whose outputs are missing or out of date"""
+        return [(method, kwargs) for method, kwargs in plan
+                if not self.is_current(generator.input_path,
+                                       generator.output_path_for(method, kwargs),
+                                       method, kwargs)]
+    
+    def record(self, source: Path, output: Path, method: str, kwargs: dict):
+        self.outputs[self._rel(output)] = {
+            'source': self._rel(source),
+            'method': method,
+            'params': kwargs,
+            'key': self.step_key(source, method, kwargs),
+            'output_hash': _file_hash(output),
+        }
+    
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'version': GLOW_CACHE_VERSION,
+                       'outputs': dict(sorted(self.outputs.items()))}, f, indent=2)
+
+
+def build_plan(mode: str, threshold: float = 0.7, intensity: float = 2.0,
+               color: tuple = None, tolerance: int = 50, edge_thickness: int = 2,
+               hdr_multiplier: float = 5.0, hdr_format: str = 'exr') -> list:
+    """
+    Translate a CLI mode into (method_name, kwargs) steps for GodotGlowGenerator.run
+    
+    Without an explicit color, color mode produces the default cyan (orb outline)
+    and pink (face) glows.
+    """
+    plan = []
+    
+    if mode == 'emission' or mode == 'all':
+        plan.append(('generate_emission_map', {'brightness_threshold': threshold,
+                                               'intensity_multiplier': intensity}))
+    
+    if mode == 'color' or mode == 'all':
+        if color:
+            plan.append(('generate_color_glow', {'target_color': tuple(color),
+                                                 'tolerance': tolerance, 'intensity': intensity}))
+        else:
+            plan.append(('generate_color_glow', {'target_color': (0, 255, 255),
+                                                 'tolerance': tolerance, 'intensity': 3.0}))
+            plan.append(('generate_color_glow', {'target_color': (255, 100, 150),
+                                                 'tolerance': tolerance, 'intensity': 2.5}))
+    
+    if mode == 'edge' or mode == 'all':
+        plan.append(('generate_edge_glow', {'edge_thickness': edge_thickness, 'intensity': 2.5}))
+    
+    if mode == 'hdr' or mode == 'all':
+        plan.append(('generate_hdr_emission', {'hdr_multiplier': hdr_multiplier,
+                                               'hdr_format': hdr_format}))
+    
+    return plan
+
+
+def find_sprites(pattern: str) -> list:
+    """
+    Resolve a file, directory or glob pattern into source sprites.
+    Previously generated glow maps are skipped.
+    """
+    path = Path(pattern)
+    if path.is_file():
+        return [path]
+    
+    if path.is_dir():
+        candidates = path.rglob("*.png")
+    else:
+        candidates = (Path(p) for p in glob.glob(pattern, recursive=True))
+    
+    return sorted(p for p in candidates
+                  if p.suffix.lower() == '.png'
+                  and not any(marker in p.stem for marker in OUTPUT_MARKERS))
+
+
+def _generate_for_file(input_path: str, output_dir: str, plan: list) -> list:
+    """Process-pool worker: decode one sprite and run the whole plan on it"""
+    generator = GodotGlowGenerator(input_path, output_dir, verbose=False)
+    return generator.run(plan)
+
+
+def generate_batch(plans: dict, output_dir: str, jobs: int = None) -> dict:
+    """
+    Generate glow maps for many sprites, fanned out over a process pool
+    
+    Args:
+        plans: Source sprite path -> steps from build_plan
+        output_dir: Shared output directory (None = next to each sprite)
+        jobs: Worker processes (default: CPU count)
+    
+    Returns:
+        Dict of input path -> list of output paths (failed inputs are omitted)
+    """
+    jobs = jobs or os.cpu_count() or 1
+    results = {}
+    
+    print(f"[*] Processing {len(plans)} sprites with {jobs} workers")
+    
+    with ProcessPoolExecutor(max_workers=min(jobs, max(len(plans), 1))) as pool:
+        futures = {pool.submit(_generate_for_file, str(path), output_dir, plan): path
+                   for path, plan in plans.items()}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                results[path] = future.result()
+                print(f"  [OK] {path.name} - {len(results[path])} maps")
+            except Exception as e:
+                print(f"  [ERROR] {path.name}: {e}")
+    
+    return results
+
+
 def main():
     parser = argparse.ArgumentParser(description='Generate Godot glow/emission maps')
-    parser.add_argument('input', help='Input image file')
+    parser.add_argument('input', help='Input image file, directory or glob (e.g. "assets/sprites/enemies/*.png")')
     parser.add_argument('-o', '--output', help='Output directory', default=None)
     parser.add_argument('-m', '--mode', choices=['emission', 'color', 'edge', 'hdr', 'all'],
                        default='all', help='Generation mode')
@@ -216,29 +645,80 @@ def main():
                        help='Glow intensity multiplier')
     parser.add_argument('-c', '--color', help='Target color for color glow (R,G,B)',
                        default=None)
+    parser.add_argument('--tolerance', type=int, default=50,
+                       help='Color distance tolerance for color glow (0-255)')
+    parser.add_argument('--edge-thickness', type=int, default=2,
+                       help='Edge glow thickness in pixels')
+    parser.add_argument('--hdr-multiplier', type=float, default=5.0,
+                       help='HDR emission multiplier')
+    parser.add_argument('--hdr-format', choices=['exr', 'png'], default='exr',
+                       help='HDR output: half-float EXR (default) or legacy clipped 8-bit PNG')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                       help='Worker processes for batch mode (default: CPU count)')
+    parser.add_argument('--manifest', default='.glow_manifest.json',
+                       help='Incremental cache manifest (default: .glow_manifest.json)')
+    parser.add_argument('--force', action='store_true',
+                       help='Regenerate every output even if it is up to date')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Do not read or write the manifest')
     
     args = parser.parse_args()
     
-    generator = GodotGlowGenerator(args.input, args.output)
+    color = None
+    if args.color:
+        color = tuple(int(c) for c in args.color.split(','))
+        if len(color) != 3:
+            parser.error("--color must be R,G,B")
+    
+    plan = build_plan(args.mode, args.threshold, args.intensity, color,
+                      args.tolerance, args.edge_thickness, args.hdr_multiplier,
+                      args.hdr_format)
+    inputs = find_sprites(args.input)
     
     print(f"\n{'='*60}")
     print("GODOT GLOW CHANNEL GENERATOR")
     print(f"{'='*60}\n")
     
-    if args.mode == 'emission' or args.mode == 'all':
-        generator.generate_emission_map(args.threshold, args.intensity)
+    if not inputs:
+        print(f"[ERROR] No sprites found for: {args.input}")
+        sys.exit(1)
+    
+    # Work out which outputs are actually out of date
+    manifest = None if args.no_cache else GlowManifest(args.manifest)
+    plans = {}
+    skipped = 0
+    for path in inputs:
+        steps = plan
+        if manifest and not args.force:
+            steps = manifest.stale_steps(GodotGlowGenerator(path, args.output), plan)
+        skipped += len(plan) - len(steps)
+        if steps:
+            plans[path] = steps
+    
+    if not plans:
+        results = {}
+    elif len(inputs) == 1 and Path(args.input).is_file():
+        path, steps = next(iter(plans.items()))
+        results = {path: GodotGlowGenerator(path, args.output).run(steps)}
+    else:
+        results = generate_batch(plans, args.output, args.jobs)
     
-    if args.mode == 'color' or args.mode == 'all':
-        # Generate cyan glow (for orb outlines)
-        generator.generate_color_glow((0, 255, 255), tolerance=50, intensity=3.0)
-        # Generate pink glow (for faces)
-        generator.generate_color_glow((255, 100, 150), tolerance=50, intensity=2.5)
+    regenerated = []
+    for path, outputs in results.items():
+        for (method, kwargs), output in zip(plans[path], outputs):
+            regenerated.append(output)
+            if manifest:
+                manifest.record(path, output, method, kwargs)
+    if manifest:
+        manifest.save()
     
-    if args.mode == 'edge' or args.mode == 'all':
-        generator.generate_edge_glow(edge_thickness=2, intensity=2.5)
+    print(f"\n[*] Regenerated {len(regenerated)} outputs, {skipped} up to date")
+    for output in regenerated:
+        print(f"  [NEW] {output}")
     
-    if args.mode == 'hdr' or args.mode == 'all':
-        generator.generate_hdr_emission(hdr_multiplier=5.0)
+    if len(results) < len(plans):
+        print(f"\n[ERROR] {len(plans) - len(results)} of {len(plans)} sprites failed")
+        sys.exit(1)
     
     print(f"\n{'='*60}")
     print("[SUCCESS] Glow maps generated!")
@@ -258,5 +738,6 @@ if __name__ == "__main__":
         print("\nExample:")
         print("  python generate_glow_maps.py antigrav_orb.png --mode all")
         print("  python generate_glow_maps.py sprite.png --mode color --color 0,255,255")
+        print("  python generate_glow_maps.py assets/sprites/enemies --mode all --jobs 4")
     else:
         main()
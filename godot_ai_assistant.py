@@ -12,6 +12,11 @@ import json
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from godot_process import GodotRun, run_godot
+from godot_project_index import ProjectIndex
+from godot_test_shards import TestDurations, discover_tests, plan_shards, run_shards
+from godot_worker import GodotWorkerPool, WorkerError
+
 # Fix Windows console encoding
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
@@ -21,9 +26,13 @@ if sys.platform == 'win32':
 class GodotAIAssistant:
     """Advanced Godot automation assistant"""
     
-    def __init__(self, project_root: str, godot_executable: Optional[str] = None):
+    def __init__(self, project_root: str, godot_executable: Optional[str] = None,
+                 timeout: Optional[float] = None):
         self.project_root = Path(project_root)
+        self.timeout = timeout
         self.project_file = self.project_root / "project.godot"
+        self._index: Optional[ProjectIndex] = None
+        self._pool: Optional[GodotWorkerPool] = None
         
         # Try to find Godot executable
         if godot_executable:
@@ -58,49 +67,107 @@ class GodotAIAssistant:
         
         return None
     
-    def run_godot_command(self, args: List[str]) -> subprocess.CompletedProcess:
-        """Run a Godot command-line operation"""
+    def run_godot_command(self, args: List[str], timeout: Optional[float] = None,
+                          idle_timeout: Optional[float] = None) -> GodotRun:
+        """Run a Godot command-line operation, showing progress as it streams in"""
         if not self.godot_exe:
             raise RuntimeError("Godot executable not found. Please specify path.")
         
         cmd = [str(self.godot_exe), "--path", str(self.project_root)] + args
         print(f"[CMD] {' '.join(cmd)}")
         
-        return subprocess.run(cmd, capture_output=True, text=True)
+        result = run_godot(cmd, timeout=timeout or self.timeout, idle_timeout=idle_timeout,
+                           on_event=self._print_event)
+        if result.timed_out:
+            print(f"   [!] Timed out after {result.seconds:.0f}s; process group killed")
+        if result.phases:
+            print(f"   phases: {result.phase_summary()}")
+        return result
+    
+    @staticmethod
+    def _print_event(event: Dict):
+        kind = event["type"]
+        if kind == "progress":
+            print(f"   [{event['percent']:3d}%] {event['task']} | {event['step']}")
+        elif kind == "script":
+            print(f"   {event['path']}")
+        elif kind in ("failed", "error"):
+            print(f"      ✗ {event['text']}")
+        elif kind == "summary":
+            print(f"   {event['text']}")
+    
+    def _imported_resources(self) -> List[str]:
+        """res:// paths of every asset that has a .import file"""
+        paths = []
+        for import_file in self.project_root.rglob("*.import"):
+            if ".godot" not in import_file.parts:
+                paths.append("res://" + import_file.relative_to(self.project_root).as_posix()[:-len(".import")])
+        return sorted(paths)
+    
+    def worker_pool(self, size: int = 1) -> GodotWorkerPool:
+        """Persistent headless workers for tests and scene checks, started on first use and grown to `size`"""
+        if not self.godot_exe:
+            raise RuntimeError("Godot executable not found. Please specify path.")
+        if self._pool is None:
+            self._pool = GodotWorkerPool(str(self.godot_exe), str(self.project_root), size).start()
+        elif self._pool.size < size:
+            self._pool.grow(size)
+        return self._pool
     
-    def reimport_resources(self):
-        """Force Godot to reimport all resources"""
+    def close(self):
+        """Stop the worker pool, if one was started"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+    
+    def reimport_resources(self, paths: Optional[List[str]] = None):
+        """Force Godot to reimport all resources (or `paths`); live workers reload them afterwards"""
         print("[*] Reimporting resources...")
+        if self._pool is not None:
+            paths = paths if paths is not None else self._imported_resources()
+            result = self._pool.reimport(paths)
+            if result["ok"]:
+                print(f"   ✓ {result['paths']} resources reimported in {result['seconds']:.1f}s; "
+                      f"workers reload them before their next job")
+            else:
+                print(f"   ✗ Error: {result['errors'][0] if result['errors'] else 'reimport failed'}")
+            return result["ok"]
+        
         result = self.run_godot_command(["--headless", "--quit"])
         
-        if result.returncode == 0:
+        if result.ok:
             print("   ✓ Resources reimported successfully")
         else:
-            print(f"   ✗ Error: {result.stderr}")
+            print(f"   ✗ Error: {result.failure}")
         
-        return result.returncode == 0
+        return result.ok
     
     def export_project(self, preset: str, output_path: str):
         """Export the project using a preset"""
         print(f"[*] Exporting project with preset: {preset}")
         result = self.run_godot_command(["--headless", "--export-release", preset, output_path])
         
-        if result.returncode == 0:
+        if result.ok:
             print(f"   ✓ Exported to: {output_path}")
         else:
-            print(f"   ✗ Error: {result.stderr}")
+            print(f"   ✗ Error: {result.failure}")
         
-        return result.returncode == 0
+        return result.ok
     
     def run_scene(self, scene_path: str):
         """Run a specific scene"""
         print(f"[*] Running scene: {scene_path}")
         result = self.run_godot_command([scene_path])
-        return result.returncode == 0
+        return result.ok
     
-    def run_tests(self, test_path: Optional[str] = None):
-        """Run GUT tests"""
+    def run_tests(self, test_path: Optional[str] = None, shards: int = 0, fail_fast: bool = False,
+                  junit_path: Optional[str] = None, json_path: Optional[str] = None):
+        """Run GUT tests; with shards, split them across that many headless workers"""
         print("[*] Running tests...")
+        if shards:
+            return self._run_tests_sharded(test_path, shards, fail_fast, junit_path, json_path)
+        if self._pool is not None:
+            return self._run_tests_in_worker(test_path)
         
         args = ["--headless", "-s", "res://addons/gut/gut_cmdln.gd"]
         if test_path:
@@ -108,13 +175,94 @@ class GodotAIAssistant:
         
         result = self.run_godot_command(args)
         
-        if result.returncode == 0:
-            print("   ✓ Tests completed")
-            print(result.stdout)
+        if result.ok:
+            print(f"   ✓ Tests completed ({result.seconds:.1f}s)")
         else:
-            print(f"   ✗ Test errors: {result.stderr}")
+            print(f"   ✗ Test errors: {result.failure}")
         
-        return result.returncode == 0
+        return result.ok
+    
+    def _run_tests_in_worker(self, test_path: Optional[str]) -> bool:
+        def on_event(event: Dict):
+            if event["event"] == "script":
+                print(f"   {event['path']}")
+        
+        params = {}
+        if test_path:
+            params = {"tests": [test_path]} if test_path.endswith(".gd") else {"dirs": [test_path]}
+        try:
+            result = self._pool.run("run_tests", on_event, **params)
+        except WorkerError as e:
+            print(f"   ✗ Worker failed: {e}")
+            print("\n".join(e.output[-20:]))
+            return False
+        
+        totals = result["totals"]
+        mark = "✓" if result["ok"] else "✗"
+        print(f"   {mark} {totals['passing_tests']}/{totals['tests']} tests passed, "
+              f"{totals['failing_tests']} failed, {totals['pending']} pending "
+              f"({totals['scripts']} scripts, {result['seconds']:.2f}s)")
+        return result["ok"]
+    
+    def _run_tests_sharded(self, test_path: Optional[str], shards: int, fail_fast: bool,
+                           junit_path: Optional[str], json_path: Optional[str]) -> bool:
+        if test_path and test_path.endswith(".gd"):
+            scripts = [test_path]
+        else:
+            scripts = discover_tests(str(self.project_root), test_path or "tests")
+        if not scripts:
+            print("   ✗ No test scripts found")
+            return False
+        
+        durations = TestDurations(str(self.project_root))
+        plan = plan_shards(scripts, shards, durations)
+        for i, shard in enumerate(plan):
+            estimate = sum(durations.estimate(script) for script in shard)
+            print(f"   shard {i}: {len(shard)} script(s), ~{estimate:.1f}s")
+        
+        def on_event(event: Dict):
+            if event["event"] == "script_done":
+                print(f"   [{event['shard']}] {event['path']} ({event['seconds']:.2f}s)")
+        
+        pool = self.worker_pool(len(plan))
+        report = run_shards(pool, plan, fail_fast, durations, on_event)
+        
+        for shard in report["shards"]:
+            if shard.get("error"):
+                print(f"   ✗ shard {shard['shard']}: {shard['error']}")
+        totals = report["totals"]
+        mark = "✓" if report["ok"] else "✗"
+        note = ", stopped early" if report["cancelled"] else ""
+        print(f"   {mark} {totals.get('passing_tests', 0)}/{totals.get('tests', 0)} tests passed, "
+              f"{totals.get('failing_tests', 0)} failed in {len(plan)} shard(s) "
+              f"({report['seconds']:.2f}s{note})")
+        
+        if junit_path:
+            Path(junit_path).write_text(report["junit"], encoding='utf-8')
+            print(f"   JUnit: {junit_path}")
+        if json_path:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(dict(report["results"], shards=report["shards"]), f, indent=2)
+            print(f"   JSON: {json_path}")
+        return report["ok"]
+    
+    def check_scenes(self, scene_paths: List[str]) -> bool:
+        """Load and instantiate scenes in the worker pool without running them"""
+        print(f"[*] Checking {len(scene_paths)} scene(s)...")
+        pool = self.worker_pool()
+        futures = [pool.submit("check_scene", path=path) for path in scene_paths]
+        all_ok = True
+        for path, future in zip(scene_paths, futures):
+            try:
+                result = future.result()
+            except WorkerError as e:
+                result = {"ok": False, "error": str(e)}
+            all_ok &= result["ok"]
+            if result["ok"]:
+                print(f"   ✓ {path} ({result['nodes']} nodes, {result['seconds'] * 1000:.0f} ms)")
+            else:
+                print(f"   ✗ {path}: {result['error']}")
+        return all_ok
     
     def create_script_template(self, script_path: str, extends: str = "Node", class_name: Optional[str] = None):
         """Create a GDScript template"""
@@ -133,6 +281,24 @@ class GodotAIAssistant:
         print(f"   ✓ Created script: {script_path}")
         return True
     
+    @property
+    def index(self) -> ProjectIndex:
+        """Persistent project index, brought up to date on first use"""
+        if self._index is None:
+            self._index = ProjectIndex(str(self.project_root))
+            self._index.update()
+        return self._index
+    
+    def query_index(self, kind: str, name: str) -> List[Dict]:
+        """Answer a structural question from the index without re-parsing the project"""
+        if kind == "scenes-using":
+            return self.index.scenes_using_script(name)
+        if kind == "extends":
+            return self.index.scripts_extending(name)
+        if kind == "emitters":
+            return self.index.signal_emitters(name) + self.index.signal_connections(name)
+        raise ValueError(f"Unknown query: {kind}")
+    
     def get_project_info(self) -> Dict:
         """Get project information"""
         info = {
@@ -142,9 +308,10 @@ class GodotAIAssistant:
             "has_tests": (self.project_root / "tests").exists(),
         }
         
-        # Count files
-        info["script_count"] = len(list(self.project_root.rglob("*.gd")))
-        info["scene_count"] = len(list(self.project_root.rglob("*.tscn")))
+        # Count files (scripts and scenes come from the persistent index)
+        stats = self.index.stats()
+        info["script_count"] = stats["scripts"]
+        info["scene_count"] = stats["scenes"]
         info["asset_count"] = len(list(self.project_root.rglob("*.png"))) + \
                              len(list(self.project_root.rglob("*.jpg")))
         
@@ -162,11 +329,28 @@ def main():
     parser.add_argument("--run", help="Run a specific scene")
     parser.add_argument("--test", nargs="?", const=True, help="Run tests")
     parser.add_argument("--info", action="store_true", help="Show project info")
+    parser.add_argument("--check-scene", nargs="+", metavar="SCENE",
+                        help="Load and instantiate scenes (res:// paths) in a headless worker")
+    parser.add_argument("--timeout", type=float, metavar="SECONDS",
+                        help="Kill Godot commands (and their child processes) after this long")
+    parser.add_argument("--workers", type=int, default=0, metavar="N",
+                        help="Run tests and scene checks in N persistent headless Godot workers")
+    parser.add_argument("--shards", type=int, default=0, metavar="N",
+                        help="Split test scripts across N headless workers, balanced by past durations")
+    parser.add_argument("--fail-fast", action="store_true", help="With --shards, stop all shards on the first failure")
+    parser.add_argument("--junit", metavar="FILE", help="With --shards, write merged JUnit XML")
+    parser.add_argument("--json", metavar="FILE", help="With --shards, write merged GUT JSON results")
+    parser.add_argument("--query", nargs=2, metavar=("KIND", "NAME"),
+                        help="Query the project index: scenes-using SCRIPT, extends BASE or emitters SIGNAL")
     
     args = parser.parse_args()
     
+    assistant = None
     try:
-        assistant = GodotAIAssistant(args.project_root, args.godot)
+        assistant = GodotAIAssistant(args.project_root, args.godot, args.timeout)
+        if args.workers:
+            pool = assistant.worker_pool(args.workers)
+            print(f"[*] Worker pool: {pool.size} headless Godot process(es)")
         
         if args.info:
             info = assistant.get_project_info()
@@ -177,15 +361,24 @@ def main():
                 print(f"   {key}: {value}")
             print("="*60)
         
-        elif args.reimport:
-            assistant.reimport_resources()
+        elif args.query:
+            for row in assistant.query_index(*args.query):
+                print("   " + "  ".join(f"{k}={v}" for k, v in row.items() if v is not None))
         
         elif args.run:
             assistant.run_scene(args.run)
         
-        elif args.test:
-            test_path = args.test if isinstance(args.test, str) else None
-            assistant.run_tests(test_path)
+        elif args.reimport or args.test or args.check_scene:
+            ok = True
+            if args.reimport:
+                ok = assistant.reimport_resources()
+            if args.test:
+                test_path = args.test if isinstance(args.test, str) else None
+                ok = assistant.run_tests(test_path, args.shards, args.fail_fast, args.junit, args.json) and ok
+            if args.check_scene:
+                ok = assistant.check_scenes(args.check_scene) and ok
+            if not ok:
+                sys.exit(1)
         
         else:
             print("Godot AI Assistant - No action specified")
@@ -198,6 +391,9 @@ def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        if assistant is not None:
+            assistant.close()
 
 
 if __name__ == "__main__":
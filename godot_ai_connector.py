@@ -8,12 +8,15 @@ This script provides utilities to analyze, parse, and understand Godot project s
 import os
 import sys
 import json
-import re
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from collections import defaultdict
 
+from gdscript_outline import parse_source
+from godot_project_index import ProjectIndex
+from godot_resource import SceneGraph, SceneLoader
+
 # Fix Windows console encoding
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
@@ -57,26 +60,105 @@ class GodotScene:
 class GodotProjectAnalyzer:
     """Analyzes Godot project structure and provides insights"""
     
-    def __init__(self, project_root: str):
+    def __init__(self, project_root: str, index_path: Optional[str] = None):
         self.project_root = Path(project_root)
         self.project_file = self.project_root / "project.godot"
+        self.index_path = index_path
         self.scripts: List[GodotScript] = []
         self.scenes: List[GodotScene] = []
         self.project_config: Dict[str, Any] = {}
+        self._index: Optional[ProjectIndex] = None
+        self._scene_loader = SceneLoader(self.project_root)
         
         if not self.project_file.exists():
             raise FileNotFoundError(f"No project.godot found at {self.project_root}")
     
+    @property
+    def index(self) -> ProjectIndex:
+        """Persistent project index, brought up to date on first use"""
+        if self._index is None:
+            self._index = ProjectIndex(str(self.project_root), self.index_path)
+            self._index.update(verbose=True)
+        return self._index
+    
     def analyze(self) -> Dict[str, Any]:
         """Run full project analysis"""
         print(f"[*] Analyzing Godot project at: {self.project_root}")
         
         self._parse_project_config()
-        self._scan_scripts()
-        self._scan_scenes()
+        self._load_from_index()
         
         return self.get_summary()
     
+    def _load_from_index(self):
+        """Fill scripts and scenes from the index; only changed files are re-parsed"""
+        print("[+] Updating project index...")
+        index = self.index
+        
+        self.scripts = [GodotScript(path=self._local_path(s['path']), name=s['name'],
+                                    extends=s['extends'], class_name=s['class_name'],
+                                    functions=s['functions'], signals=s['signals'],
+                                    exports=s['exports'])
+                        for s in index.scripts()]
+        self.scenes = [GodotScene(path=self._local_path(s['path']), name=s['name'],
+                                  root_node=s['root_type'], script=s['root_script'],
+                                  children=s['children'])
+                       for s in index.scenes()]
+        
+        print(f"   ✓ Found {len(self.scripts)} scripts")
+        print(f"   ✓ Found {len(self.scenes)} scenes")
+    
+    def _local_path(self, res_path: str) -> str:
+        return str(Path(res_path[len("res://"):]))
+    
+    # --- Index queries ---
+    
+    def scenes_using_script(self, script: str) -> List[Dict]:
+        """Scenes (and nodes) that attach a script; accepts res:// path, path, class_name or stem"""
+        return self.index.scenes_using_script(script)
+    
+    def scripts_extending(self, base: str, transitive: bool = True) -> List[Dict]:
+        """Scripts extending a built-in type, class_name or script path"""
+        return self.index.scripts_extending(base, transitive)
+    
+    def signal_emitters(self, signal: str) -> List[Dict]:
+        """Code locations that emit a signal"""
+        return self.index.signal_emitters(signal)
+    
+    def scene_graph(self, scene_path: str) -> Optional[SceneGraph]:
+        """
+        Full typed graph of a .tscn/.tres (nodes with parent paths, ext/sub
+        resources, properties, connections). Instanced sub-scenes are parsed
+        lazily through the same cache, e.g. graph.walk(expand_instances=True).
+        """
+        if not scene_path.startswith("res://"):
+            scene_path = "res://" + Path(scene_path).as_posix()
+        return self._scene_loader.load(scene_path)
+    
+    def function_sources(self) -> List[Dict[str, Any]]:
+        """
+        Source text of every function in the indexed scripts, in file order:
+        {path, function, line, end_line, source} with 1-based inclusive lines.
+        Declarations before the first function come through as "<header>".
+        """
+        functions = []
+        for script in self.index.scripts():
+            path = script['path']
+            local = self.project_root / path[len("res://"):]
+            try:
+                lines = local.read_text(encoding='utf-8', errors='replace').splitlines()
+            except OSError:
+                continue
+            outline = parse_source('\n'.join(lines), path)
+            spans = [(f.name, f.line, f.end_line) for f in outline.functions()]
+            header_end = (spans[0][1] - 1) if spans else len(lines)
+            if any(line.strip() for line in lines[:header_end]):
+                spans.insert(0, ("<header>", 1, header_end))
+            for name, start, end in spans:
+                functions.append({"path": path, "function": name, "line": start, "end_line": end,
+                                  "source": '\n'.join(lines[start - 1:end])})
+        return functions
+    
     def _parse_project_config(self):
         """Parse project.godot configuration file"""
         print("[+] Parsing project configuration...")
@@ -99,102 +181,6 @@ class GodotProjectAnalyzer:
         print(f"   ✓ Project: {self.project_config.get('application', {}).get('config/name', 'Unknown')}")
         print(f"   ✓ Godot Version: {self.project_config.get('application', {}).get('config/features', 'Unknown')}")
     
-    def _scan_scripts(self):
-        """Scan all GDScript files in the project"""
-        print("[+] Scanning GDScript files...")
-        
-        script_files = list(self.project_root.rglob("*.gd"))
-        
-        for script_path in script_files:
-            script = self._parse_script(script_path)
-            if script:
-                self.scripts.append(script)
-        
-        print(f"   ✓ Found {len(self.scripts)} scripts")
-    
-    def _parse_script(self, script_path: Path) -> Optional[GodotScript]:
-        """Parse a single GDScript file"""
-        try:
-            with open(script_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            script = GodotScript(
-                path=str(script_path.relative_to(self.project_root)),
-                name=script_path.stem
-            )
-            
-            # Parse extends
-            extends_match = re.search(r'extends\s+(\w+)', content)
-            if extends_match:
-                script.extends = extends_match.group(1)
-            
-            # Parse class_name
-            class_name_match = re.search(r'class_name\s+(\w+)', content)
-            if class_name_match:
-                script.class_name = class_name_match.group(1)
-            
-            # Parse functions
-            func_pattern = r'func\s+(\w+)\s*\('
-            script.functions = re.findall(func_pattern, content)
-            
-            # Parse signals
-            signal_pattern = r'signal\s+(\w+)'
-            script.signals = re.findall(signal_pattern, content)
-            
-            # Parse exports
-            export_pattern = r'@export\s+var\s+(\w+)'
-            script.exports = re.findall(export_pattern, content)
-            
-            return script
-            
-        except Exception as e:
-            print(f"   ⚠ Error parsing {script_path}: {e}")
-            return None
-    
-    def _scan_scenes(self):
-        """Scan all scene files in the project"""
-        print("[+] Scanning scene files...")
-        
-        scene_files = list(self.project_root.rglob("*.tscn"))
-        
-        for scene_path in scene_files:
-            scene = self._parse_scene(scene_path)
-            if scene:
-                self.scenes.append(scene)
-        
-        print(f"   ✓ Found {len(self.scenes)} scenes")
-    
-    def _parse_scene(self, scene_path: Path) -> Optional[GodotScene]:
-        """Parse a single scene file"""
-        try:
-            with open(scene_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            scene = GodotScene(
-                path=str(scene_path.relative_to(self.project_root)),
-                name=scene_path.stem
-            )
-            
-            # Parse root node type
-            root_match = re.search(r'\[node name="[^"]*" type="([^"]+)"\]', content)
-            if root_match:
-                scene.root_node = root_match.group(1)
-            
-            # Parse attached script
-            script_match = re.search(r'script\s*=\s*ExtResource\([^)]+\)', content)
-            if script_match:
-                scene.script = script_match.group(0)
-            
-            # Parse child nodes
-            child_pattern = r'\[node name="([^"]+)"'
-            scene.children = re.findall(child_pattern, content)[1:]  # Skip root
-            
-            return scene
-            
-        except Exception as e:
-            print(f"   ⚠ Error parsing {scene_path}: {e}")
-            return None
-    
     def get_summary(self) -> Dict[str, Any]:
         """Get comprehensive project summary"""
         return {
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Godot Dependency Graph
+Resource dependency graph built from ext_resource paths/uids in .tscn/.tres,
+preload/load calls and res:// literals in .gd (both taken from the project
+index) and the autoloads, main scene and plugins named in project.godot.
+
+Reports unreferenced assets, dependency fan-in/fan-out and the transitive
+closure of a scene. Batch pipelines use unused_files() to skip dead assets.
+
+Usage:
+    python godot_dependencies.py                       (summary + unreferenced assets)
+    python godot_dependencies.py --scene res://scenes/enemies/turret.tscn
+    python godot_dependencies.py --json deps.json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from godot_project_index import ProjectIndex, SKIP_DIRS
+
+# Files that count as project assets (graph nodes)
+ASSET_SUFFIXES = ('.png', '.jpg', '.jpeg', '.webp', '.svg', '.bmp', '.tga', '.exr', '.hdr',
+                  '.wav', '.ogg', '.mp3', '.ttf', '.otf', '.woff', '.woff2', '.fnt',
+                  '.gd', '.tscn', '.tres', '.gdshader', '.shader', '.gdshaderinc',
+                  '.glb', '.gltf', '.obj')
+
+# Directories loaded without explicit references (editor plugins, GUT test discovery)
+ROOT_DIRS = ('addons', 'tests')
+
+_UID = re.compile(r'uid="(uid://[^"]+)"')
+_PROJECT_REF = re.compile(r'"\*?((?:res|uid)://[^"]+)"')
+
+
+class DependencyGraph:
+    """Directed graph of res:// paths: an edge A -> B means A loads B"""
+
+    def __init__(self, project_root: str, index: Optional[ProjectIndex] = None):
+        self.project_root = Path(project_root)
+        self.index = index or ProjectIndex(str(self.project_root))
+        self.assets: Set[str] = set()
+        self.uids: Dict[str, str] = {}
+        self.roots: Set[str] = set()
+        self.forward: Dict[str, Set[str]] = defaultdict(set)
+        self.reverse: Dict[str, Set[str]] = defaultdict(set)
+        self.missing: List[tuple] = []       # (source, unresolved target)
+
+    def build(self) -> 'DependencyGraph':
+        self.index.update()
+        self._discover()
+        self._add_project_roots()
+
+        for ref in self.index.ext_references():
+            target = self._resolve(ref["path"], ref["uid"])
+            self._add_edge(ref["file"], target or ref["path"] or ref["uid"])
+        for ref in self.index.script_references():
+            target = self._resolve(ref["target"])
+            # Bare string literals are only evidence when they name a real file
+            if ref["kind"] != 'string' or target in self.assets:
+                self._add_edge(ref["script"], target or ref["target"])
+
+        # Globally registered classes are used by name, not by path
+        self.roots.update(s["path"] for s in self.index.scripts() if s["class_name"])
+        return self
+
+    def _discover(self):
+        root = self.project_root
+        for dirpath, dirnames, filenames in os.walk(root):
+            # Godot ignores hidden directories and any directory holding a .gdignore
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith('.')
+                           and not (Path(dirpath) / d / '.gdignore').exists()]
+            rel_dir = Path(dirpath).relative_to(root).as_posix()
+            prefix = "res://" if rel_dir == '.' else f"res://{rel_dir}/"
+            in_root_dir = rel_dir.split('/')[0] in ROOT_DIRS
+
+            for filename in filenames:
+                res = prefix + filename
+                path = Path(dirpath) / filename
+                if filename.endswith('.import'):
+                    self._read_uid(path, res[:-len('.import')])
+                elif filename.endswith('.uid'):
+                    uid = path.read_text(encoding='utf-8', errors='replace').strip()
+                    self.uids[uid] = res[:-len('.uid')]
+                elif filename.endswith(ASSET_SUFFIXES):
+                    self.assets.add(res)
+                    if in_root_dir:
+                        self.roots.add(res)
+                    if filename.endswith(('.tscn', '.tres')):
+                        self._read_uid(path, res, first_line_only=True)
+
+    def _read_uid(self, path: Path, res: str, first_line_only: bool = False):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.readline() if first_line_only else f.read()
+        m = _UID.search(text)
+        if m:
+            self.uids[m.group(1)] = res
+
+    def _add_project_roots(self):
+        project_file = self.project_root / "project.godot"
+        if not project_file.exists():
+            return
+        text = project_file.read_text(encoding='utf-8')
+        for target in _PROJECT_REF.findall(text):
+            resolved = self._resolve(target) or target
+            self.roots.add(resolved)
+            if resolved.endswith('plugin.cfg'):
+                # An enabled plugin loads everything in its directory
+                plugin_dir = resolved.rsplit('/', 1)[0] + '/'
+                self.roots.update(a for a in self.assets if a.startswith(plugin_dir))
+
+    def _resolve(self, path: Optional[str], uid: Optional[str] = None) -> Optional[str]:
+        """Existing res:// path for a reference; uid wins when the path is stale"""
+        if path and path.startswith('uid://'):
+            path, uid = None, path
+        if path and path in self.assets:
+            return path
+        if uid and uid in self.uids:
+            return self.uids[uid]
+        return path if path and (self.project_root / path[len("res://"):]).exists() else None
+
+    def _add_edge(self, source: str, target: str):
+        if target not in self.assets and not (self.project_root / target.replace("res://", "", 1)).exists():
+            self.missing.append((source, target))
+            return
+        self.forward[source].add(target)
+        self.reverse[target].add(source)
+
+    # --- Queries ---
+
+    def fan_in(self, res: str) -> int:
+        return len(self.reverse.get(res, ()))
+
+    def fan_out(self, res: str) -> int:
+        return len(self.forward.get(res, ()))
+
+    def closure(self, start: Iterable[str]) -> Set[str]:
+        """Everything transitively loaded by the start resources (start included)"""
+        seen = set()
+        queue = deque([start] if isinstance(start, str) else start)
+        while queue:
+            res = queue.popleft()
+            if res in seen:
+                continue
+            seen.add(res)
+            queue.extend(self.forward.get(res, ()))
+        return seen
+
+    def unreferenced(self, suffixes: Optional[Iterable[str]] = None) -> List[str]:
+        """Assets nothing references, excluding roots; optionally filtered by suffix"""
+        suffixes = tuple(suffixes) if suffixes else ASSET_SUFFIXES
+        return sorted(a for a in self.assets
+                      if a.endswith(suffixes) and a not in self.roots and not self.reverse.get(a))
+
+    def unreachable(self) -> List[str]:
+        """Assets not transitively loaded from any root (main scene, autoloads, plugins)"""
+        live = self.closure(self.roots)
+        return sorted(a for a in self.assets if a not in live)
+
+    def top(self, by: str = 'in', limit: int = 10) -> List[tuple]:
+        table = self.reverse if by == 'in' else self.forward
+        ranked = sorted(((len(v), k) for k, v in table.items() if v), key=lambda t: (-t[0], t[1]))
+        return [(k, n) for n, k in ranked[:limit]]
+
+    def to_dict(self) -> Dict:
+        return {
+            "assets": len(self.assets),
+            "edges": sum(len(v) for v in self.forward.values()),
+            "roots": sorted(self.roots),
+            "unreferenced": self.unreferenced(),
+            "unreachable": self.unreachable(),
+            "missing": [{"source": s, "target": t} for s, t in self.missing],
+            "fan_in": {k: len(v) for k, v in sorted(self.reverse.items())},
+            "fan_out": {k: len(v) for k, v in sorted(self.forward.items())},
+        }
+
+
+def unused_files(project_root, suffixes: Iterable[str] = ('.png',)) -> Set[Path]:
+    """Absolute paths of unreferenced assets, for batch pipelines to skip"""
+    project_root = Path(project_root)
+    graph = DependencyGraph(str(project_root)).build()
+    return {(project_root / res[len("res://"):]).resolve() for res in graph.unreferenced(suffixes)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resource dependency graph and unused-asset report')
+    parser.add_argument('project_root', nargs='?', default=os.getcwd(), help='Project root')
+    parser.add_argument('--scene', action='append', default=[],
+                        help='Print the transitive closure of a scene/resource (repeatable)')
+    parser.add_argument('--suffix', action='append',
+                        help='Only report unreferenced assets with this suffix, e.g. .png (repeatable)')
+    parser.add_argument('--top', type=int, default=10, help='Rows in the fan-in/fan-out tables')
+    parser.add_argument('--json', metavar='FILE', help='Write the full report as JSON')
+    args = parser.parse_args()
+
+    if not (Path(args.project_root) / "project.godot").exists():
+        print(f"[ERROR] No project.godot found at {args.project_root}")
+        sys.exit(1)
+
+    graph = DependencyGraph(args.project_root).build()
+    unreferenced = graph.unreferenced(args.suffix)
+
+    print("=" * 60)
+    print("DEPENDENCY GRAPH")
+    print("=" * 60)
+    print(f"   Assets: {len(graph.assets)}  Edges: {sum(len(v) for v in graph.forward.values())}  "
+          f"Roots: {len(graph.roots)}")
+
+    print(f"\nMost depended on (fan-in):")
+    for res, n in graph.top('in', args.top):
+        print(f"   {n:4}  {res}")
+    print(f"\nMost dependencies (fan-out):")
+    for res, n in graph.top('out', args.top):
+        print(f"   {n:4}  {res}")
+
+    for scene in args.scene:
+        scene = scene if scene.startswith("res://") else "res://" + Path(scene).as_posix()
+        deps = sorted(graph.closure(scene) - {scene})
+        print(f"\nTransitive closure of {scene} ({len(deps)}):")
+        for res in deps:
+            print(f"   {res}")
+
+    if graph.missing:
+        print(f"\n[WARN] {len(graph.missing)} reference(s) to missing files:")
+        for source, target in graph.missing:
+            print(f"   {source} -> {target}")
+
+    print(f"\nUnreferenced assets ({len(unreferenced)}):")
+    for res in unreferenced:
+        print(f"   {res}")
+    print("=" * 60)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(graph.to_dict(), f, indent=2)
+        print(f"[OK] Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Godot Process Runner
+Runs a Godot command line as an asyncio subprocess and streams its stdout
+and stderr line by line instead of buffering everything until exit. Lines
+are parsed into structured events as they arrive:
+
+    progress  editor import/scan steps   "[ 40% ] reimport | res://icon.svg"
+    done      end of an editor task      "[ DONE ] reimport"
+    script    GUT started a test script  "res://tests/unit/test_x.gd"
+    test      GUT started a test         "* test_takes_damage"
+    failed / pending / risky             GUT result lines
+    summary   GUT grand total            "---- All tests passed! ----"
+    error     engine and script errors   "ERROR: ...", "SCRIPT ERROR: ..."
+
+Memory stays flat: only the last lines of each stream and the first errors
+are kept, and over-long lines are truncated. Each editor task and the GUT
+run are timed as phases. On timeout (total, or no output for idle_timeout)
+the whole process group is terminated, then killed after a grace period.
+
+Usage:
+    run = run_godot([godot, "--headless", "--path", ".", "--import"], timeout=600,
+                    on_event=print)
+    print(run.returncode, run.phases)
+
+    python godot_process.py --timeout 600 -- godot --headless --path . --import
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import signal
+import subprocess
+import sys
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+    sys.stderr.reconfigure(encoding='utf-8')
+
+TAIL_LINES = 200            # Lines kept per stream for the caller
+MAX_ERRORS = 50             # Error lines kept in GodotRun.errors
+MAX_LINE = 8192             # Bytes kept of a single line
+READ_SIZE = 64 * 1024
+KILL_GRACE = 5.0            # Seconds between terminate and kill
+
+EventCallback = Callable[[Dict[str, Any]], None]
+
+_ANSI_RE = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+_PROGRESS_RE = re.compile(r'^\[\s*(\d+)%\s*\]\s*(\S+)\s*\|\s*(.*)$')
+_DONE_RE = re.compile(r'^\[\s*DONE\s*\]\s*(\S+)')
+_SCRIPT_RE = re.compile(r'^(res://\S+\.gd)(?:\.(\w+))?$')
+_TEST_RE = re.compile(r'^\*\s+(\w+)')
+_RESULT_RE = re.compile(r'^\[(Failed|Pending|Risky)\]:?\s*(.*)$')
+_SUMMARY_RE = re.compile(r'^----\s+(.*?)\s+----$')
+_ERROR_RE = re.compile(r'^(?:SCRIPT ERROR|ERROR|USER ERROR|\[ERROR\]):?\s*(.*)$')
+
+GUT_PHASE = "gut"
+
+
+def parse_line(line: str) -> Optional[Dict[str, Any]]:
+    """Structured event for one output line, or None for plain output"""
+    text = line.strip()
+    if not text:
+        return None
+    match = _PROGRESS_RE.match(text)
+    if match:
+        return {"type": "progress", "percent": int(match.group(1)), "task": match.group(2),
+                "step": match.group(3)}
+    match = _DONE_RE.match(text)
+    if match:
+        return {"type": "done", "task": match.group(1)}
+    match = _SCRIPT_RE.match(text)
+    if match:
+        return {"type": "script", "path": match.group(1), "inner": match.group(2)}
+    match = _TEST_RE.match(text)
+    if match:
+        return {"type": "test", "name": match.group(1)}
+    match = _RESULT_RE.match(text)
+    if match:
+        return {"type": match.group(1).lower(), "text": match.group(2)}
+    match = _SUMMARY_RE.match(text)
+    if match:
+        return {"type": "summary", "text": match.group(1)}
+    match = _ERROR_RE.match(text)
+    if match:
+        return {"type": "error", "text": match.group(1)}
+    return None
+
+
+@dataclass
+class GodotRun:
+    """Outcome of one Godot command; duck-compatible with CompletedProcess"""
+    cmd: List[str]
+    returncode: Optional[int] = None
+    timed_out: bool = False
+    seconds: float = 0.0
+    phases: Dict[str, float] = field(default_factory=dict)
+    stdout_tail: deque = field(default_factory=lambda: deque(maxlen=TAIL_LINES))
+    stderr_tail: deque = field(default_factory=lambda: deque(maxlen=TAIL_LINES))
+    errors: List[str] = field(default_factory=list)
+    counts: Counter = field(default_factory=Counter)     # Events by type
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+    @property
+    def stdout(self) -> str:
+        return "\n".join(self.stdout_tail)
+
+    @property
+    def stderr(self) -> str:
+        return "\n".join(self.stderr_tail)
+
+    @property
+    def failure(self) -> str:
+        """Why the command failed, in one line: timeout, or exit code and first error"""
+        if self.timed_out:
+            return f"timed out after {self.seconds:.0f}s"
+        detail = self.errors[0] if self.errors else (self.stderr_tail[-1] if self.stderr_tail else "")
+        return f"exit code {self.returncode}" + (f": {detail}" if detail else "")
+
+    def phase_summary(self) -> str:
+        return ", ".join(f"{name} {seconds:.1f}s" for name, seconds in self.phases.items())
+
+
+class _Phases:
+    """Wall-clock spans keyed by name; a phase runs from begin() to end()"""
+
+    def __init__(self):
+        self.open: Dict[str, float] = {}
+        self.done: Dict[str, float] = {}
+
+    def begin(self, name: str, now: float):
+        if name not in self.open:
+            self.open[name] = now
+
+    def end(self, name: str, now: float):
+        began = self.open.pop(name, None)
+        if began is not None:
+            self.done[name] = self.done.get(name, 0.0) + now - began
+
+    def close(self, now: float) -> Dict[str, float]:
+        for name in list(self.open):
+            self.end(name, now)
+        return self.done
+
+
+async def _read_lines(stream: asyncio.StreamReader, handle: Callable[[str], None]):
+    """Feed complete lines to handle; at most MAX_LINE bytes of any line are buffered"""
+    def decode(raw: bytes) -> str:
+        return raw[:MAX_LINE].decode('utf-8', errors='replace').rstrip("\r")
+
+    pending = b""
+    skipping = False        # Inside the tail of a line that was already cut short
+    while True:
+        block = await stream.read(READ_SIZE)
+        if not block:
+            break
+        lines = (pending + block).split(b"\n")
+        pending = lines.pop()
+        for raw in lines:
+            if skipping:
+                skipping = False
+                continue
+            handle(decode(raw))
+        if len(pending) > MAX_LINE and not skipping:
+            handle(decode(pending) + " …")
+            skipping = True
+        if skipping:
+            pending = b""
+    if pending and not skipping:
+        handle(decode(pending))
+
+
+def _kill_group(process: asyncio.subprocess.Process, force: bool):
+    if process.returncode is not None:
+        return
+    try:
+        if sys.platform == 'win32':
+            # /T takes the whole tree down; there is no graceful variant for console apps
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True)
+        else:
+            os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def run_godot_async(cmd: List[str], timeout: Optional[float] = None,
+                          idle_timeout: Optional[float] = None,
+                          on_event: Optional[EventCallback] = None,
+                          on_line: Optional[Callable[[str, str], None]] = None,
+                          cwd: Optional[str] = None) -> GodotRun:
+    """
+    Run cmd to completion, streaming output. on_line(stream, text) sees every
+    line; on_event sees parsed events with "time" (seconds since start) added.
+    """
+    run = GodotRun(list(cmd))
+    start = time.perf_counter()
+    phases = _Phases()
+    last_output = [start]
+
+    if sys.platform == 'win32':
+        group = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        group = {"start_new_session": True}
+    process = await asyncio.create_subprocess_exec(
+        *cmd, stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE, cwd=cwd, **group)
+    phases.begin("startup", start)
+
+    def handler(stream: str, tail: deque):
+        def handle(line: str):
+            now = time.perf_counter()
+            last_output[0] = now
+            text = _ANSI_RE.sub("", line)
+            tail.append(text)
+            if on_line:
+                on_line(stream, text)
+            event = parse_line(text)
+            if event is None:
+                return
+            phases.end("startup", now)
+            kind = event["type"]
+            run.counts[kind] += 1
+            if kind == "progress":
+                phases.begin(event["task"], now)
+            elif kind == "done":
+                phases.end(event["task"], now)
+            elif kind == "script":
+                phases.begin(GUT_PHASE, now)
+            elif kind == "summary":
+                phases.end(GUT_PHASE, now)
+            elif kind == "error" and len(run.errors) < MAX_ERRORS:
+                run.errors.append(event["text"])
+            if on_event:
+                event["time"] = now - start
+                on_event(event)
+        return handle
+
+    readers = asyncio.gather(_read_lines(process.stdout, handler("stdout", run.stdout_tail)),
+                             _read_lines(process.stderr, handler("stderr", run.stderr_tail)))
+    deadline = start + timeout if timeout else None
+    try:
+        while True:
+            now = time.perf_counter()
+            waits = [1.0]
+            if deadline:
+                waits.append(deadline - now)
+            if idle_timeout:
+                waits.append(last_output[0] + idle_timeout - now)
+            if min(waits) <= 0:
+                run.timed_out = True
+                break
+            done, _ = await asyncio.wait({readers}, timeout=min(waits))
+            if done:
+                break
+        if run.timed_out:
+            _kill_group(process, force=False)
+            try:
+                await asyncio.wait_for(process.wait(), KILL_GRACE)
+            except asyncio.TimeoutError:
+                _kill_group(process, force=True)
+        await readers
+        run.returncode = await process.wait()
+    finally:
+        if process.returncode is None:
+            _kill_group(process, force=True)
+            await process.wait()
+        readers.cancel()
+
+    end = time.perf_counter()
+    run.seconds = end - start
+    run.phases = phases.close(end)
+    return run
+
+
+def run_godot(cmd: List[str], **kwargs) -> GodotRun:
+    """Blocking wrapper around run_godot_async"""
+    return asyncio.run(run_godot_async(cmd, **kwargs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a Godot command with streamed, parsed output")
+    parser.add_argument("--timeout", type=float, help="Kill after this many seconds")
+    parser.add_argument("--idle-timeout", type=float, help="Kill after this many seconds without output")
+    parser.add_argument("--events", action="store_true", help="Print parsed events instead of raw lines")
+    parser.add_argument("cmd", nargs=argparse.REMAINDER, help="Command, after --")
+    args = parser.parse_args()
+    cmd = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+    if not cmd:
+        parser.error("no command given")
+
+    if args.events:
+        run = run_godot(cmd, timeout=args.timeout, idle_timeout=args.idle_timeout,
+                        on_event=lambda e: print(f"   {e.pop('time'):7.2f}s  {e}"))
+    else:
+        run = run_godot(cmd, timeout=args.timeout, idle_timeout=args.idle_timeout,
+                        on_line=lambda stream, text: print(text, file=sys.stderr if stream == "stderr" else sys.stdout))
+    status = "timed out" if run.timed_out else f"exit {run.returncode}"
+    print(f"\n[*] {status} after {run.seconds:.1f}s; phases: {run.phase_summary() or 'none'}")
+    sys.exit(0 if run.ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Godot Project Index
+Persistent SQLite index of a Godot project: scripts, functions, signals,
+exports, signal emits, scenes, nodes, ext_resources and connections.
+Files are re-parsed only when their mtime/size changed and their content
+hash no longer matches, so repeated lookups on large projects stay in the
+millisecond range.
+
+Usage:
+    python godot_project_index.py [--root DIR] stats
+    python godot_project_index.py scenes-using res://scripts/player/player.gd
+    python godot_project_index.py extends CharacterBody2D
+    python godot_project_index.py emitters health_changed
+"""
+
+import argparse
+import hashlib
+import os
+import posixpath
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from gdscript_outline import parse_source, LINE_CODE, LINE_CONTINUATION
+from godot_resource import iter_sections, parse_value, ResourceRef, SceneGraph
+
+INDEX_FILE = ".project_index.db"
+
+# Bump whenever the schema or what gets extracted changes; the index is rebuilt
+SCHEMA_VERSION = 3
+
+INDEXED_SUFFIXES = ('.gd', '.tscn', '.tres')
+SKIP_DIRS = ('.godot', '.git', '.import')
+
+SCHEMA = """
+CREATE TABLE files (
+    path TEXT PRIMARY KEY,          -- res:// path
+    kind TEXT NOT NULL,             -- script, scene, resource
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE scripts (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    class_name TEXT,
+    extends TEXT
+);
+CREATE TABLE functions (script TEXT NOT NULL, name TEXT NOT NULL, line INTEGER, static INTEGER, returns TEXT);
+CREATE TABLE signals (script TEXT NOT NULL, name TEXT NOT NULL, line INTEGER);
+CREATE TABLE exports (script TEXT NOT NULL, name TEXT NOT NULL, type TEXT, line INTEGER);
+CREATE TABLE emits (script TEXT NOT NULL, signal TEXT NOT NULL, target TEXT, line INTEGER);
+CREATE TABLE script_refs (
+    script TEXT NOT NULL,
+    target TEXT NOT NULL,           -- res:// (relative paths resolved) or uid://
+    kind TEXT NOT NULL,             -- preload, load, string
+    line INTEGER
+);
+CREATE TABLE scenes (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    root_type TEXT,
+    root_script TEXT
+);
+CREATE TABLE nodes (
+    scene TEXT NOT NULL,
+    path TEXT NOT NULL,             -- Node path relative to the scene root ("." for the root)
+    name TEXT NOT NULL,
+    type TEXT,
+    parent TEXT,
+    script TEXT,                    -- res:// path of the attached script
+    instance TEXT,                  -- res:// path of an instanced scene
+    groups TEXT                     -- Comma-separated group names
+);
+CREATE TABLE ext_resources (file TEXT NOT NULL, id TEXT, type TEXT, path TEXT, uid TEXT);
+CREATE TABLE connections (scene TEXT NOT NULL, signal TEXT, from_node TEXT, to_node TEXT, method TEXT);
+CREATE TABLE resources (path TEXT PRIMARY KEY, type TEXT, script TEXT);
+
+CREATE INDEX idx_scripts_extends ON scripts(extends);
+CREATE INDEX idx_scripts_class ON scripts(class_name);
+CREATE INDEX idx_functions_script ON functions(script);
+CREATE INDEX idx_signals_name ON signals(name);
+CREATE INDEX idx_exports_script ON exports(script);
+CREATE INDEX idx_emits_signal ON emits(signal);
+CREATE INDEX idx_script_refs_target ON script_refs(target);
+CREATE INDEX idx_nodes_scene ON nodes(scene);
+CREATE INDEX idx_nodes_script ON nodes(script);
+CREATE INDEX idx_nodes_instance ON nodes(instance);
+CREATE INDEX idx_ext_file ON ext_resources(file);
+CREATE INDEX idx_ext_path ON ext_resources(path);
+CREATE INDEX idx_connections_signal ON connections(signal);
+"""
+
+# Tables keyed by the file they were extracted from
+_FILE_TABLES = (('scripts', 'path'), ('functions', 'script'), ('signals', 'script'),
+                ('exports', 'script'), ('emits', 'script'), ('script_refs', 'script'), ('scenes', 'path'),
+                ('nodes', 'scene'), ('ext_resources', 'file'), ('connections', 'scene'),
+                ('resources', 'path'))
+
+# preload("..."), load("..."), ResourceLoader.load("...") or any "res://..." literal
+_RESOURCE_REF = re.compile(r'\b(ResourceLoader\.load|preload|load)\(\s*["\']([^"\']+)["\']|["\']((?:res|uid)://[^"\']+)["\']')
+
+# signal_name.emit(...), owner.signal_name.emit(...), emit_signal("signal_name", ...)
+_EMIT = re.compile(r'(?:\b(\w+)\.)?\b(\w+)\.emit\(|\bemit_signal\(\s*["\'](\w+)["\']')
+
+class ProjectIndex:
+    """Incrementally updated SQLite index of a Godot project"""
+
+    def __init__(self, project_root: str, index_path: Optional[str] = None):
+        self.project_root = Path(project_root)
+        self.index_path = Path(index_path) if index_path else self.project_root / INDEX_FILE
+        self.db = sqlite3.connect(str(self.index_path))
+        self.db.row_factory = sqlite3.Row
+        self._ensure_schema()
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _ensure_schema(self):
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version == SCHEMA_VERSION:
+            return
+        # Unknown or old layout: rebuild from scratch
+        tables = [r[0] for r in self.db.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+        with self.db:
+            for table in tables:
+                self.db.execute(f"DROP TABLE IF EXISTS {table}")
+            self.db.executescript(SCHEMA)
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # --- Paths ---
+
+    def res_path(self, path: Path) -> str:
+        return "res://" + path.relative_to(self.project_root).as_posix()
+
+    def _resolve_script(self, script: str) -> Optional[str]:
+        """Accept a res:// path, a project-relative path, a class_name or a file stem"""
+        if script.startswith("res://"):
+            return script
+        if script.endswith(".gd"):
+            root = Path(os.path.abspath(self.project_root))
+            try:
+                return "res://" + Path(os.path.normpath(root / script)).relative_to(root).as_posix()
+            except ValueError:
+                return None     # Outside the project
+        row = self.db.execute("SELECT path FROM scripts WHERE class_name = ? OR name = ? "
+                              "ORDER BY class_name IS NULL LIMIT 1", (script, script)).fetchone()
+        return row["path"] if row else None
+
+    # --- Update ---
+
+    def _discover(self) -> List[Path]:
+        found = []
+        for dirpath, dirnames, filenames in os.walk(self.project_root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            for filename in sorted(filenames):
+                if filename.endswith(INDEXED_SUFFIXES):
+                    found.append(Path(dirpath) / filename)
+        return found
+
+    def update(self, verbose: bool = False) -> Dict[str, int]:
+        """
+        Bring the index in line with the files on disk. Unchanged files
+        (same mtime and size, or same content hash) are not re-parsed.
+        Returns counts of parsed, unchanged and removed files.
+        """
+        start = time.perf_counter()
+        known = {r["path"]: r for r in self.db.execute("SELECT * FROM files")}
+        counts = {"parsed": 0, "unchanged": 0, "removed": 0}
+        seen = set()
+
+        with self.db:
+            for path in self._discover():
+                res = self.res_path(path)
+                seen.add(res)
+                stat = path.stat()
+                row = known.get(res)
+                if row and row["mtime_ns"] == stat.st_mtime_ns and row["size"] == stat.st_size:
+                    counts["unchanged"] += 1
+                    continue
+
+                raw = path.read_bytes()
+                digest = hashlib.sha256(raw).hexdigest()
+                if row and row["sha256"] == digest:
+                    # Touched but identical (checkout, editor save)
+                    self.db.execute("UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?",
+                                    (stat.st_mtime_ns, stat.st_size, res))
+                    counts["unchanged"] += 1
+                    continue
+
+                text = raw.decode('utf-8', errors='replace').replace('\r\n', '\n')
+                self._forget(res)
+                try:
+                    kind = self._index_file(res, path, text)
+                except Exception as e:
+                    print(f"   [WARN] Could not index {res}: {e}")
+                    continue
+                self.db.execute("INSERT INTO files VALUES (?, ?, ?, ?, ?)",
+                                (res, kind, stat.st_mtime_ns, stat.st_size, digest))
+                counts["parsed"] += 1
+
+            for res in set(known) - seen:
+                self._forget(res)
+                counts["removed"] += 1
+
+        if verbose:
+            print(f"[*] Index updated in {(time.perf_counter() - start) * 1000:.1f} ms: "
+                  f"{counts['parsed']} parsed, {counts['unchanged']} unchanged, "
+                  f"{counts['removed']} removed")
+        return counts
+
+    def _forget(self, res: str):
+        self.db.execute("DELETE FROM files WHERE path = ?", (res,))
+        for table, column in _FILE_TABLES:
+            self.db.execute(f"DELETE FROM {table} WHERE {column} = ?", (res,))
+
+    def _index_file(self, res: str, path: Path, text: str) -> str:
+        if path.suffix == '.gd':
+            self._index_script(res, path, text)
+            return "script"
+        self._index_resource_file(res, path, text)
+        return "scene" if path.suffix == '.tscn' else "resource"
+
+    def _index_script(self, res: str, path: Path, text: str):
+        outline = parse_source(text, path.stem)
+        self.db.execute("INSERT INTO scripts VALUES (?, ?, ?, ?)",
+                        (res, path.stem, outline.class_name, outline.extends))
+        self.db.executemany("INSERT INTO functions VALUES (?, ?, ?, ?, ?)",
+                            [(res, f.name, f.line, int(f.static), f.detail or None)
+                             for f in outline.functions()])
+        self.db.executemany("INSERT INTO signals VALUES (?, ?, ?)",
+                            [(res, s.name, s.line) for s in outline.signals()])
+        self.db.executemany("INSERT INTO exports VALUES (?, ?, ?, ?)",
+                            [(res, v.name, v.detail or None, v.line) for v in outline.exports()])
+
+        emits = []
+        refs = []
+        for line_no, line in enumerate(text.split('\n'), 1):
+            if outline.line_kinds[line_no - 1] not in (LINE_CODE, LINE_CONTINUATION):
+                continue
+            if 'emit' in line:
+                for m in _EMIT.finditer(line.split('#', 1)[0]):
+                    if m.group(3):
+                        emits.append((res, m.group(3), None, line_no))
+                    else:
+                        target = m.group(1) if m.group(1) not in (None, 'self') else None
+                        emits.append((res, m.group(2), target, line_no))
+            if 'load(' in line or '://' in line:
+                for m in _RESOURCE_REF.finditer(line):
+                    if m.group(3):
+                        refs.append((res, m.group(3), 'string', line_no))
+                    else:
+                        kind = 'preload' if m.group(1) == 'preload' else 'load'
+                        refs.append((res, self._resolve_relative(res, m.group(2)), kind, line_no))
+        self.db.executemany("INSERT INTO emits VALUES (?, ?, ?, ?)", emits)
+        self.db.executemany("INSERT INTO script_refs VALUES (?, ?, ?, ?)", refs)
+
+    @staticmethod
+    def _resolve_relative(res: str, target: str) -> str:
+        """preload("enemy.tscn") is relative to the script's directory"""
+        if '://' in target:
+            return target
+        base = posixpath.dirname(res[len("res://"):])
+        return "res://" + posixpath.normpath(posixpath.join(base, target))
+
+    def _index_resource_file(self, res: str, path: Path, text: str):
+        # Structure only: property values are not needed for the index
+        graph = SceneGraph.from_sections(res, iter_sections(text.split('\n'), properties=False))
+        self.db.executemany("INSERT INTO ext_resources VALUES (?, ?, ?, ?, ?)",
+                            [(res, e.id, e.type, e.path, e.uid) for e in graph.ext_resources.values()])
+        self.db.executemany("INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            [(res, n.path, n.name, n.type, n.parent, n.script, n.instance,
+                              ','.join(str(g) for g in n.groups) or None) for n in graph.nodes])
+        self.db.executemany("INSERT INTO connections VALUES (?, ?, ?, ?, ?)",
+                            [(res, c.signal, c.from_node, c.to_node, c.method) for c in graph.connections])
+
+        if path.suffix == '.tscn':
+            root = graph.root
+            self.db.execute("INSERT INTO scenes VALUES (?, ?, ?, ?)",
+                            (res, path.stem, root.type if root else None, root.script if root else None))
+        else:
+            script = graph.resource.get('script')
+            ref = parse_value(script) if script else None
+            target = graph.resolve(ref) if isinstance(ref, ResourceRef) else None
+            self.db.execute("INSERT INTO resources VALUES (?, ?, ?)",
+                            (res, graph.type, getattr(target, 'path', None)))
+
+    # --- Queries ---
+
+    def _rows(self, sql: str, params=()) -> List[Dict]:
+        return [dict(r) for r in self.db.execute(sql, params)]
+
+    def scripts(self) -> List[Dict]:
+        """Every script with its functions, signals and exports"""
+        members = {}
+        for table in ('functions', 'signals', 'exports'):
+            for r in self.db.execute(f"SELECT script, name FROM {table} ORDER BY script, line"):
+                members.setdefault((r["script"], table), []).append(r["name"])
+        return [dict(r, functions=members.get((r["path"], 'functions'), []),
+                     signals=members.get((r["path"], 'signals'), []),
+                     exports=members.get((r["path"], 'exports'), []))
+                for r in self.db.execute("SELECT * FROM scripts ORDER BY path")]
+
+    def scenes(self) -> List[Dict]:
+        """Every scene with the names of its non-root nodes"""
+        children = {}
+        for r in self.db.execute("SELECT scene, name FROM nodes WHERE parent IS NOT NULL ORDER BY rowid"):
+            children.setdefault(r["scene"], []).append(r["name"])
+        return [dict(r, children=children.get(r["path"], []))
+                for r in self.db.execute("SELECT * FROM scenes ORDER BY path")]
+
+    def scenes_using_script(self, script: str) -> List[Dict]:
+        """Scenes with a node that has the script attached, and which node"""
+        res = self._resolve_script(script)
+        return self._rows("SELECT scene, path AS node, type FROM nodes WHERE script = ? "
+                          "ORDER BY scene, rowid", (res,))
+
+    def scenes_instancing(self, scene: str) -> List[Dict]:
+        """Scenes that instance the given scene"""
+        res = scene if scene.startswith("res://") else "res://" + Path(scene).as_posix()
+        return self._rows("SELECT scene, path AS node FROM nodes WHERE instance = ? "
+                          "ORDER BY scene, rowid", (res,))
+
+    def nodes_in_group(self, group: str) -> List[Dict]:
+        """Scene nodes added to a group in the editor"""
+        return self._rows("SELECT scene, path AS node, type FROM nodes "
+                          "WHERE instr(',' || groups || ',', ?) > 0 ORDER BY scene, rowid", (f",{group},",))
+
+    def scripts_extending(self, base: str, transitive: bool = True) -> List[Dict]:
+        """
+        Scripts whose extends is base. With transitive, also scripts extending
+        those (by class_name or by res:// path), at any depth.
+        """
+        if not transitive:
+            return self._rows("SELECT path, class_name, extends FROM scripts WHERE extends = ? "
+                              "ORDER BY path", (base,))
+        return self._rows("""
+            WITH RECURSIVE derived(path, class_name) AS (
+                SELECT path, class_name FROM scripts WHERE extends = ?
+                UNION
+                SELECT s.path, s.class_name FROM scripts s
+                JOIN derived d ON s.extends = d.class_name OR s.extends = d.path
+            )
+            SELECT s.path, s.class_name, s.extends FROM scripts s
+            WHERE s.path IN (SELECT path FROM derived) ORDER BY s.path""", (base,))
+
+    def signal_emitters(self, signal: str) -> List[Dict]:
+        """Code locations that emit the signal (signal.emit() or emit_signal())"""
+        return self._rows("SELECT script, line, target FROM emits WHERE signal = ? "
+                          "ORDER BY script, line", (signal,))
+
+    def signal_declarations(self, signal: str) -> List[Dict]:
+        return self._rows("SELECT script, line FROM signals WHERE name = ? ORDER BY script", (signal,))
+
+    def signal_connections(self, signal: str) -> List[Dict]:
+        """Editor-made connections of the signal stored in scenes"""
+        return self._rows("SELECT scene, from_node, to_node, method FROM connections "
+                          "WHERE signal = ? ORDER BY scene, rowid", (signal,))
+
+    def script_references(self) -> List[Dict]:
+        """Every preload/load/string resource reference made from scripts"""
+        return self._rows("SELECT script, target, kind, line FROM script_refs ORDER BY script, line")
+
+    def ext_references(self) -> List[Dict]:
+        """Every ext_resource entry of every scene and resource"""
+        return self._rows("SELECT file, id, type, path, uid FROM ext_resources ORDER BY file, rowid")
+
+    def dependents(self, resource: str) -> List[str]:
+        """Files that reference a resource through an ext_resource or a script preload/load/path"""
+        res = resource if resource.startswith("res://") else "res://" + Path(resource).as_posix()
+        return [r["file"] for r in self.db.execute(
+            "SELECT file FROM ext_resources WHERE path = ? "
+            "UNION SELECT script FROM script_refs WHERE target = ? ORDER BY 1", (res, res))]
+
+    def stats(self) -> Dict[str, int]:
+        tables = ('scripts', 'functions', 'signals', 'exports', 'emits', 'script_refs', 'scenes',
+                  'nodes', 'ext_resources', 'connections', 'resources')
+        return {t: self.db.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in tables}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the persistent Godot project index')
+    parser.add_argument('--root', default=os.getcwd(), help='Project root (default: current directory)')
+    parser.add_argument('--index', help=f'Index database (default: <root>/{INDEX_FILE})')
+    parser.add_argument('query', choices=['stats', 'scenes-using', 'extends', 'emitters', 'dependents'])
+    parser.add_argument('name', nargs='?', help='Script, base class, signal or resource to look up')
+    args = parser.parse_args()
+
+    if args.query != 'stats' and not args.name:
+        parser.error(f"'{args.query}' needs a name")
+
+    with ProjectIndex(args.root, args.index) as index:
+        index.update(verbose=True)
+
+        start = time.perf_counter()
+        if args.query == 'stats':
+            results = [f"{table}: {count}" for table, count in index.stats().items()]
+        elif args.query == 'scenes-using':
+            results = [f"{r['scene']}  ({r['node']}: {r['type'] or 'instance'})"
+                       for r in index.scenes_using_script(args.name)]
+        elif args.query == 'extends':
+            results = [f"{r['path']}" + (f"  class_name {r['class_name']}" if r['class_name'] else '')
+                       + f"  extends {r['extends']}" for r in index.scripts_extending(args.name)]
+        elif args.query == 'emitters':
+            results = [f"{r['script']}:{r['line']}" + (f"  (on {r['target']})" if r['target'] else '')
+                       for r in index.signal_emitters(args.name)]
+            results += [f"{r['scene']}  connects {r['from_node']} -> {r['to_node']}.{r['method']}()"
+                        for r in index.signal_connections(args.name)]
+        else:
+            results = index.dependents(args.name)
+        elapsed = time.perf_counter() - start
+
+    print("=" * 60)
+    for line in results:
+        print(f"   {line}")
+    if not results:
+        print("   (no results)")
+    print("=" * 60)
+    print(f"[OK] {len(results)} result(s) in {elapsed * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Godot Text Resource Parser
+Streaming tokenizer for Godot's text resource format (.tscn / .tres) and a
+compact typed scene graph built on top of it: nodes with parent paths,
+ext/sub resources by id, properties and [connection] entries. Instanced
+sub-scenes are loaded lazily, only when a caller walks into them.
+
+The file is read line by line and property values are kept as raw text until
+asked for, so memory stays proportional to the node count even for
+multi-thousand-node level scenes.
+
+Run directly to inspect or benchmark:
+    python godot_resource.py scenes/enemies/turret.tscn   (print the node tree)
+    python godot_resource.py --bench [paths...]           (default: scenes/ and addons/gut/)
+"""
+
+import re
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+@dataclass
+class ResourceRef:
+    """ExtResource("id") or SubResource("id") as written in a value"""
+    kind: str       # ext, sub
+    id: str
+
+
+@dataclass
+class Constructor:
+    """Any other Name(args) value: Vector2(1, 2), PackedStringArray(...), NodePath(...)"""
+    name: str
+    args: List[Any]
+
+
+@dataclass
+class Section:
+    """One [tag ...] header with the `key = value` lines that follow it"""
+    tag: str
+    attrs: Dict[str, Any]
+    properties: Dict[str, str]      # Raw value text; see parse_value
+    line: int
+
+
+# ---------------------------------------------------------------------------
+# Values
+# ---------------------------------------------------------------------------
+
+_NUMBER = re.compile(r'[-+]?(?:\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?|inf|nan)')
+_IDENT = re.compile(r'[A-Za-z_][\w]*(?:\[[\w]+\])?')
+_SPACE = re.compile(r'\s*')
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '"': '"', '\\': '\\', "'": "'", 'b': '\b', 'f': '\f'}
+_PACKED_NUMBERS = re.compile(r'Packed(?:Int32|Int64|Float32|Float64|Byte|Vector2|Vector3|Color)Array\(([^()"]*)\)\s*$')
+
+
+class _ValueParser:
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def skip(self):
+        self.pos = _SPACE.match(self.text, self.pos).end()
+
+    def peek(self) -> str:
+        self.skip()
+        return self.text[self.pos:self.pos + 1]
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at {self.pos} in {self.text[:60]!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        char = self.peek()
+        if char == '"':
+            return self.string()
+        if char in '&^' and self.text[self.pos + 1:self.pos + 2] == '"':
+            self.pos += 1           # StringName / NodePath literal
+            return self.string()
+        if char == '[':
+            return self.sequence('[', ']')
+        if char == '{':
+            return self.mapping()
+        m = _NUMBER.match(self.text, self.pos)
+        if m and not (m.end() < len(self.text) and (self.text[m.end()].isalnum() or self.text[m.end()] == '_')):
+            self.pos = m.end()
+            number = m.group()
+            return float(number) if any(c in number for c in '.eEn') else int(number)
+        m = _IDENT.match(self.text, self.pos)
+        if not m:
+            raise ValueError(f"Unexpected {self.text[self.pos:self.pos + 20]!r}")
+        self.pos = m.end()
+        name = m.group()
+        if name in ('true', 'false'):
+            return name == 'true'
+        if name == 'null':
+            return None
+        if self.peek() != '(':
+            return name
+        args = self.sequence('(', ')', allow_pairs=True)
+        if name in ('ExtResource', 'SubResource') and args:
+            return ResourceRef('ext' if name[0] == 'E' else 'sub', str(args[0]))
+        return Constructor(name, args)
+
+    def string(self) -> str:
+        self.pos += 1
+        out = []
+        start = self.pos
+        text = self.text
+        while True:
+            end = text.find('"', start)
+            slash = text.find('\\', start, end if end >= 0 else len(text))
+            if end < 0:
+                raise ValueError("Unterminated string")
+            if slash < 0:
+                out.append(text[start:end])
+                self.pos = end + 1
+                return ''.join(out)
+            out.append(text[start:slash])
+            code = text[slash + 1:slash + 2]
+            if code == 'u':
+                out.append(chr(int(text[slash + 2:slash + 6], 16)))
+                start = slash + 6
+            else:
+                out.append(_ESCAPES.get(code, code))
+                start = slash + 2
+
+    def sequence(self, open_char: str, close_char: str, allow_pairs: bool = False) -> list:
+        self.expect(open_char)
+        items = []
+        while self.peek() != close_char:
+            item = self.value()
+            if allow_pairs and self.peek() == ':':
+                self.pos += 1
+                item = (item, self.value())
+            items.append(item)
+            if self.peek() == ',':
+                self.pos += 1
+        self.pos += 1
+        return items
+
+    def mapping(self) -> dict:
+        self.expect('{')
+        result = {}
+        while self.peek() != '}':
+            key = self.value()
+            self.expect(':')
+            result[key if not isinstance(key, (list, dict)) else repr(key)] = self.value()
+            if self.peek() == ',':
+                self.pos += 1
+        self.pos += 1
+        return result
+
+
+def parse_value(text: str) -> Any:
+    """
+    Convert a raw value into Python: str, int, float, bool, None, list, dict,
+    ResourceRef or Constructor. Numeric Packed*Array values skip the general
+    parser, so large tile and polygon arrays stay cheap.
+    """
+    m = _PACKED_NUMBERS.match(text.strip())
+    if m:
+        name = text.strip()[:text.strip().index('(')]
+        body = m.group(1).strip()
+        cast = float if 'Float' in name or 'Vector' in name or 'Color' in name else int
+        return Constructor(name, [cast(v) for v in body.split(',')] if body else [])
+    return _ValueParser(text).value()
+
+
+_SIMPLE_ATTR = re.compile(r'\s*(\w+)=(?:"([^"\\]*)"|(\d+)(?![\w.]))')
+
+
+def _parse_attrs(text: str) -> Dict[str, Any]:
+    """key=value pairs of a section header"""
+    parser = _ValueParser(text)
+    attrs = {}
+    while True:
+        # Plain strings and integers (nearly every attribute) skip the value parser
+        m = _SIMPLE_ATTR.match(text, parser.pos)
+        if m:
+            attrs[m.group(1)] = m.group(2) if m.group(3) is None else int(m.group(3))
+            parser.pos = m.end()
+            continue
+        parser.skip()
+        m = _IDENT.match(text, parser.pos)
+        if not m:
+            return attrs
+        parser.pos = m.end()
+        parser.expect('=')
+        attrs[m.group()] = parser.value()
+
+
+# ---------------------------------------------------------------------------
+# Streaming tokenizer
+# ---------------------------------------------------------------------------
+
+_STRINGS = re.compile(r'"(?:[^"\\]|\\.)*"', re.S)
+_STRING_TAIL = re.compile(r'(?:[^"\\]|\\.)*"', re.S)   # Rest of a string opened on an earlier line
+
+
+def _balance(text: str, depth: int, in_string: bool):
+    """Track bracket depth and open strings across physical lines"""
+    if in_string:
+        m = _STRING_TAIL.match(text)
+        if not m:
+            return depth, True
+        text = text[m.end():]
+    in_string = False
+    if '"' in text:
+        text = _STRINGS.sub('', text)
+        quote = text.find('"')
+        if quote >= 0:
+            text, in_string = text[:quote], True
+    return (depth + text.count('[') + text.count('(') + text.count('{')
+            - text.count(']') - text.count(')') - text.count('}')), in_string
+
+
+def iter_sections(lines: Iterable[str], properties: bool = True) -> Iterator[Section]:
+    """
+    Stream Sections from an iterable of lines (e.g. an open file). Values that
+    span several lines (arrays, dictionaries, multi-line strings) are joined.
+    With properties=False only `script` is kept, for structure-only scans.
+    """
+    section = None
+    pending = None          # [key, parts, depth, in_string, is_header, line_no]
+
+    for line_no, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+
+        if pending is None:
+            if not line or line[0] == ';':
+                continue
+            if line[0] == '[':
+                pending = [None, [line], *_balance(line, 0, False), True, line_no]
+            else:
+                key, sep, value = line.partition(' = ')
+                if not sep or section is None:
+                    continue
+                pending = [key.strip(), [value], *_balance(value, 0, False), False, line_no]
+        else:
+            pending[1].append(line)
+            pending[2], pending[3] = _balance(line, pending[2], pending[3])
+
+        key, parts, depth, in_string, is_header, start = pending
+        if depth > 0 or in_string:
+            continue
+        pending = None
+        text = '\n'.join(parts)
+
+        if is_header:
+            if section is not None:
+                yield section
+            inner = text.strip()[1:-1]
+            tag, _, rest = inner.partition(' ')
+            section = Section(tag, _parse_attrs(rest), {}, start)
+        elif properties or key == 'script':
+            section.properties[key] = text.strip()
+
+    if section is not None:
+        yield section
+
+
+def iter_file_sections(path, properties: bool = True) -> Iterator[Section]:
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from iter_sections(f, properties)
+
+
+# ---------------------------------------------------------------------------
+# Scene graph
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ExtResource:
+    id: str
+    type: str
+    path: str
+    uid: Optional[str] = None
+
+
+@dataclass
+class SubResource:
+    id: str
+    type: str
+    properties: Dict[str, str] = field(default_factory=dict)
+
+
+class SceneNode:
+    """A [node] entry. Slotted: level scenes can hold thousands of these."""
+    __slots__ = ('name', 'type', 'parent', 'path', 'script', 'instance', 'groups',
+                 'properties', 'line')
+
+    def __init__(self, name, type, parent, path, script, instance, groups, properties, line):
+        self.name = name
+        self.type = type                # None for instanced scenes
+        self.parent = parent            # Parent path, None for the root
+        self.path = path                # Path from the scene root ("." for the root)
+        self.script = script            # res:// path or None
+        self.instance = instance        # res:// path of an instanced scene or None
+        self.groups = groups
+        self.properties = properties    # Raw value text by key
+        self.line = line
+
+    def get(self, key: str, default=None):
+        """Parsed value of a property"""
+        raw = self.properties.get(key)
+        return default if raw is None else parse_value(raw)
+
+    def __repr__(self):
+        kind = self.type or f"instance of {self.instance}"
+        return f"SceneNode({self.path!r}, {kind})"
+
+
+@dataclass
+class Connection:
+    signal: str
+    from_node: str
+    to_node: str
+    method: str
+    flags: int = 0
+    binds: List[Any] = field(default_factory=list)
+
+
+@dataclass
+class SceneGraph:
+    """A parsed .tscn (nodes, connections) or .tres (resource properties)"""
+    path: str
+    kind: str                               # gd_scene or gd_resource
+    uid: Optional[str] = None
+    type: Optional[str] = None              # gd_resource type / script_class
+    ext_resources: Dict[str, ExtResource] = field(default_factory=dict)
+    sub_resources: Dict[str, SubResource] = field(default_factory=dict)
+    nodes: List[SceneNode] = field(default_factory=list)
+    connections: List[Connection] = field(default_factory=list)
+    editable: List[str] = field(default_factory=list)
+    resource: Dict[str, str] = field(default_factory=dict)
+    loader: Optional['SceneLoader'] = field(default=None, repr=False)
+    _by_path: Dict[str, SceneNode] = field(default_factory=dict, repr=False)
+
+    @property
+    def root(self) -> Optional[SceneNode]:
+        return self.nodes[0] if self.nodes else None
+
+    def node(self, path: str) -> Optional[SceneNode]:
+        return self._by_path.get(path)
+
+    def children(self, path: str = '.') -> List[SceneNode]:
+        return [n for n in self.nodes if n.parent == path]
+
+    def resolve(self, ref: ResourceRef):
+        """ExtResource or SubResource a reference points to"""
+        table = self.ext_resources if ref.kind == 'ext' else self.sub_resources
+        return table.get(ref.id)
+
+    def instance(self, node: SceneNode) -> Optional['SceneGraph']:
+        """The scene a node instances, parsed on first access"""
+        if not node.instance or self.loader is None:
+            return None
+        return self.loader.load(node.instance)
+
+    def walk(self, expand_instances: bool = False, max_depth: int = 16):
+        """
+        Yield (path, node, graph) in file order. With expand_instances, nodes of
+        instanced scenes follow their instancing node, with prefixed paths.
+        """
+        yield from self._walk('', expand_instances, max_depth, {self.path})
+
+    def _walk(self, prefix, expand, depth, active):
+        for node in self.nodes:
+            if node.parent is None and prefix:
+                continue    # The instancing node stands in for the sub-scene root
+            path = node.path if not prefix else (prefix if node.path == '.' else f"{prefix}/{node.path}")
+            yield path, node, self
+            if expand and node.instance and depth > 0 and node.instance not in active:
+                sub = self.instance(node)
+                if sub is not None:
+                    child_prefix = node.name if node.path == '.' else path
+                    yield from sub._walk(child_prefix, expand, depth - 1, active | {sub.path})
+
+    @classmethod
+    def from_sections(cls, path: str, sections: Iterable[Section],
+                      loader: Optional['SceneLoader'] = None) -> 'SceneGraph':
+        graph = None
+        for s in sections:
+            if graph is None:
+                graph = cls(path, s.tag, uid=s.attrs.get('uid'),
+                            type=s.attrs.get('script_class') or s.attrs.get('type'), loader=loader)
+                if s.tag in ('gd_scene', 'gd_resource'):
+                    continue
+            tag, attrs = s.tag, s.attrs
+            if tag == 'ext_resource':
+                graph.ext_resources[str(attrs.get('id'))] = ExtResource(
+                    str(attrs.get('id')), attrs.get('type'), attrs.get('path'), attrs.get('uid'))
+            elif tag == 'sub_resource':
+                graph.sub_resources[str(attrs.get('id'))] = SubResource(
+                    str(attrs.get('id')), attrs.get('type'), s.properties)
+            elif tag == 'node':
+                graph._add_node(s)
+            elif tag == 'connection':
+                graph.connections.append(Connection(
+                    attrs.get('signal'), attrs.get('from'), attrs.get('to'), attrs.get('method'),
+                    attrs.get('flags', 0), attrs.get('binds', [])))
+            elif tag == 'editable':
+                graph.editable.append(attrs.get('path'))
+            elif tag == 'resource':
+                graph.resource = s.properties
+        return graph or cls(path, 'empty', loader=loader)
+
+    def _add_node(self, s: Section):
+        attrs = s.attrs
+        name = attrs.get('name', '')
+        parent = attrs.get('parent')
+        if parent is None:
+            path = '.'
+        else:
+            parent = str(parent)
+            path = name if parent == '.' else f"{parent}/{name}"
+
+        script = None
+        raw_script = s.properties.get('script')
+        if raw_script:
+            ref = parse_value(raw_script)
+            target = self.resolve(ref) if isinstance(ref, ResourceRef) else None
+            script = getattr(target, 'path', None)
+
+        instance = attrs.get('instance')
+        if isinstance(instance, ResourceRef):
+            target = self.resolve(instance)
+            instance = target.path if target else None
+
+        node = SceneNode(name, attrs.get('type'), parent, path, script, instance,
+                         attrs.get('groups', []), s.properties, s.line)
+        self.nodes.append(node)
+        self._by_path[path] = node
+
+
+class SceneLoader:
+    """
+    Resolves res:// paths against a project root and caches parsed graphs.
+    The cache is LRU-bounded so walking a large level does not keep every
+    instanced sub-scene alive.
+    """
+
+    def __init__(self, project_root, properties: bool = True, max_cached: int = 64):
+        self.project_root = Path(project_root)
+        self.properties = properties
+        self.max_cached = max_cached
+        self._cache: 'OrderedDict[str, SceneGraph]' = OrderedDict()
+
+    def file_path(self, res_path: str) -> Path:
+        return self.project_root / res_path.replace('res://', '', 1)
+
+    def load(self, res_path: str) -> Optional[SceneGraph]:
+        if res_path in self._cache:
+            self._cache.move_to_end(res_path)
+            return self._cache[res_path]
+
+        file_path = self.file_path(res_path)
+        if not file_path.exists():
+            return None
+        graph = SceneGraph.from_sections(res_path, iter_file_sections(file_path, self.properties), self)
+        self._cache[res_path] = graph
+        if len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        return graph
+
+
+def load_scene(path, project_root=None, properties: bool = True) -> SceneGraph:
+    """Parse a .tscn/.tres file; project_root enables lazy instance resolution"""
+    path = Path(path)
+    loader = SceneLoader(project_root, properties) if project_root else None
+    if loader:
+        res_path = "res://" + path.resolve().relative_to(Path(project_root).resolve()).as_posix()
+    else:
+        res_path = path.as_posix()
+    return SceneGraph.from_sections(res_path, iter_file_sections(path, properties), loader)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _print_tree(graph: SceneGraph):
+    print(f"{graph.path}  ({graph.kind}, {len(graph.nodes)} nodes, "
+          f"{len(graph.ext_resources)} ext, {len(graph.sub_resources)} sub, "
+          f"{len(graph.connections)} connections)")
+    for path, node, owner in graph.walk(expand_instances=True):
+        depth = 0 if path == '.' else path.count('/') + 1
+        kind = node.type or f"instance {node.instance}"
+        extra = f"  script={node.script}" if node.script else ''
+        extra += f"  groups={node.groups}" if node.groups else ''
+        inherited = '' if owner is graph else f"  [{owner.path}]"
+        print(f"{'  ' * depth}{node.name} : {kind}{extra}{inherited}")
+    for c in graph.connections:
+        print(f"  signal {c.signal}: {c.from_node} -> {c.to_node}.{c.method}()")
+
+
+def benchmark(paths: List[str]):
+    """Parse every .tscn/.tres under the given paths and report throughput"""
+    files = []
+    for p in paths:
+        p = Path(p)
+        files.extend([p] if p.is_file() else sorted(list(p.rglob("*.tscn")) + list(p.rglob("*.tres"))))
+    total_bytes = sum(f.stat().st_size for f in files)
+
+    start = time.perf_counter()
+    graphs = [load_scene(f) for f in files]
+    elapsed = time.perf_counter() - start
+
+    print("=" * 60)
+    print(f"Godot Resource Parser Benchmark - {', '.join(paths)}")
+    print("=" * 60)
+    print(f"  Files:       {len(files)}")
+    print(f"  Size:        {total_bytes / 1024:.1f} KB")
+    print(f"  Nodes:       {sum(len(g.nodes) for g in graphs)}")
+    print(f"  Connections: {sum(len(g.connections) for g in graphs)}")
+    print(f"  Parse time:  {elapsed * 1000:.1f} ms ({total_bytes / 1024 / max(elapsed, 1e-9):,.0f} KB/s)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--bench':
+        benchmark(sys.argv[2:] or ['scenes', 'addons/gut'])
+    elif len(sys.argv) > 1:
+        _print_tree(load_scene(sys.argv[1], project_root='.'))
+    else:
+        print("Usage: python godot_resource.py <scene.tscn> | --bench [paths...]")
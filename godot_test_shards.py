@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sharded GUT Runner
+Discovers GUT test scripts under tests/, splits them into N shards balanced
+by how long each script took on earlier runs, and runs the shards in
+parallel on a GodotWorkerPool, one headless Godot per shard. Shard results
+are merged into one GUT JSON report and one JUnit XML document. With
+fail_fast, the first failing test winds down every other shard.
+
+Per-script durations are kept in .gut_durations.json (gitignored) and
+refreshed after every run; scripts without history are estimated from
+their number of test functions.
+
+Usage:
+    python godot_ai_assistant.py --test --shards 4 [--fail-fast] [--junit FILE] [--json FILE]
+
+    shards = plan_shards(discover_tests(root), 4, TestDurations(root))
+    report = run_shards(pool, shards, fail_fast=True)
+"""
+
+import heapq
+import json
+import os
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import CancelledError
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from godot_worker import GodotWorkerPool, WorkerError
+
+DURATIONS_FILE = ".gut_durations.json"
+TEST_DIR = "tests"
+TEST_PREFIX = "test_"
+
+DEFAULT_TEST_SECONDS = 0.1      # Per test function, for scripts never timed before
+HISTORY_WEIGHT = 0.5            # Share of the old estimate kept when a new timing comes in
+
+_TEST_FUNC_RE = re.compile(r'^func\s+test_', re.MULTILINE)
+
+
+def discover_tests(project_root: str, test_dir: str = TEST_DIR) -> List[str]:
+    """res:// paths of GUT scripts (test_*.gd) under test_dir, sorted"""
+    root = Path(project_root)
+    base = root / test_dir[len("res://"):] if test_dir.startswith("res://") else root / test_dir
+    return sorted("res://" + path.relative_to(root).as_posix()
+                  for path in base.rglob(f"{TEST_PREFIX}*.gd"))
+
+
+class TestDurations:
+    """Smoothed per-script run times from earlier runs"""
+
+    def __init__(self, project_root: str, path: Optional[str] = None):
+        self.project_root = Path(project_root)
+        self.path = Path(path) if path else self.project_root / DURATIONS_FILE
+        self.seconds: Dict[str, float] = {}
+        if self.path.exists():
+            try:
+                self.seconds = json.loads(self.path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                self.seconds = {}
+
+    def estimate(self, script: str) -> float:
+        if script in self.seconds:
+            return self.seconds[script]
+        try:
+            source = (self.project_root / script[len("res://"):]).read_text(encoding='utf-8', errors='replace')
+        except OSError:
+            return DEFAULT_TEST_SECONDS
+        return max(1, len(_TEST_FUNC_RE.findall(source))) * DEFAULT_TEST_SECONDS
+
+    def record(self, script: str, seconds: float):
+        old = self.seconds.get(script)
+        self.seconds[script] = seconds if old is None else HISTORY_WEIGHT * old + (1 - HISTORY_WEIGHT) * seconds
+
+    def save(self):
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(self.seconds, indent=1, sort_keys=True), encoding='utf-8')
+        os.replace(tmp, self.path)
+
+
+def plan_shards(scripts: List[str], count: int, durations: TestDurations) -> List[List[str]]:
+    """Longest-first greedy split: each script goes to the currently lightest shard"""
+    count = max(1, min(count, len(scripts)))
+    heap = [(0.0, shard) for shard in range(count)]
+    shards: List[List[str]] = [[] for _ in range(count)]
+    for script in sorted(scripts, key=durations.estimate, reverse=True):
+        load, shard = heapq.heappop(heap)
+        shards[shard].append(script)
+        heapq.heappush(heap, (load + durations.estimate(script), shard))
+    return [shard for shard in shards if shard]
+
+
+def run_shards(pool: GodotWorkerPool, shards: List[List[str]], fail_fast: bool = False,
+               durations: Optional[TestDurations] = None,
+               on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Run each shard as one run_tests job and merge the results. Events are
+    passed to on_event with a "shard" index added.
+    """
+    start = time.perf_counter()
+    futures = []
+    stopping = threading.Event()
+
+    def stop_all():
+        if not stopping.is_set():
+            stopping.set()
+            for future in list(futures):
+                pool.cancel(future)
+
+    def forward(shard: int):
+        def handle(event: Dict[str, Any]):
+            if event["event"] == "script_done" and durations is not None and not stopping.is_set():
+                durations.record(event["path"], event["seconds"])
+            if fail_fast and event["event"] == "test" and event.get("failed"):
+                stop_all()
+            if on_event:
+                on_event(dict(event, shard=shard))
+        return handle
+
+    for shard, scripts in enumerate(shards):
+        futures.append(pool.submit("run_tests", forward(shard), tests=scripts, junit=True, results=True))
+        if stopping.is_set():
+            pool.cancel(futures[-1])     # A shard already failed while the rest were queued
+
+    shard_reports = []
+    for shard, (scripts, future) in enumerate(zip(shards, futures)):
+        report = {"shard": shard, "scripts": scripts, "ok": False, "cancelled": False}
+        try:
+            result = future.result()
+            report.update(ok=result["ok"], cancelled=result.get("cancelled", False),
+                          seconds=result["seconds"], totals=result["totals"],
+                          results=result.get("results"), junit=result.get("junit"))
+        except CancelledError:
+            report["cancelled"] = True
+        except WorkerError as e:
+            report["error"] = str(e)
+            if fail_fast:
+                stop_all()
+        shard_reports.append(report)
+
+    if durations is not None:
+        durations.save()
+    finished = [r for r in shard_reports if "totals" in r]
+    return {
+        "ok": all(r["ok"] and not r["cancelled"] for r in shard_reports),
+        "cancelled": stopping.is_set(),
+        "seconds": time.perf_counter() - start,
+        "totals": _sum_dicts(r["totals"] for r in finished),
+        "results": merge_results([r["results"] for r in finished if r.get("results")]),
+        "junit": merge_junit([r["junit"] for r in finished if r.get("junit")]),
+        "shards": [{k: v for k, v in r.items() if k not in ("results", "junit")} for r in shard_reports],
+    }
+
+
+def _sum_dicts(dicts) -> Dict[str, Any]:
+    total: Dict[str, Any] = {}
+    for d in dicts:
+        for key, value in d.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                total[key] = total.get(key, 0) + value
+    return total
+
+
+def merge_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine GUT ResultExporter dictionaries from several shards"""
+    scripts: Dict[str, Any] = {}
+    for result in results:
+        scripts.update(result["test_scripts"]["scripts"] or {})
+    props = _sum_dicts(r["test_scripts"]["props"] for r in results)
+    # Shards run side by side; the suite took as long as the slowest one
+    props["time"] = max((r["test_scripts"]["props"].get("time", 0) for r in results), default=0)
+    return {"test_scripts": {"props": props, "scripts": scripts}}
+
+
+def merge_junit(documents: List[str]) -> str:
+    """Combine the <testsuite> elements of several GUT JUnit documents"""
+    merged = ET.Element("testsuites", name="GutTests")
+    failures = tests = 0
+    for text in documents:
+        root = ET.fromstring(text)
+        failures += int(root.get("failures", 0))
+        tests += int(root.get("tests", 0))
+        merged.extend(list(root))
+    merged.set("failures", str(failures))
+    merged.set("tests", str(tests))
+    return '<?xml version="1.0" encoding="UTF-8"?>\n' + ET.tostring(merged, encoding="unicode") + "\n"
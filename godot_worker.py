@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Godot Worker Pool
+Keeps headless Godot processes running addons/godot_worker/godot_worker.gd
+and feeds them jobs over a local socket, so a session pays engine startup
+and project load once instead of once per test run or scene check.
+
+Jobs are queued and taken by the next idle worker. Progress events (each
+script and test as GUT runs it) are streamed to an optional callback while
+the job runs; the final result resolves a Future. A worker that dies or hangs
+fails only its current job and is replaced on the next one.
+
+Reimporting is the exception: Godot's import pipeline only exists in the
+editor, so reimport() runs one `--headless --import` launch for the batch
+and the live workers reload the refreshed resources before their next job.
+
+Usage:
+    from godot_worker import GodotWorkerPool
+    with GodotWorkerPool(godot_exe, project_root, size=2) as pool:
+        result = pool.run("run_tests", dirs=["res://tests/unit"])
+        checks = [pool.submit("check_scene", path=p) for p in scenes]
+
+    python godot_ai_assistant.py --workers 2 --test --check-scene res://scenes/player/player.tscn
+"""
+
+import json
+import queue
+import socket
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from godot_process import run_godot
+
+WORKER_SCRIPT = "res://addons/godot_worker/godot_worker.gd"
+
+STARTUP_TIMEOUT = 60.0      # Seconds for a worker to load the project and connect back
+JOB_TIMEOUT = 600.0         # Seconds without any frame before a job counts as hung
+OUTPUT_LINES = 200          # Tail of each worker's stdout kept for error reports
+
+EventCallback = Callable[[Dict[str, Any]], None]
+
+
+class WorkerError(RuntimeError):
+    """A worker could not start, died or hung; carries the tail of its output"""
+
+    def __init__(self, message: str, output: Optional[List[str]] = None):
+        super().__init__(message)
+        self.output = output or []
+
+
+class GodotWorker:
+    """One persistent headless Godot process speaking NDJSON over TCP"""
+
+    def __init__(self, godot_exe: str, project_root: str, name: str = "worker-0",
+                 startup_timeout: float = STARTUP_TIMEOUT, job_timeout: float = JOB_TIMEOUT):
+        self.godot_exe = Path(godot_exe)
+        self.project_root = Path(project_root)
+        self.name = name
+        self.startup_timeout = startup_timeout
+        self.job_timeout = job_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.output: deque = deque(maxlen=OUTPUT_LINES)
+        self.version = ""
+        self.startup_seconds = 0.0
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._next_id = 0
+        self._send_lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None and self._sock is not None
+
+    def start(self) -> 'GodotWorker':
+        started = time.perf_counter()
+        # The worker connects to us, so no port has to be agreed on up front
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        listener.settimeout(0.25)
+        port = listener.getsockname()[1]
+        cmd = [str(self.godot_exe), "--headless", "--path", str(self.project_root),
+               "-s", WORKER_SCRIPT, "--", "--port", str(port)]
+        try:
+            self.process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                            stderr=subprocess.STDOUT, text=True,
+                                            encoding='utf-8', errors='replace')
+            threading.Thread(target=self._drain, name=f"{self.name}-output", daemon=True).start()
+            deadline = started + self.startup_timeout
+            while True:
+                try:
+                    sock, _ = listener.accept()
+                    break
+                except socket.timeout:
+                    if self.process.poll() is not None:
+                        raise WorkerError(f"{self.name} exited with code {self.process.returncode} "
+                                          f"before connecting", list(self.output))
+                    if time.perf_counter() > deadline:
+                        self.kill()
+                        raise WorkerError(f"{self.name} did not connect within {self.startup_timeout:.0f}s",
+                                          list(self.output))
+        finally:
+            listener.close()
+
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(self.job_timeout)
+        self._sock = sock
+        self._reader = sock.makefile('rb')
+        self.version = self.call("ping").get("version", "")
+        self.startup_seconds = time.perf_counter() - started
+        return self
+
+    def _drain(self):
+        # GUT and the engine log to stdout; keep reading so the pipe never fills up
+        for line in self.process.stdout:
+            self.output.append(line.rstrip())
+
+    def new_job_id(self) -> int:
+        with self._send_lock:
+            self._next_id += 1
+            return self._next_id
+
+    def submit(self, op: str, job_id: Optional[int] = None, **params) -> Iterator[Dict[str, Any]]:
+        """Send one job and yield its frames; the last one has event == "result" """
+        if not self.alive:
+            raise WorkerError(f"{self.name} is not running", list(self.output))
+        job_id = job_id or self.new_job_id()
+        try:
+            self._send(dict(params, id=job_id, op=op))
+            while True:
+                line = self._reader.readline()
+                if not line:
+                    raise WorkerError(f"{self.name} exited during {op}", list(self.output))
+                frame = json.loads(line)
+                if frame.get("id") != job_id:
+                    continue        # Left over from an abandoned job
+                yield frame
+                if frame.get("event") == "result":
+                    return
+        except socket.timeout:
+            self.kill()
+            raise WorkerError(f"{self.name} sent nothing for {self.job_timeout:.0f}s during {op}",
+                              list(self.output))
+        except OSError as e:
+            self.kill()
+            raise WorkerError(f"{self.name} connection lost during {op}: {e}", list(self.output))
+
+    def call(self, op: str, on_event: Optional[EventCallback] = None,
+             job_id: Optional[int] = None, **params) -> Dict[str, Any]:
+        """Run one job to completion, passing progress frames to on_event"""
+        for frame in self.submit(op, job_id, **params):
+            if frame.get("event") == "result":
+                return frame
+            if on_event:
+                on_event(frame)
+        raise WorkerError(f"{self.name} returned no result for {op}", list(self.output))
+
+    def _send(self, frame: Dict[str, Any]):
+        with self._send_lock:
+            self._sock.sendall((json.dumps(frame) + "\n").encode('utf-8'))
+
+    def cancel(self, job_id: int):
+        """Ask a test job to skip everything after its current test; safe to send before it starts"""
+        if self.alive:
+            try:
+                self._send({"id": 0, "op": "cancel", "job": job_id})
+            except OSError:
+                pass
+
+    def close(self, timeout: float = 5.0):
+        if self.alive:
+            try:
+                self.call("quit")
+            except WorkerError:
+                pass
+        if self.process is not None:
+            try:
+                self.process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                self.kill()
+        self._close_socket()
+
+    def kill(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self._close_socket()
+
+    def _close_socket(self):
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+            self._sock = None
+
+
+class GodotWorkerPool:
+    """Shared job queue served by `size` persistent workers"""
+
+    def __init__(self, godot_exe: str, project_root: str, size: int = 1,
+                 startup_timeout: float = STARTUP_TIMEOUT, job_timeout: float = JOB_TIMEOUT):
+        self.godot_exe = Path(godot_exe)
+        self.project_root = Path(project_root)
+        self.size = max(1, size)
+        self.startup_timeout = startup_timeout
+        self.job_timeout = job_timeout
+        self.workers: List[Optional[GodotWorker]] = [None] * self.size
+        self._running: List[Optional[Tuple[Future, int]]] = [None] * self.size
+        self.stats = {"jobs": 0, "failed": 0, "startups": 0, "startup_seconds": 0.0}
+        self._jobs: queue.Queue = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        # Resources reimported since startup; each worker reloads what it has not seen
+        self._reimported: List[str] = []
+        self._seen = [0] * self.size
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self) -> 'GodotWorkerPool':
+        if not self._threads:
+            for slot in range(self.size):
+                self._start_thread(slot)
+        return self
+
+    def grow(self, size: int) -> 'GodotWorkerPool':
+        """Add slots up to `size` workers; the new workers start on their first job"""
+        with self._lock:
+            added = range(self.size, size)
+            self.workers.extend(None for _ in added)
+            self._running.extend(None for _ in added)
+            self._seen.extend(0 for _ in added)
+            self.size = max(self.size, size)
+        if self._threads:
+            for slot in added:
+                self._start_thread(slot)
+        return self
+
+    def _start_thread(self, slot: int):
+        thread = threading.Thread(target=self._serve, args=(slot,),
+                                  name=f"godot-worker-{slot}", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def submit(self, op: str, on_event: Optional[EventCallback] = None, **params) -> Future:
+        """Queue a job; the Future resolves to its result frame"""
+        future: Future = Future()
+        self._jobs.put((future, op, params, on_event))
+        return future
+
+    def run(self, op: str, on_event: Optional[EventCallback] = None, **params) -> Dict[str, Any]:
+        return self.submit(op, on_event, **params).result()
+
+    def cancel(self, future: Future) -> bool:
+        """Drop a queued job, or wind down a running test job (it still returns a result)"""
+        if future.cancel():
+            return True
+        with self._lock:
+            running = [(slot, job[1]) for slot, job in enumerate(self._running)
+                       if job is not None and job[0] is future]
+        for slot, job_id in running:
+            self.workers[slot].cancel(job_id)
+        return bool(running)
+
+    def reimport(self, paths: List[str]) -> Dict[str, Any]:
+        """Import changed resources with one editor launch, then refresh the workers' caches"""
+        cmd = [str(self.godot_exe), "--headless", "--path", str(self.project_root), "--import"]
+        run = run_godot(cmd, timeout=self.job_timeout)
+        if run.ok:
+            with self._lock:
+                self._reimported.extend(paths)
+        return {"ok": run.ok, "paths": len(paths), "seconds": run.seconds, "phases": run.phases,
+                "errors": run.errors, "output": run.stdout + "\n" + run.stderr}
+
+    def close(self):
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        for worker in self.workers:
+            if worker is not None:
+                worker.close()
+        self.workers = [None] * self.size
+
+    # --- Worker threads ---
+
+    def _serve(self, slot: int):
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                return
+            future, op, params, on_event = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                worker = self._worker(slot)
+                self._sync_reimports(slot, worker)
+                job_id = worker.new_job_id()
+                with self._lock:
+                    self._running[slot] = (future, job_id)
+                result = worker.call(op, on_event, job_id, **params)
+            except Exception as e:
+                with self._lock:
+                    self.stats["failed"] += 1
+                future.set_exception(e)
+                continue
+            finally:
+                with self._lock:
+                    self._running[slot] = None
+            with self._lock:
+                self.stats["jobs"] += 1
+            future.set_result(result)
+
+    def _worker(self, slot: int) -> GodotWorker:
+        worker = self.workers[slot]
+        if worker is not None and worker.alive:
+            return worker
+        if worker is not None:
+            worker.kill()
+        worker = GodotWorker(str(self.godot_exe), str(self.project_root), f"worker-{slot}",
+                             self.startup_timeout, self.job_timeout).start()
+        self.workers[slot] = worker
+        with self._lock:
+            # A fresh process loads everything from disk already
+            self._seen[slot] = len(self._reimported)
+            self.stats["startups"] += 1
+            self.stats["startup_seconds"] += worker.startup_seconds
+        return worker
+
+    def _sync_reimports(self, slot: int, worker: GodotWorker):
+        with self._lock:
+            paths = self._reimported[self._seen[slot]:]
+            self._seen[slot] = len(self._reimported)
+        if paths:
+            worker.call("reload", paths=paths)
@@ -6,6 +6,8 @@ Better transparency converter - uses edge detection for cleaner results
 
 from PIL import Image, ImageChops
 
+from transparency_engine import load_rgba, store_rgba, corner_background, key_by_distance
+
 def make_transparent_smart(image_path):
     """Convert image to RGBA with smart background removal"""
     print(f"Processing: {image_path}")
@@ -16,49 +18,21 @@ def make_transparent_smart(image_path):
     # Convert to RGBA
     img = img.convert('RGBA')
     
-    # Get pixel data
-    pixels = img.load()
+    # Work on the whole image as one array
+    rgba = load_rgba(img)
     width, height = img.size
     
-    # Sample multiple corner pixels to get average background color
-    corners = [
-        pixels[0, 0][:3],
-        pixels[width-1, 0][:3],
-        pixels[0, height-1][:3],
-        pixels[width-1, height-1][:3]
-    ]
-    
-    # Average the corners
-    bg_r = sum(c[0] for c in corners) // 4
-    bg_g = sum(c[1] for c in corners) // 4
-    bg_b = sum(c[2] for c in corners) // 4
-    bg_color = (bg_r, bg_g, bg_b)
+    # Sample the four corner pixels to get average background color
+    bg_color = corner_background(rgba)
     
     print(f"  Background color detected: RGB{bg_color}")
     
     # More aggressive threshold for better edge detection
     threshold = 50
     
-    # Process each pixel
-    transparent_count = 0
-    for y in range(height):
-        for x in range(width):
-            r, g, b, a = pixels[x, y]
-            
-            # Calculate color distance from background
-            diff = ((r - bg_color[0])**2 + (g - bg_color[1])**2 + (b - bg_color[2])**2) ** 0.5
-            
-            # If very similar to background, make fully transparent
-            if diff < threshold:
-                pixels[x, y] = (r, g, b, 0)
-                transparent_count += 1
-            # If somewhat similar, make partially transparent
-            elif diff < threshold * 2:
-                alpha = int((diff / (threshold * 2)) * 255)
-                pixels[x, y] = (r, g, b, alpha)
-            else:
-                # Keep fully opaque
-                pixels[x, y] = (r, g, b, 255)
+    # Transparent near the background color, ramped alpha in between, opaque beyond
+    transparent_count = key_by_distance(rgba, bg_color, threshold)
+    store_rgba(img, rgba)
     
     # Save
     img.save(image_path)
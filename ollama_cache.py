@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ollama Response Cache
+On-disk (SQLite) cache of Ollama responses for OllamaClient and
+AsyncOllamaClient. Entries are keyed on the model digest reported by
+/api/tags plus the canonicalized request payload and options, so pulling a
+new build of a model or changing any option misses. Streaming calls store
+the recorded chunk stream and replay it on a hit.
+
+Entries expire after a TTL; when the cache grows past its size limit the
+least recently used entries are evicted.
+
+Only worth enabling for deterministic requests (temperature 0 or a fixed
+seed) or when "same prompt, same answer" is what you want, e.g. re-running
+analyze_project.py on an unchanged project.
+
+Usage:
+    python ollama_cache.py [--path FILE] stats
+    python ollama_cache.py clear
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+CACHE_FILE = ".ollama_cache.db"
+
+DEFAULT_TTL = 7 * 24 * 3600             # Seconds
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Bump when the key or stored layout changes; the cache is dropped
+SCHEMA_VERSION = 1
+
+# Request fields that do not change the response
+_VOLATILE_FIELDS = ('keep_alive',)
+
+SCHEMA = """
+CREATE TABLE entries (
+    key TEXT PRIMARY KEY,           -- sha256 of digest + endpoint + canonical payload
+    model TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    body TEXT NOT NULL              -- JSON: response object, or list of chunks for streams
+);
+CREATE INDEX idx_entries_accessed ON entries(accessed);
+"""
+
+
+def canonical_model(name: str) -> str:
+    """Ollama treats a bare model name as the :latest tag"""
+    return name if ':' in name else name + ':latest'
+
+
+class ResponseCache:
+    """TTL + size-bounded LRU cache of Ollama responses"""
+
+    def __init__(self, path: str = CACHE_FILE, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Shared by the pool threads of OllamaClient; access is serialized by _lock
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._ensure_schema()
+
+    def close(self):
+        self.db.close()
+
+    def _ensure_schema(self):
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version == SCHEMA_VERSION:
+            return
+        with self.db:
+            self.db.execute("DROP TABLE IF EXISTS entries")
+            self.db.executescript(SCHEMA)
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @staticmethod
+    def key(digest: str, endpoint: str, payload: Dict[str, Any]) -> str:
+        request = {k: v for k, v in payload.items() if k not in _VOLATILE_FIELDS}
+        request['model'] = canonical_model(request.get('model', ''))
+        request['stream'] = bool(request.get('stream'))
+        text = json.dumps([digest, endpoint, request], sort_keys=True, separators=(',', ':'),
+                          ensure_ascii=False)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached response for key, or None; counts the hit or miss"""
+        now = time.time()
+        with self._lock:
+            row = self.db.execute("SELECT created, body FROM entries WHERE key = ?", (key,)).fetchone()
+            if row and now - row[0] <= self.ttl:
+                with self.db:
+                    self.db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return json.loads(row[1])
+            if row:
+                with self.db:
+                    self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.misses += 1
+            return None
+
+    def put(self, key: str, model: str, endpoint: str, value: Any):
+        body = json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+        now = time.time()
+        with self._lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (key, canonical_model(model), endpoint, now, now, len(body), body))
+            self._evict(now)
+
+    def _evict(self, now: float):
+        self.db.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl,))
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock, self.db:
+            self.db.execute("DELETE FROM entries")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            models = dict(self.db.execute("SELECT model, COUNT(*) FROM entries GROUP BY model"))
+        return {"entries": entries, "bytes": size, "models": models, "hits": self.hits, "misses": self.misses}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the Ollama response cache")
+    parser.add_argument("--path", default=CACHE_FILE, help=f"Cache file (default: {CACHE_FILE})")
+    parser.add_argument("command", choices=("stats", "clear"))
+    args = parser.parse_args()
+
+    cache = ResponseCache(args.path)
+    if args.command == "clear":
+        cache.clear()
+        print(f"[OK] Cleared {args.path}")
+        return
+    stats = cache.stats()
+    print(f"[*] {args.path}: {stats['entries']} entries, {stats['bytes'] / 1024:.1f} KB")
+    for model, count in sorted(stats["models"].items()):
+        print(f"   {count:5}  {model}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ollama Stub Server - Minimal local stand-in for the Ollama HTTP API.
+Speaks HTTP/1.1 keep-alive and the NDJSON streaming protocol of
+/api/generate and /api/chat, plus /api/tags and /api/embed, so the client
+can be benchmarked and exercised without a GPU or a model download.
+
+Usage:
+    python ollama_stub.py [--port 11435] [--tokens 32] [--delay 0.0]
+
+    from ollama_stub import StubOllamaServer
+    with StubOllamaServer(busy_responses=2) as server:
+        client = OllamaClient(server.url)
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+STUB_MODELS = [{"name": "stub:latest", "model": "stub:latest",
+                "digest": "sha256:5707ab0000000000000000000000000000000000000000000000000000000000"}]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"      # Keep-alive unless the client says otherwise
+    disable_nagle_algorithm = True     # Small NDJSON frames go out immediately
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:
+            pass  # Client closed a keep-alive connection mid-request
+
+    # --- Helpers ---
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Dict[str, str] = None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    # --- Endpoints ---
+
+    def do_GET(self):
+        self.server.stats["requests"] += 1
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": STUB_MODELS})
+        else:
+            self._send_json(404, {"error": f"unknown endpoint {self.path}"})
+
+    def do_POST(self):
+        server = self.server
+        server.stats["requests"] += 1
+        request = self._read_json()
+
+        with server.lock:
+            busy = server.busy_remaining > 0
+            if busy:
+                server.busy_remaining -= 1
+        if busy:
+            self._send_json(server.busy_status, {"error": "server busy, please try again"},
+                            {"Retry-After": str(server.retry_after)})
+            return
+
+        if self.path == "/api/embed":
+            inputs = request.get("input", [])
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            self._send_json(200, {"model": request.get("model"),
+                                  "embeddings": [_fake_embedding(text, server.embedding_dim) for text in inputs]})
+            return
+        if self.path not in ("/api/generate", "/api/chat"):
+            self._send_json(404, {"error": f"unknown endpoint {self.path}"})
+            return
+
+        chat = self.path == "/api/chat"
+        words = [f"tok{i} " for i in range(server.tokens)]
+        prompt = request.get("prompt") or "".join(m.get("content", "") for m in request.get("messages", []))
+        done = {"model": request.get("model"), "done": True, "done_reason": "stop",
+                "prompt_eval_count": max(1, len(prompt) // 4), "eval_count": len(words),
+                "total_duration": int(server.delay * len(words) * 1e9)}
+
+        if not request.get("stream", True):
+            time.sleep(server.delay * len(words))
+            text = "".join(words)
+            message = {"message": {"role": "assistant", "content": text}} if chat else {"response": text}
+            self._send_json(200, dict(done, **message))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for word in words:
+                if server.delay:
+                    time.sleep(server.delay)
+                frame = {"message": {"role": "assistant", "content": word}} if chat else {"response": word}
+                frame.update(model=request.get("model"), done=False)
+                self._send_chunk((json.dumps(frame) + "\n").encode('utf-8'))
+                self.wfile.flush()
+            self._send_chunk((json.dumps(done) + "\n").encode('utf-8'))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            server.stats["aborted"] += 1       # Client cancelled the stream
+            self.close_connection = True
+
+
+def _fake_embedding(text: str, dim: int):
+    """Deterministic unit-ish vector derived from the text"""
+    seed = sum(text.encode('utf-8')) or 1
+    return [((seed * (i + 7)) % 97) / 97.0 - 0.5 for i in range(dim)]
+
+
+class StubOllamaServer:
+    """Threaded stub server; use as a context manager. port=0 picks a free port."""
+
+    def __init__(self, port: int = 0, tokens: int = 16, delay: float = 0.0,
+                 busy_responses: int = 0, busy_status: int = 503, retry_after: float = 0,
+                 embedding_dim: int = 8):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.tokens = tokens
+        self.httpd.delay = delay
+        self.httpd.busy_remaining = busy_responses
+        self.httpd.busy_status = busy_status
+        self.httpd.retry_after = retry_after
+        self.httpd.embedding_dim = embedding_dim
+        self.httpd.lock = threading.Lock()
+        self.httpd.stats = {"requests": 0, "aborted": 0}
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self.httpd.stats
+
+    def start(self) -> 'StubOllamaServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub of the Ollama HTTP API")
+    parser.add_argument("--port", type=int, default=11435, help="Port to listen on (default: 11435)")
+    parser.add_argument("--tokens", type=int, default=32, help="Tokens per generated response")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds between streamed tokens")
+    args = parser.parse_args()
+
+    server = StubOllamaServer(args.port, args.tokens, args.delay)
+    print(f"[*] Stub Ollama listening on {server.url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[*] Stopped")
+
+
+if __name__ == "__main__":
+    main()
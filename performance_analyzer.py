@@ -10,22 +10,177 @@ import os
 import re
 import json
 import math
+import hashlib
+import argparse
+import time
 from pathlib import Path
 from typing import Dict, List, Any
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from gdscript_outline import (parse_source, mask_strings, TAB_WIDTH, LINE_BLANK, LINE_CODE,
+                              LINE_COMMENT, LINE_STRING)
 
 # --- Configuration ---
 PROJECT_ROOT = os.getcwd()
 OUTPUT_FILE = "performance_report.html"
+CACHE_FILE = ".perf_analyzer_cache.json"
+
+# Bump whenever analysis rules change so cached per-file results are discarded
+RULESET_VERSION = 5
+
+# Functions whose bodies run every frame
+PROCESS_FUNCTIONS = ('_process', '_physics_process')
+
+# Execution frequency estimates (calls per second)
+DISPLAY_FPS = 60                # _process: assume a 60 Hz display
+DEFAULT_PHYSICS_TICKS = 60      # _physics_process: physics/common/physics_ticks_per_second
+LOOP_ITERATIONS_ESTIMATE = 10   # Multiplier per for/while level inside hot code
+BRANCH_FACTOR = 0.1             # Share of frames an if/elif/else body is assumed to run on
 
 # --- Analysis Rules ---
+# (pattern, estimated cost per execution in microseconds)
 EXPENSIVE_CALLS = [
-    r'(?<!\.)get_node\(',  # get_node("...")
-    r'(?<!\.)\$',          # $Node
-    r'ResourceLoader\.load',
-    r'\.new\(',            # Creating new objects
+    (r'(?<!\.)get_node\(', 2.0),    # get_node("...")
+    (r'(?<!\.)\$', 2.0),            # $Node
+    (r'ResourceLoader\.load', 50.0),
+    (r'\.new\(', 5.0),              # Creating new objects
+]
+
+# Where a rule applies
+SCOPE_ANY = "any"          # Every non-comment line
+SCOPE_PROCESS = "process"  # Body of _process / _physics_process
+SCOPE_HOT = "hot"          # Any per-frame code: process bodies and helpers they always call
+SCOPE_VAR = "var"          # `var` declaration lines
+
+@dataclass
+class Rule:
+    """A single line-level analysis rule. Patterns must not use named groups."""
+    name: str
+    pattern: str
+    severity: str
+    type: str
+    message: str              # May reference {stripped}
+    scope: str = SCOPE_ANY
+    exclude: str = None       # Rule is suppressed on lines that also match this
+    cost_us: float = 0.0      # Estimated cost per execution; ranks hot-loop findings
+    code_only: bool = False   # Match with string literal contents blanked
+
+# Per-frame allocation and lookup patterns. Costs are rough orders of magnitude
+# for a mid-range desktop; they only need to rank findings against each other.
+HOT_LOOP_RULES = [
+    Rule("array_literal", r'(?<![\w\])])\[', "medium", "Allocation",
+         "Array literal allocates every frame. Reuse a member array and clear() it.",
+         SCOPE_HOT, cost_us=1.0, code_only=True),
+    Rule("dict_literal", r'(?<![\w\])])\{', "medium", "Allocation",
+         "Dictionary literal allocates every frame. Reuse a member dictionary.",
+         SCOPE_HOT, cost_us=1.5, code_only=True),
+    Rule("string_format", r'"\s*%|\bstr\(|\.format\(|"\s*\+|\+\s*"', "medium", "Allocation",
+         "String building every frame. Cache the text and rebuild only when the value changes.",
+         SCOPE_HOT, cost_us=2.0),
+    Rule("nodes_in_group", r'get_nodes_in_group\(', "high", "Lookup",
+         "get_nodes_in_group() scans the tree and allocates an Array every frame. Cache the nodes or use signals.",
+         SCOPE_HOT, cost_us=25.0),
+    Rule("preload_in_loop", r'\bpreload\(', "low", "Lookup",
+         "preload() inside a process function. Hoist it into a script-level const.",
+         SCOPE_HOT, cost_us=0.5),
+    Rule("load_in_loop", r'(?<![\w.])load\(', "high", "Lookup",
+         "load() every frame hits the resource cache by path. Preload once into a const or member.",
+         SCOPE_HOT, cost_us=50.0),
+    Rule("signal_connect", r'\.connect\(', "high", "Lookup",
+         "Signal connect() every frame. Connect once in _ready().",
+         SCOPE_HOT, cost_us=5.0),
+    Rule("get_parent", r'get_parent\(\)', "low", "Lookup",
+         "Uncached get_parent() every frame. Store the parent in an @onready var.",
+         SCOPE_HOT, cost_us=0.3),
+    Rule("distance_to", r'\.distance_to\(', "low", "Math",
+         "distance_to() takes a square root. Compare distance_squared_to() against a squared threshold.",
+         SCOPE_HOT, cost_us=0.1),
 ]
 
+# Function-level check: distance_to() followed by normalized() on the same
+# delta computes the square root twice
+SQRT_PAIR_RULE = Rule("distance_then_normalized", r'\.normalized\(\)', "low", "Math",
+                      "normalized() after distance_to() repeats the square root. "
+                      "Compute the delta once and divide it by the length you already have.",
+                      SCOPE_HOT, cost_us=0.1)
+
+RULES = [
+    # 1. Expensive calls in process
+    *[Rule(f"expensive_{i}", pattern, "high", "Performance",
+           "Expensive operation detected in process loop: {stripped}", SCOPE_PROCESS, cost_us=cost)
+      for i, (pattern, cost) in enumerate(EXPENSIVE_CALLS)],
+    # 2. Debug prints
+    Rule("debug_print", r'print\(', "low", "Cleanup",
+         "Debug 'print()' call found. Use 'print_debug()' or remove.",
+         exclude=r'print_debug'),
+    # 3. Deep nesting (assuming 4 spaces/tab * 4 levels deep)
+    Rule("deep_nesting", r'^\s{16}', "medium", "Complexity",
+         "Deep nesting detected (4+ levels). Consider refactoring."),
+    # 4. Missing static typing (Variable)
+    # var my_var = ... (bad) vs var my_var: int = ... (good), := inference is fine
+    Rule("untyped_var", r'^[^:]*$', "medium", "Typing",
+         "Missing static type hint. Adding types improves performance.", SCOPE_VAR),
+    # 5. Hot-loop allocations and lookups
+    *HOT_LOOP_RULES,
+]
+
+# Bare or self. calls to functions in the same script
+CALL_PATTERN = re.compile(r'(?<![\w.])(?:self\.)?(\w+)\s*\(')
+LOOP_PATTERN = re.compile(r'(?:for|while)\b')
+# Block headers whose body only runs on some frames
+BRANCH_PATTERN = re.compile(r'(?:if|elif|else|match)\b')
+
+class RuleEngine:
+    """
+    Compiles every rule once into one alternation per scope combination, so
+    each line costs a single regex pass no matter how many rules exist.
+    code_only rules get their own alternation, run on the string-masked line.
+    """
+    def __init__(self, rules: List[Rule]):
+        self.rules = list(rules)
+        self._patterns = [re.compile(rule.pattern) for rule in self.rules]
+        self._excludes = [re.compile(rule.exclude) if rule.exclude else None for rule in self.rules]
+        self._combined = {}
+        
+        for in_process in (False, True):
+            for in_hot in (False, True):
+                for is_var in (False, True):
+                    scopes = {SCOPE_ANY}
+                    if in_process: scopes.add(SCOPE_PROCESS)
+                    if in_hot: scopes.add(SCOPE_HOT)
+                    if is_var: scopes.add(SCOPE_VAR)
+                    for code_only in (False, True):
+                        active = [i for i, rule in enumerate(self.rules)
+                                  if rule.scope in scopes and rule.code_only == code_only]
+                        combined = re.compile("|".join(f"(?P<r{i}>{self.rules[i].pattern})" for i in active)) if active else None
+                        self._combined[(in_process, in_hot, is_var, code_only)] = (active, combined)
+
+    def match(self, line: str, in_process: bool, in_hot: bool, is_var: bool,
+              code_line: str = None) -> List[Rule]:
+        """Rules that fire on a line, in registry order; code_line is the line with strings masked"""
+        hits = self._hits(line, (in_process, in_hot, is_var, False))
+        hits.update(self._hits(line if code_line is None else code_line, (in_process, in_hot, is_var, True)))
+        return [self.rules[i] for i in sorted(hits)
+                if not (self._excludes[i] and self._excludes[i].search(line))]
+
+    def _hits(self, line: str, key) -> set:
+        active, combined = self._combined[key]
+        if combined is None:
+            return set()
+        
+        first = combined.search(line)
+        if first is None:
+            return set()
+        hits = {int(m.lastgroup[1:]) for m in combined.finditer(line, first.start())}
+        
+        # Overlapping matches can hide a rule from finditer; recheck the rest on this (rare) hit line
+        hits.update(i for i in active if i not in hits and self._patterns[i].search(line))
+        return hits
+
+RULE_ENGINE = RuleEngine(RULES)
+
 # --- Templates ---
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -95,6 +250,11 @@ HTML_TEMPLATE = """
             white-space: pre;
         }
         .highlight { color: #fff; font-weight: bold; background: rgba(255, 82, 82, 0.2); }
+        
+        .hot-table { width: 100%; border-collapse: collapse; font-size: 0.9em; }
+        .hot-table th, .hot-table td { padding: 6px 10px; text-align: left; border-bottom: 1px solid #444; }
+        .hot-table th { color: #aaa; }
+        .hot-table .num { text-align: right; font-family: monospace; }
     </style>
 </head>
 <body>
@@ -120,6 +280,17 @@ HTML_TEMPLATE = """
             </div>
         </div>
 
+        <h2>Hot Loop Hotspots</h2>
+        <div class="card" style="margin-bottom: 30px;">
+            <p>Per-frame findings ranked by estimated cost per second
+               (_process at 60 fps, _physics_process at <span id="physics-ticks">60</span> ticks/s, x10 per loop level, x0.1 per if/else level,
+               1/arms per match; "conditional" marks code that only runs behind a branch).</p>
+            <table class="hot-table">
+                <thead><tr><th>Est. us/s</th><th>Runs/s</th><th>Location</th><th>Rule</th><th>Message</th></tr></thead>
+                <tbody id="hot-list"></tbody>
+            </table>
+        </div>
+
         <h2>Detailed File Analysis</h2>
         <div id="file-list" class="file-list"></div>
     </div>
@@ -152,6 +323,24 @@ HTML_TEMPLATE = """
             options: { responsive: true, plugins: { legend: { position: 'bottom', labels: { color: '#bbb' } } } }
         });
 
+        // --- Render Hot Loop Findings ---
+        document.getElementById('physics-ticks').textContent = data.physics_ticks;
+        const hotEl = document.getElementById('hot-list');
+        if (data.hot_loop_findings.length === 0) {
+            hotEl.innerHTML = '<tr><td colspan="5">No per-frame findings.</td></tr>';
+        }
+        data.hot_loop_findings.slice(0, 25).forEach(hot => {
+            const row = document.createElement('tr');
+            row.innerHTML = `
+                <td class="num">${hot.cost_us_per_second.toFixed(1)}</td>
+                <td class="num">${hot.calls_per_second}${hot.conditional ? ' (conditional)' : ''}</td>
+                <td class="file-name">${hot.path}:${hot.line}</td>
+                <td><span class="issue-type">${hot.rule}</span></td>
+                <td>${hot.message}</td>
+            `;
+            hotEl.appendChild(row);
+        });
+
         // --- Render Files ---
         const listEl = document.getElementById('file-list');
         
@@ -201,8 +390,10 @@ HTML_TEMPLATE = """
 """
 
 class PerformanceAnalyzer:
-    def __init__(self, root_dir: str):
+    def __init__(self, root_dir: str, cache_file: str = None, physics_ticks: int = None):
         self.root_dir = Path(root_dir)
+        self.cache_path = Path(cache_file) if cache_file else None
+        self.physics_ticks = physics_ticks or self._read_physics_ticks()
         self.issues = []
         self.stats = {
             "total_files": 0,
@@ -212,100 +403,188 @@ class PerformanceAnalyzer:
             "low": 0
         }
 
-    def analyze(self):
+    def analyze(self, jobs: int = 1):
         print(f"[*] Starting analysis in {self.root_dir}...")
-        files_data = []
+        self.timings = {}
         
-        for p in self.root_dir.rglob("*.gd"):
-            if "addons" in p.parts: continue  # Skip addons
-            
-            self.stats["total_files"] += 1
-            file_result = self.analyze_file(p)
+        # Discover (sorted so output order never depends on the filesystem)
+        start = time.perf_counter()
+        paths = sorted((p for p in self.root_dir.rglob("*.gd")
+                        if "addons" not in p.parts),  # Skip addons
+                       key=lambda p: p.relative_to(self.root_dir).as_posix())
+        start = self._mark("discover", start)
+        
+        # Read: resolve cache hits, load source for everything else
+        cache = self._load_cache()
+        entries = {}
+        pending = []
+        for p in paths:
+            rel_path = str(p.relative_to(self.root_dir))
+            entry = self._cached_entry(p, cache.get(rel_path))
+            if not entry:
+                content, digest = self._read_source(p)
+                stat = p.stat()
+                entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest}
+                pending.append((rel_path, p, content))
+            entries[rel_path] = entry
+        start = self._mark("read", start)
+        
+        # Analyze
+        results = self._analyze_sources([(p, content) for _, p, content in pending], jobs)
+        for (rel_path, _, _), result in zip(pending, results):
+            entries[rel_path]["result"] = result
+        self._mark("analyze", start)
+        
+        files_data = []
+        for p in paths:
+            file_result = entries[str(p.relative_to(self.root_dir))]["result"]
             files_data.append(file_result)
+            self.stats["total_files"] += 1
             self.stats["total_lines"] += file_result["lines"]
+        
+        if self.cache_path:
+            self._save_cache(entries)
+            print(f"[*] Re-analyzed {len(pending)} files, {len(paths) - len(pending)} unchanged (cached)")
             
         return self._generate_report_data(files_data)
 
-    def analyze_file(self, path: Path) -> Dict:
-        with open(path, 'r', encoding='utf-8') as f:
-            content = f.read()
+    def _analyze_sources(self, sources: List, jobs: int) -> List[Dict]:
+        """analyze_file over (path, content) pairs; results come back in input order"""
+        if jobs <= 1 or len(sources) < 2:
+            return [self.analyze_file(p, content) for p, content in sources]
+        
+        chunksize = max(1, len(sources) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(_analyze_source,
+                                 [str(self.root_dir)] * len(sources),
+                                 [self.physics_ticks] * len(sources),
+                                 [p for p, _ in sources],
+                                 [content for _, content in sources],
+                                 chunksize=chunksize))
+
+    def _read_physics_ticks(self) -> int:
+        """physics/common/physics_ticks_per_second from project.godot, else Godot's default"""
+        try:
+            text = (self.root_dir / "project.godot").read_text(encoding='utf-8')
+        except OSError:
+            return DEFAULT_PHYSICS_TICKS
+        
+        section = None
+        for line in text.splitlines():
+            line = line.strip()
+            if line.startswith('['):
+                section = line.strip('[]')
+            elif section == 'physics' and line.startswith('common/physics_ticks_per_second='):
+                try:
+                    return int(line.split('=', 1)[1])
+                except ValueError:
+                    break
+        return DEFAULT_PHYSICS_TICKS
+
+    def _mark(self, phase: str, start: float) -> float:
+        """Record wall-clock time for a phase; returns the new start time"""
+        now = time.perf_counter()
+        self.timings[phase] = now - start
+        return now
+
+    def _read_source(self, path: Path):
+        """Return (text with normalized newlines, sha256 of the raw bytes)"""
+        raw = path.read_bytes()
+        content = raw.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        return content, hashlib.sha256(raw).hexdigest()
+
+    def _cached_entry(self, path: Path, entry: Dict):
+        """Reuse a cache entry if the file is unchanged (stat first, content hash second)"""
+        if not entry:
+            return None
+        
+        stat = path.stat()
+        if entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry
+        
+        # Touched but possibly identical (checkout, editor save): compare content
+        _, digest = self._read_source(path)
+        if entry["sha256"] == digest:
+            return dict(entry, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        return None
+
+    def _load_cache(self) -> Dict:
+        if not self.cache_path or not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[!] Ignoring unreadable cache {self.cache_path}: {e}")
+            return {}
+        if data.get("ruleset_version") != RULESET_VERSION or data.get("physics_ticks") != self.physics_ticks:
+            return {}
+        return data.get("files", {})
+
+    def _save_cache(self, entries: Dict):
+        # Only files seen this run are kept, so deleted scripts drop out
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump({"ruleset_version": RULESET_VERSION, "physics_ticks": self.physics_ticks,
+                       "files": entries}, f)
+
+    def analyze_file(self, path: Path, content: str = None) -> Dict:
+        if content is None:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
             
         lines = content.split('\n')
         file_issues = []
         
-        # State tracking
-        in_process_func = False
-        process_indent = 0
+        # One structural pass: line kinds and function spans
+        outline = parse_source(content, path.stem)
+        rates, owners, guarded = self._line_rates(outline, lines)
+        in_process = bytearray(len(lines))
+        for func in outline.functions():
+            if func.name in PROCESS_FUNCTIONS:
+                for n in range(func.body_line, func.end_line + 1):
+                    in_process[n - 1] = 1
+        distance_seen = set()  # Hot functions that already called distance_to()
         
         for i, line in enumerate(lines):
             line_num = i + 1
-            stripped = line.strip()
-            indent = len(line) - len(line.lstrip())
             
-            # Skip comments
-            if stripped.startswith('#'): continue
+            # Skip comments, blank lines and the inside of multi-line strings
+            if outline.line_kinds[i] in (LINE_BLANK, LINE_COMMENT, LINE_STRING): continue
             
-            # check function definition
-            if stripped.startswith('func'):
-                # Reset process state when new func starts
-                in_process_func = False
-                
-                # Check missing type hint on function return
-                if '->' not in line and not ':' not in line: # simplistic check
-                     pass # Detecting return types robustly requires more complex parsing
-                     
-                # Detect process loop
-                if '_process' in line or '_physics_process' in line:
-                    in_process_func = True
-                    process_indent = indent
-                    continue
-
-            # --- Rules ---
+            stripped = line.strip()
+            indent = line[:len(line) - len(line.lstrip())]
+            if '\t' in indent:
+                # Rules see indentation in columns, so tabs and spaces nest alike
+                line_for_rules = indent.expandtabs(TAB_WIDTH) + line[len(indent):]
+            else:
+                line_for_rules = line
             
-            # 1. Expensive calls in process
-            if in_process_func and indent > process_indent:
-                for patterns in EXPENSIVE_CALLS:
-                    if re.search(patterns, line):
-                        file_issues.append({
-                            "line": line_num,
-                            "type": "Performance",
-                            "severity": "high",
-                            "message": f"Expensive operation detected in process loop: {stripped}",
-                            "snippet": self._get_snippet(lines, i, line)
-                        })
+            # --- Rules ---
+            code_line = mask_strings(line_for_rules) if rates[i] > 0 else line_for_rules
+            hits = RULE_ENGINE.match(line_for_rules, bool(in_process[i]), rates[i] > 0,
+                                     stripped.startswith('var '), code_line)
+            if rates[i] > 0:
+                if owners[i] in distance_seen and '.normalized()' in line:
+                    hits.append(SQRT_PAIR_RULE)
+                if '.distance_to(' in line:
+                    distance_seen.add(owners[i])
             
-            # 2. Debug prints
-            if 'print(' in line and not 'print_debug' in line:
-                file_issues.append({
-                    "line": line_num,
-                    "type": "Cleanup",
-                    "severity": "low",
-                    "message": "Debug 'print()' call found. Use 'print_debug()' or remove.",
-                    "snippet": self._get_snippet(lines, i, line)
-                })
-                
-            # 3. Deep nesting
-            if indent >= 16:  # Assuming 4 spaces/tab * 4 levels deep
-                 file_issues.append({
+            for rule in hits:
+                issue = {
                     "line": line_num,
-                    "type": "Complexity",
-                    "severity": "medium",
-                    "message": "Deep nesting detected (4+ levels). Consider refactoring.",
+                    "rule": rule.name,
+                    "type": rule.type,
+                    "severity": rule.severity,
+                    "message": rule.message.format(stripped=stripped),
                     "snippet": self._get_snippet(lines, i, line)
-                })
-
-            # 4. Missing static typing (Variable)
-            # var my_var = ... (bad) vs var my_var: int = ... (good)
-            # ignore := inference
-            if stripped.startswith('var '):
-                if ':' not in line and ':=' not in line:
-                     file_issues.append({
-                        "line": line_num,
-                        "type": "Typing",
-                        "severity": "medium",
-                        "message": "Missing static type hint. Adding types improves performance.",
-                        "snippet": self._get_snippet(lines, i, line)
-                    })
+                }
+                if rule.cost_us and rates[i] > 0:
+                    issue["calls_per_second"] = rates[i]
+                    issue["cost_us_per_second"] = round(rule.cost_us * rates[i], 2)
+                    issue["conditional"] = guarded[i]
+                    note = ", conditional" if guarded[i] else ""
+                    issue["message"] += f" (~{rates[i]:g}/s{note}, est. {issue['cost_us_per_second']:g} us/s)"
+                file_issues.append(issue)
 
         score = max(0, 100 - (len(file_issues) * 5)) # Simple scoring
         return {
@@ -315,6 +594,146 @@ class PerformanceAnalyzer:
             "lines": len(lines)
         }
 
+    def _line_rates(self, outline, lines: List[str]):
+        """
+        Estimated executions per second for every line (0 = not per-frame code),
+        the line number of the hot function owning each line, and whether the
+        line only runs behind a branch.
+        
+        _process runs once per rendered frame and _physics_process once per
+        physics tick. Every enclosing for/while multiplies the rate by
+        LOOP_ITERATIONS_ESTIMATE; every enclosing if/elif/else scales it by
+        BRANCH_FACTOR and a match arm by 1/number of arms. Helpers in the same
+        script inherit the rate at which their call site runs, so a handler
+        reached through a rare branch ranks low instead of as per-frame work.
+        """
+        functions = outline.functions()
+        by_name = {}
+        for func in functions:
+            by_name.setdefault(func.name, []).append(func)
+        
+        func_rates = {}  # func.line -> (rate, reached only through a branch)
+        for func in functions:
+            if func.name == '_process':
+                func_rates[func.line] = (DISPLAY_FPS, False)
+            elif func.name == '_physics_process':
+                func_rates[func.line] = (self.physics_ticks, False)
+        
+        # Propagate through same-script calls. Call weights never exceed 1
+        # (loops do not multiply calls), so rates only shrink along a chain and this settles
+        bodies = {}
+        pending = [func for func in functions if func.line in func_rates]
+        while pending:
+            func = pending.pop()
+            rate, conditional = func_rates[func.line]
+            if func.line not in bodies:
+                bodies[func.line] = self._scan_body(func, outline, lines)
+            for name, (weight, guarded) in bodies[func.line][1].items():
+                for callee in by_name.get(name, ()):
+                    if func_rates.get(callee.line, (0, False))[0] < rate * weight:
+                        func_rates[callee.line] = (rate * weight, conditional or guarded)
+                        pending.append(callee)
+        
+        rates = [0] * len(lines)
+        owners = [0] * len(lines)
+        guarded_lines = [False] * len(lines)
+        for func in functions:
+            if func.line not in func_rates:
+                continue
+            rate, conditional = func_rates[func.line]
+            line_weights = bodies[func.line][0]
+            for n, (weight, guarded) in line_weights.items():
+                line_rate = round(rate * weight, 3)
+                if line_rate == int(line_rate):
+                    line_rate = int(line_rate)
+                if line_rate > rates[n]:
+                    rates[n] = line_rate
+                    owners[n] = func.line
+                    guarded_lines[n] = conditional or guarded
+        return rates, owners, guarded_lines
+
+    def _scan_body(self, func, outline, lines: List[str]):
+        """
+        ({line index: (weight, guarded)}, {called name: (weight, guarded)}) for a
+        function body. Line weights include loop multipliers and branch factors;
+        call weights only branch factors.
+        """
+        line_weights = {}
+        calls = {}
+        blocks = []     # (indent, loop multiplier, branch factor) of enclosing headers; factor None for loops
+        
+        def note_calls(code: str, weight: float, guarded: bool):
+            for name in CALL_PATTERN.findall(code):
+                if calls.get(name, (0, False))[0] < weight:
+                    calls[name] = (weight, guarded)
+        
+        statement = (1, 1, False)   # Continuation lines share their statement's weights
+        for n in range(func.body_line - 1, func.end_line):
+            kind = outline.line_kinds[n]
+            if kind in (LINE_BLANK, LINE_COMMENT):
+                continue
+            code = mask_strings(lines[n].expandtabs(TAB_WIDTH))
+            if kind == LINE_CODE:
+                indent = len(code) - len(code.lstrip())
+                while blocks and indent <= blocks[-1][0]:
+                    blocks.pop()
+                loops = branch = 1
+                guarded = False
+                for _, loop_multiplier, branch_factor in blocks:
+                    loops *= loop_multiplier
+                    if branch_factor is not None:
+                        branch *= branch_factor
+                        guarded = True
+                statement = (loops, branch, guarded)
+                
+                if LOOP_PATTERN.match(code, indent):
+                    blocks.append((indent, LOOP_ITERATIONS_ESTIMATE, None))
+                elif BRANCH_PATTERN.match(code, indent):
+                    keyword = BRANCH_PATTERN.match(code, indent).group()
+                    factor = 1 / self._match_arms(outline, lines, n, func.end_line, indent) \
+                        if keyword == 'match' else BRANCH_FACTOR
+                    if keyword in ('elif', 'else'):
+                        # Runs only when the earlier branches did not
+                        statement = (loops, branch * BRANCH_FACTOR, True)
+                    header, body = self._split_header(code)
+                    line_weights[n] = (statement[0] * statement[1], statement[2])
+                    note_calls(header, statement[1], statement[2])
+                    note_calls(body, branch * factor, True)
+                    blocks.append((indent, 1, factor))
+                    continue
+            line_weights[n] = (statement[0] * statement[1], statement[2])
+            note_calls(code, statement[1], statement[2])
+        return line_weights, calls
+
+    def _match_arms(self, outline, lines: List[str], header: int, end_line: int, indent: int) -> int:
+        """Number of arms of the match statement whose header is at line index `header`"""
+        arm_indent = None
+        arms = 0
+        for n in range(header + 1, end_line):
+            if outline.line_kinds[n] != LINE_CODE:
+                continue
+            text = lines[n].expandtabs(TAB_WIDTH)
+            column = len(text) - len(text.lstrip())
+            if column <= indent:
+                break
+            if arm_indent is None:
+                arm_indent = column
+            if column == arm_indent:
+                arms += 1
+        return max(1, arms)
+
+    def _split_header(self, code: str):
+        """Split a block header at its colon into (header, inline body)"""
+        depth = 0
+        for pos, char in enumerate(code):
+            if char in '([{':
+                depth += 1
+            elif char in ')]}':
+                depth -= 1
+            elif char == ':' and depth == 0:
+                return code[:pos], code[pos + 1:]
+        return code, ''
+
     def _get_snippet(self, lines, index, current_line):
         start = max(0, index - 1)
         end = min(len(lines), index + 2)
@@ -334,6 +753,15 @@ class PerformanceAnalyzer:
         # Calculate overall project health
         avg_score = sum(f['score'] for f in files) / len(files) if files else 100
         
+        # Per-frame findings, most expensive first
+        hot_loop = sorted(({"path": f['path'], "line": i['line'], "rule": i['rule'],
+                            "severity": i['severity'], "message": i['message'],
+                            "calls_per_second": i['calls_per_second'],
+                            "conditional": i.get('conditional', False),
+                            "cost_us_per_second": i['cost_us_per_second']}
+                           for f in files for i in f['issues'] if 'cost_us_per_second' in i),
+                          key=lambda h: (-h['cost_us_per_second'], h['path'], h['line']))
+        
         return {
             "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "overall_score": int(avg_score),
@@ -341,26 +769,91 @@ class PerformanceAnalyzer:
             "total_lines": self.stats['total_lines'],
             "total_issues": total_issues,
             "issues_breakdown": { "high": high, "medium": medium, "low": low },
+            "physics_ticks": self.physics_ticks,
+            "hot_loop_findings": hot_loop,
             "files": files
         }
 
+def _analyze_source(root_dir: str, physics_ticks: int, path: Path, content: str) -> Dict:
+    """Process-pool worker: analyze one already-read file"""
+    return PerformanceAnalyzer(root_dir, physics_ticks=physics_ticks).analyze_file(path, content)
+
+# Branch-guarded per-frame code the rate estimate must keep reaching:
+# (script, hot-loop rule expected, helper functions expected to run per frame)
+SELF_CHECKS = [
+    ("scripts/components/ai/chase_ai.gd", "distance_to", ("_check_target_validity", "_has_line_of_sight")),
+    ("scripts/enemies/flyer_drone.gd", None, ("_patrol", "_chase_player")),
+]
+
+def self_check(root_dir: str) -> bool:
+    """Check that helpers reached through if/match branches still get a per-frame rate"""
+    analyzer = PerformanceAnalyzer(root_dir)
+    all_ok = True
+    for rel_path, rule, helpers in SELF_CHECKS:
+        path = Path(root_dir) / rel_path
+        if not path.exists():
+            print(f"[WARN] {rel_path} not found, skipped")
+            continue
+        content, _ = analyzer._read_source(path)
+        lines = content.split('\n')
+        outline = parse_source(content, path.stem)
+        rates, _, guarded = analyzer._line_rates(outline, lines)
+        for func in outline.functions():
+            if func.name in helpers:
+                ok = rates[func.body_line - 1] > 0
+                all_ok &= ok
+                print(f"[{'OK' if ok else 'ERROR'}] {rel_path} {func.name}(): "
+                      f"~{rates[func.body_line - 1]:g}/s{' (conditional)' if guarded[func.body_line - 1] else ''}")
+        if rule:
+            found = [i for i in analyzer.analyze_file(path, content)["issues"]
+                     if i["rule"] == rule and "cost_us_per_second" in i]
+            all_ok &= bool(found)
+            print(f"[{'OK' if found else 'ERROR'}] {rel_path}: {len(found)} hot-loop {rule} finding(s)")
+    return all_ok
+
 def main():
+    parser = argparse.ArgumentParser(description='Static performance analysis for GDScript')
+    parser.add_argument('--cache', default=CACHE_FILE,
+                        help=f'Per-file result cache (default: {CACHE_FILE})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Analyze every file from scratch and leave the cache untouched')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Worker processes for analysis (0 = CPU count, default: 1)')
+    parser.add_argument('--self-check', action='store_true',
+                        help='Check that branch-guarded AI helpers still get per-frame rates, then exit')
+    args = parser.parse_args()
+    if args.self_check:
+        raise SystemExit(0 if self_check(PROJECT_ROOT) else 1)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    
     try:
-        analyzer = PerformanceAnalyzer(PROJECT_ROOT)
-        data = analyzer.analyze()
+        cache_file = None if args.no_cache else os.path.join(PROJECT_ROOT, args.cache)
+        analyzer = PerformanceAnalyzer(PROJECT_ROOT, cache_file)
+        data = analyzer.analyze(jobs)
         
         # Inject data into HTML
+        start = time.perf_counter()
         json_data = json.dumps(data)
         html_content = HTML_TEMPLATE.replace("/*DATA_PLACEHOLDER*/", json_data)
         
         with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
             f.write(html_content)
+        analyzer._mark("render", start)
             
         print("\n" + "="*60)
         print(f"Analysis Complete!")
         print(f"Files Scanned: {data['total_files']}")
         print(f"Total Issues: {data['total_issues']}")
+        hot_loop = data['hot_loop_findings']
+        if hot_loop:
+            total_cost = sum(h['cost_us_per_second'] for h in hot_loop)
+            print(f"Hot Loop Findings: {len(hot_loop)} (est. {total_cost / 1000:.2f} ms of work per second)")
+            for h in hot_loop[:5]:
+                print(f"  {h['cost_us_per_second']:>9.1f} us/s  {h['path']}:{h['line']}  [{h['rule']}]"
+                      + ("  (conditional)" if h['conditional'] else ""))
         print(f"Report saved to: {os.path.abspath(OUTPUT_FILE)}")
+        print(f"Wall time ({jobs} job{'s' if jobs != 1 else ''}): "
+              + ", ".join(f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in analyzer.timings.items()))
         print("="*60)
         
     except Exception as e:
@@ -7,6 +7,8 @@ Removes any baked-in checkerboard pattern
 from PIL import Image
 import sys
 
+from transparency_engine import load_rgba, store_rgba, key_checkerboard
+
 def ensure_pure_transparency(input_path, output_path):
     """Ensure the sprite has pure transparency with no baked patterns"""
     
@@ -21,23 +23,15 @@ def ensure_pure_transparency(input_path, output_path):
         img = img.convert('RGBA')
     
     # Get pixel data
-    pixels = img.load()
+    rgba = load_rgba(img)
     width, height = img.size
     
     print(f"  [*] Dimensions: {width}x{height}")
     print(f"  [*] Cleaning transparency...")
     
-    # Process each pixel
-    cleaned_count = 0
-    for y in range(height):
-        for x in range(width):
-            r, g, b, a = pixels[x, y]
-            
-            # If pixel is mostly transparent or is a gray checkerboard color
-            if a < 128 or (abs(r - g) < 10 and abs(g - b) < 10 and abs(b - r) < 10 and r > 100):
-                # Make it fully transparent
-                pixels[x, y] = (0, 0, 0, 0)
-                cleaned_count += 1
+    # Mostly transparent pixels and gray checkerboard colors become fully transparent
+    cleaned_count = key_checkerboard(rgba, alpha_cutoff=128, gray_tolerance=10, min_level=100)
+    store_rgba(img, rgba)
     
     print(f"  [*] Cleaned {cleaned_count} pixels")
     
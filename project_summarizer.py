@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Project Summarizer - Fits a GodotProjectAnalyzer summary into an LLM context budget.
+
+The summary is compacted (minified keys, no whitespace, functions shared by
+most scripts of a category rolled up once per category), entries are ranked
+by importance, and the result is packed into as few chunks as the token
+budget allows. One chunk is sent as-is; several are analyzed map-reduce
+style by analyze_project.py.
+
+Run directly to see how a project would be split:
+    python project_summarizer.py [project_root] [--budget TOKENS]
+"""
+
+import json
+import os
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Rough chars-per-token for minified JSON with code identifiers; Ollama's
+# prompt_eval_count reports the exact figure after each request
+CHARS_PER_TOKEN = 3.5
+
+DEFAULT_BUDGET = 6000
+
+# A function is rolled up into its category when at least this many scripts,
+# and at least half of the category, define it
+SHARED_MIN_SCRIPTS = 3
+
+# Base classes listed per category rollup
+ROLLUP_TOP = 5
+
+# Directories summarized only as a category rollup unless include_vendor is set
+VENDOR_DIRS = ('addons',)
+
+# Minified key -> meaning, sent once per prompt
+LEGEND = {
+    "p": "path", "c": "class_name", "x": "extends", "f": "functions (minus category shared_f)",
+    "s": "signals", "e": "exports", "r": "root node type", "k": "child node names",
+    "t": "attached script", "n": "script count", "sf": "shared_f: functions most scripts in the category define",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def minify(data: Any) -> str:
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+
+def _category(path: str) -> str:
+    parts = Path(path).parts
+    if len(parts) > 1:
+        return parts[1] if parts[0] == 'scripts' else parts[0]
+    return 'root'
+
+
+def _rank(script: Dict, autoload_paths: set) -> tuple:
+    """Lower sorts first: autoloads, named classes, scripts with an API, then the rest"""
+    path = Path(script['path']).as_posix()
+    vendor = Path(path).parts[0] in VENDOR_DIRS
+    if any(path in a for a in autoload_paths):
+        tier = 0
+    elif script.get('class_name'):
+        tier = 1
+    elif script.get('signals') or script.get('exports'):
+        tier = 2
+    else:
+        tier = 3
+    return (vendor, tier, path)
+
+
+class ProjectSummarizer:
+    """Compacts and chunks a GodotProjectAnalyzer.get_summary() result"""
+
+    def __init__(self, summary: Dict[str, Any], budget: int = DEFAULT_BUDGET,
+                 include_vendor: bool = False):
+        self.summary = summary
+        self.budget = budget
+        self.include_vendor = include_vendor
+        self.header, self.items = self._compact()
+
+    def _compact(self):
+        summary = self.summary
+        scripts = summary.get('scripts', [])
+        autoloads = summary.get('autoload_scripts', {})
+        autoload_paths = {v.strip('"*').replace('res://', '') for v in autoloads.values()}
+
+        # Per-category rollup and shared function detection
+        by_category = defaultdict(list)
+        for script in scripts:
+            by_category[_category(script['path'])].append(script)
+
+        categories = {}
+        shared = {}
+        for category, members in sorted(by_category.items()):
+            counts = Counter(f for s in members for f in set(s.get('functions', [])))
+            common = sorted(f for f, n in counts.items()
+                            if n >= SHARED_MIN_SCRIPTS and n * 2 >= len(members))
+            shared[category] = set(common)
+            extends = Counter(s.get('extends') or '-' for s in members)
+            categories[category] = {"n": len(members), "x": dict(extends.most_common(ROLLUP_TOP)), "sf": common}
+
+        header = {
+            "project": str(summary.get('project_name', '')).strip('"'),
+            "godot": summary.get('godot_version'),
+            "scripts": summary.get('total_scripts'),
+            "scenes": summary.get('total_scenes'),
+            "autoloads": {k: v.strip('"*') for k, v in autoloads.items()},
+            "categories": categories,
+            "legend": LEGEND,
+        }
+
+        items = []
+        for script in sorted(scripts, key=lambda s: _rank(s, autoload_paths)):
+            path = Path(script['path']).as_posix()
+            if Path(path).parts[0] in VENDOR_DIRS and not self.include_vendor:
+                continue  # Covered by the category rollup
+            entry = {"p": path}
+            if script.get('class_name'):
+                entry["c"] = script['class_name']
+            if script.get('extends'):
+                entry["x"] = script['extends']
+            own = [f for f in dict.fromkeys(script.get('functions', []))
+                   if f not in shared[_category(script['path'])]]
+            for key, values in (("f", own), ("s", script.get('signals')), ("e", script.get('exports'))):
+                if values:
+                    entry[key] = values
+            items.append(entry)
+
+        for scene in sorted(summary.get('scenes', []), key=lambda s: Path(s['path']).as_posix()):
+            path = Path(scene['path']).as_posix()
+            if Path(path).parts[0] in VENDOR_DIRS and not self.include_vendor:
+                continue
+            entry = {"p": path, "r": scene.get('root_node')}
+            if scene.get('script'):
+                entry["t"] = scene['script'].replace('res://', '')
+            if scene.get('children'):
+                entry["k"] = list(dict.fromkeys(scene['children']))
+            items.append(entry)
+
+        return header, items
+
+    def header_text(self) -> str:
+        return minify(self.header)
+
+    def chunks(self) -> List[str]:
+        """
+        Minified JSON documents, each within the token budget. The header goes
+        with every chunk so each part can be read on its own.
+        """
+        header_tokens = estimate_tokens(self.header_text())
+        room = self.budget - header_tokens
+        if room <= 0:
+            raise ValueError(f"Budget of {self.budget} tokens is smaller than the project header "
+                             f"({header_tokens} tokens)")
+
+        chunks, current, used = [], [], 0
+        for item in self.items:
+            cost = estimate_tokens(minify(item)) + 1
+            if current and used + cost > room:
+                chunks.append(current)
+                current, used = [], 0
+            current.append(item)
+            used += cost
+        if current or not chunks:
+            chunks.append(current)
+
+        total = len(chunks)
+        return [minify(dict(self.header, part=f"{i}/{total}", entries=chunk))
+                for i, chunk in enumerate(chunks, 1)]
+
+    def stats(self) -> Dict[str, int]:
+        original = json.dumps(self.summary, indent=2)
+        chunks = self.chunks()
+        return {
+            "original_chars": len(original),
+            "original_tokens": estimate_tokens(original),
+            "compact_chars": sum(len(c) for c in chunks),
+            "compact_tokens": sum(estimate_tokens(c) for c in chunks),
+            "chunks": len(chunks),
+        }
+
+
+def main():
+    import argparse
+    from godot_ai_connector import GodotProjectAnalyzer
+
+    parser = argparse.ArgumentParser(description="Show how a project summary fits a token budget")
+    parser.add_argument("project_root", nargs="?", default=os.getcwd(), help="Project root directory")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET, help="Tokens per prompt chunk")
+    parser.add_argument("--include-vendor", action="store_true", help="List addon scripts individually")
+    args = parser.parse_args()
+
+    summary = GodotProjectAnalyzer(args.project_root).analyze()
+    summarizer = ProjectSummarizer(summary, args.budget, args.include_vendor)
+    stats = summarizer.stats()
+
+    print("\n" + "=" * 60)
+    print(f"Original summary: {stats['original_chars']:,} chars (~{stats['original_tokens']:,} tokens)")
+    print(f"Compacted:        {stats['compact_chars']:,} chars (~{stats['compact_tokens']:,} tokens) "
+          f"in {stats['chunks']} chunk(s) of <= {args.budget} tokens")
+    for i, chunk in enumerate(summarizer.chunks(), 1):
+        print(f"   chunk {i}: {len(chunk):,} chars (~{estimate_tokens(chunk):,} tokens)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,24 +3,172 @@
 """
 Quick Fix Script - Fixes common Godot import issues
 Run this whenever you see "Not a PNG file" or import errors
+
+By default only stale imports are redone: each asset's md5 is compared with
+the source_md5 Godot recorded in .godot/imported/<name>-<hash>.md5, and the
+outputs listed in its .import file are checked. Only outputs of changed,
+missing or broken imports are deleted, then a headless `godot --import`
+reimports just those (everything else still passes Godot's own md5 check).
+
+Usage:
+    python quick_fix_imports.py [project_root] [--godot PATH] [--dry-run] [--no-reimport]
+    python quick_fix_imports.py --full      # old behaviour: delete all of .godot/imported
 """
 
+import argparse
+import hashlib
+import json
 import os
+import re
 import sys
 import shutil
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
-def fix_godot_imports(project_root):
-    """Fix Godot import issues"""
-    project_root = Path(project_root)
-    
-    print("="*60)
-    print("Godot Import Quick Fix")
-    print("="*60)
-    print(f"\nProject: {project_root}\n")
-    
-    # Step 1: Delete .godot/imported folder
-    imported_folder = project_root / ".godot" / "imported"
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+    sys.stderr.reconfigure(encoding='utf-8')
+
+IMPORTED_DIR = Path(".godot") / "imported"
+SKIP_DIRS = {".godot", ".git"}
+
+# Every Godot 4 CompressedTexture2D (.ctex) file starts with this
+CTEX_MAGIC = b"GST2"
+
+# Importers that write nothing to .godot/imported
+NO_OUTPUT_IMPORTERS = ("keep", "skip")
+
+_KEY_RE = re.compile(r'^(\w+)=(.*)$')
+
+
+def _file_md5(path: Path) -> str:
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _multiple_md5(paths: List[Path]) -> str:
+    """md5 over the concatenated files, like Godot's FileAccess::get_multiple_md5"""
+    digest = hashlib.md5()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_keys(path: Path) -> Dict[str, str]:
+    """Top-level key=value pairs of a .import or .md5 file (values left raw)"""
+    values = {}
+    for line in path.read_text(encoding='utf-8', errors='replace').splitlines():
+        match = _KEY_RE.match(line.strip())
+        if match and match.group(1) not in values:
+            values[match.group(1)] = match.group(2)
+    return values
+
+
+def _unquote(value: Optional[str]) -> str:
+    return value[1:-1] if value and len(value) >= 2 and value[0] == value[-1] == '"' else (value or "")
+
+
+def _res_to_path(project_root: Path, res_path: str) -> Path:
+    return project_root / res_path[len("res://"):]
+
+
+def import_base(source_res_path: str) -> str:
+    """Godot's output base for an asset: res://.godot/imported/<file>-<md5 of its res:// path>"""
+    name = source_res_path.rsplit("/", 1)[-1]
+    return f"res://.godot/imported/{name}-{hashlib.md5(source_res_path.encode('utf-8')).hexdigest()}"
+
+
+def check_import(project_root: Path, import_file: Path) -> Tuple[str, Optional[str]]:
+    """
+    (res:// source path, reason it must be reimported or None if up to date).
+    An orphaned .import (source deleted) reports reason "orphaned".
+    """
+    source = import_file.with_name(import_file.name[:-len(".import")])
+    res_path = "res://" + source.relative_to(project_root).as_posix()
+    if not source.exists():
+        return res_path, "orphaned"
+
+    keys = _read_keys(import_file)
+    if _unquote(keys.get("importer")) in NO_OUTPUT_IMPORTERS:
+        return res_path, None
+    if keys.get("valid") == "false":
+        return res_path, "marked invalid"
+    try:
+        dest_files = json.loads(keys.get("dest_files", "[]"))
+    except ValueError:
+        return res_path, "unreadable dest_files"
+    if not dest_files:
+        return res_path, "no outputs recorded"
+
+    outputs = [_res_to_path(project_root, dest) for dest in dest_files]
+    for output in outputs:
+        if not output.exists():
+            return res_path, "output missing"
+        if output.suffix == ".ctex":
+            with open(output, 'rb') as f:
+                if f.read(len(CTEX_MAGIC)) != CTEX_MAGIC:
+                    return res_path, "invalid .ctex"
+
+    md5_file = _res_to_path(project_root, import_base(res_path) + ".md5")
+    if not md5_file.exists():
+        return res_path, "no .md5 record"
+    recorded = _read_keys(md5_file)
+    if _unquote(recorded.get("source_md5")) != _file_md5(source):
+        return res_path, "source changed"
+    if "dest_md5" in recorded and _unquote(recorded["dest_md5"]) != _multiple_md5(outputs):
+        return res_path, "output changed"
+    return res_path, None
+
+
+def find_import_files(project_root: Path) -> List[Path]:
+    found = []
+    for dirpath, dirnames, filenames in os.walk(project_root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        found.extend(Path(dirpath) / name for name in filenames if name.endswith(".import"))
+    return sorted(found)
+
+
+def _clear_outputs(project_root: Path, import_file: Path, res_path: str) -> int:
+    """Delete an asset's imported outputs and .md5 record so Godot reimports it"""
+    removed = 0
+    keys = _read_keys(import_file)
+    try:
+        targets = [_res_to_path(project_root, d) for d in json.loads(keys.get("dest_files", "[]"))]
+    except ValueError:
+        targets = []
+    targets.append(_res_to_path(project_root, import_base(res_path) + ".md5"))
+    for target in targets:
+        if target.exists():
+            target.unlink()
+            removed += 1
+    return removed
+
+
+def _run_image_fixer(project_root: Path):
+    print("\n[*] Running image fixer...")
+    try:
+        from fix_godot_images import GodotImageFixer
+    except ImportError as e:
+        print(f"   ⚠ Image fixer unavailable ({e}), skipping")
+        return
+    # Quiet: its own report would tell us to run this script
+    summary = GodotImageFixer(str(project_root)).validate_and_fix(quiet=True)
+    mark = "⚠" if summary['invalid'] else "✓"
+    print(f"   {mark} {summary['files']} PNGs checked: {summary['invalid']} invalid, "
+          f"{summary['converted']} converted, {summary['imports_regenerated']} import files regenerated")
+    for record in summary['issues']:
+        for issue in record['issues']:
+            print(f"   - {record['path']}: {issue}")
+
+
+def _clear_import_cache(project_root: Path) -> bool:
+    imported_folder = project_root / IMPORTED_DIR
     if imported_folder.exists():
         print("[*] Deleting .godot/imported folder...")
         try:
@@ -31,25 +179,106 @@ def fix_godot_imports(project_root):
             return False
     else:
         print("[*] .godot/imported folder doesn't exist (already clean)")
-    
-    # Step 2: Run the image fixer
-    print("\n[*] Running image fixer...")
-    fix_script = project_root / "fix_godot_images.py"
-    if fix_script.exists():
-        os.system(f'python "{fix_script}"')
-    else:
-        print("   ⚠ fix_godot_images.py not found, skipping")
-    
+    return True
+
+
+def fix_godot_imports(project_root, full: bool = False, godot: Optional[str] = None,
+                      reimport: bool = True, dry_run: bool = False) -> bool:
+    """Fix Godot import issues"""
+    project_root = Path(project_root)
+
+    print("="*60)
+    print("Godot Import Quick Fix")
+    print("="*60)
+    print(f"\nProject: {project_root}\n")
+
+    if full:
+        if not _clear_import_cache(project_root):
+            return False
+        _run_image_fixer(project_root)
+        print("\n" + "="*60)
+        print("[SUCCESS] Import cache cleared!")
+        print("\n[NEXT STEPS]")
+        print("1. Open Godot")
+        print("2. Let it reimport all assets (may take a moment)")
+        print("3. Check for any remaining errors")
+        print("="*60)
+        return True
+
+    # Fix the images first: a converted PNG must count as changed below
+    if not dry_run:
+        _run_image_fixer(project_root)
+
+    print("\n[*] Comparing assets with their import records...")
+    import_files = find_import_files(project_root)
+    stale = []
+    orphaned = []
+    for import_file in import_files:
+        res_path, reason = check_import(project_root, import_file)
+        if reason == "orphaned":
+            orphaned.append(res_path)
+        elif reason:
+            stale.append((import_file, res_path, reason))
+
+    current = len(import_files) - len(stale) - len(orphaned)
+    print(f"   {len(import_files)} imported assets: {current} up to date, {len(stale)} stale"
+          + (f", {len(orphaned)} orphaned .import files" if orphaned else ""))
+    for _, res_path, reason in stale:
+        print(f"   - {res_path} ({reason})")
+    for res_path in orphaned:
+        print(f"   [WARN] {res_path}.import has no source file")
+
+    if dry_run or not stale:
+        print("\n" + "="*60)
+        print(f"[SUCCESS] Nothing to reimport; {current} reimports avoided" if not stale
+              else f"[DRY RUN] {len(stale)} assets would be reimported, {current} reimports avoided")
+        print("="*60)
+        return True
+
+    removed = sum(_clear_outputs(project_root, import_file, res_path) for import_file, res_path, _ in stale)
+    print(f"\n[*] Removed {removed} stale output files")
+
+    reimported = failed = False
+    if reimport:
+        from godot_ai_assistant import GodotAIAssistant
+        assistant = GodotAIAssistant(str(project_root), godot)
+        if assistant.godot_exe:
+            print(f"\n[*] Reimporting {len(stale)} assets headless...")
+            result = assistant.run_godot_command(["--headless", "--import"])
+            reimported = result.ok
+            failed = not result.ok
+            if failed:
+                print(f"   ✗ Reimport failed: {result.failure}")
+        else:
+            print("\n   ⚠ Godot executable not found (use --godot); the editor will reimport on next open")
+
     print("\n" + "="*60)
-    print("[SUCCESS] Import cache cleared!")
-    print("\n[NEXT STEPS]")
-    print("1. Open Godot")
-    print("2. Let it reimport all assets (may take a moment)")
-    print("3. Check for any remaining errors")
+    if failed:
+        print(f"[FAILED] {len(stale)} assets still need reimport (their stale outputs were removed)")
+    else:
+        print(f"[SUCCESS] {len(stale)} assets {'reimported' if reimported else 'queued for reimport'}, "
+              f"{current} reimports avoided")
+    if not reimported:
+        print("\n[NEXT STEPS]")
+        print("1. Open Godot")
+        print(f"2. Let it reimport the {len(stale)} changed assets")
+        print("3. Check for any remaining errors")
     print("="*60)
-    
-    return True
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fix Godot import issues by reimporting only stale assets")
+    parser.add_argument("project_root", nargs="?", default=os.getcwd(), help="Project root directory")
+    parser.add_argument("--full", action="store_true", help="Delete all of .godot/imported instead")
+    parser.add_argument("--godot", help="Path to Godot executable for the headless reimport")
+    parser.add_argument("--no-reimport", action="store_true", help="Only delete stale outputs")
+    parser.add_argument("--dry-run", action="store_true", help="List stale imports without changing anything")
+    args = parser.parse_args()
+
+    ok = fix_godot_imports(args.project_root, args.full, args.godot, not args.no_reimport, args.dry_run)
+    sys.exit(0 if ok else 1)
+
 
 if __name__ == "__main__":
-    project_root = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
-    fix_godot_imports(project_root)
+    main()
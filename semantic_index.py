@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Semantic Code Index
+Embeds every GDScript function (taken from GodotProjectAnalyzer) through
+Ollama's /api/embed and keeps the vectors in a compact on-disk index: a
+float16 NumPy memmap of L2-normalized rows plus a JSON id table. Top-k
+cosine search is a blockwise dot product over the memmap, so the index never
+has to fit in memory. Rebuilding only embeds functions whose text changed.
+
+analyze_project.py --question uses it to send the model only the code that
+is relevant to a question instead of the whole project.
+
+Usage:
+    python semantic_index.py build [--model nomic-embed-text]
+    python semantic_index.py search "where is gravity applied to the player?" [-k 8]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ollama_client import OllamaClient
+from project_summarizer import VENDOR_DIRS
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+    sys.stderr.reconfigure(encoding='utf-8')
+
+INDEX_DIR = ".semantic_index"
+VECTORS_FILE = "vectors.f16"
+IDS_FILE = "ids.json"
+
+DEFAULT_EMBED_MODEL = "nomic-embed-text"
+
+# Longer functions are split into windows of whole lines, each repeating the
+# signature; ~600 tokens keeps every chunk inside small embedding contexts
+MAX_CHUNK_CHARS = 2000
+
+# Rows scored per matrix product during search
+SEARCH_BLOCK_ROWS = 65536
+
+
+@dataclass
+class CodeChunk:
+    """One embedded span of a script"""
+    id: str                 # res://path.gd::function@line
+    path: str
+    function: str
+    line: int
+    end_line: int
+    text: str
+    sha1: str = ""
+
+    def __post_init__(self):
+        if not self.sha1:
+            self.sha1 = hashlib.sha1(self.embed_text().encode('utf-8')).hexdigest()
+
+    def embed_text(self) -> str:
+        # The path and name carry a lot of the meaning for short functions
+        return f"# {self.path} :: {self.function}\n{self.text}"
+
+
+def chunk_function(entry: Dict[str, Any], max_chars: int = MAX_CHUNK_CHARS) -> List[CodeChunk]:
+    """Split one function_sources() entry into chunks of at most max_chars"""
+    path, name, source = entry['path'], entry['function'], entry['source']
+    if len(source) <= max_chars:
+        return [CodeChunk(f"{path}::{name}@{entry['line']}", path, name,
+                          entry['line'], entry['end_line'], source)]
+
+    lines = source.split('\n')
+    signature = lines[0]
+    chunks = []
+    start = 0
+    while start < len(lines):
+        # The first window holds the signature itself; later ones repeat it as context
+        size = 0 if start == 0 else len(signature) + 1
+        end = start
+        while end < len(lines) and (end == start or size + len(lines[end]) + 1 <= max_chars):
+            size += len(lines[end]) + 1
+            end += 1
+        body = lines[start:end]
+        text = '\n'.join(body if start == 0 else [signature, *body])
+        first = entry['line'] + start
+        chunks.append(CodeChunk(f"{path}::{name}@{first}", path, name, first, first + len(body) - 1, text))
+        start = end
+    return chunks
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class SemanticIndex:
+    """float16 memmap of normalized embeddings plus an id table"""
+
+    def __init__(self, project_root: str, client: Optional[OllamaClient] = None,
+                 model: str = DEFAULT_EMBED_MODEL, index_dir: Optional[str] = None):
+        self.project_root = Path(project_root)
+        self.client = client or OllamaClient()
+        self.model = model
+        self.index_dir = Path(index_dir) if index_dir else self.project_root / INDEX_DIR
+        self.entries: List[Dict[str, Any]] = []
+        self.vectors: Optional[np.memmap] = None
+        self.load()
+
+    # --- Storage ---
+
+    def load(self) -> bool:
+        """Open an existing index built with the same model; returns False if there is none"""
+        ids_path = self.index_dir / IDS_FILE
+        if not ids_path.exists():
+            return False
+        table = json.loads(ids_path.read_text(encoding='utf-8'))
+        if table.get('model') != self.model or not table.get('entries'):
+            return False
+        self.entries = table['entries']
+        self.vectors = np.memmap(self.index_dir / VECTORS_FILE, dtype=np.float16, mode='r',
+                                 shape=(len(self.entries), table['dim']))
+        return True
+
+    def _save(self, entries: List[Dict[str, Any]], matrix: np.ndarray):
+        self.index_dir.mkdir(exist_ok=True)
+        # Write beside the live files and swap, so a failed build leaves the old index usable
+        tmp_vectors = self.index_dir / (VECTORS_FILE + ".tmp")
+        out = np.memmap(tmp_vectors, dtype=np.float16, mode='w+', shape=matrix.shape)
+        out[:] = matrix
+        out.flush()
+        del out
+        self.vectors = None     # Release the old mapping before replacing its file (Windows)
+        tmp_ids = self.index_dir / (IDS_FILE + ".tmp")
+        tmp_ids.write_text(json.dumps({"model": self.model, "dim": matrix.shape[1], "entries": entries},
+                                      separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp_vectors, self.index_dir / VECTORS_FILE)
+        os.replace(tmp_ids, self.index_dir / IDS_FILE)
+        self.load()
+
+    # --- Build ---
+
+    def build(self, functions: List[Dict[str, Any]], include_vendor: bool = False,
+              verbose: bool = True) -> Dict[str, int]:
+        """
+        Index function_sources() entries. Chunks whose text is unchanged reuse
+        their stored vector; only new or edited ones are embedded.
+        """
+        start = time.perf_counter()
+        chunks = []
+        for entry in functions:
+            if not include_vendor and Path(entry['path'][len("res://"):]).parts[0] in VENDOR_DIRS:
+                continue
+            chunks.extend(chunk_function(entry))
+
+        previous = {}
+        if self.vectors is not None:
+            previous = {e['sha1']: row for row, e in enumerate(self.entries)}
+        todo = list({c.sha1: c for c in chunks if c.sha1 not in previous}.values())
+        if verbose:
+            print(f"[*] Semantic index: {len(chunks)} chunks, {len(todo)} to embed with {self.model}")
+
+        fresh = {}
+        if todo:
+            vectors = self.client.embed([c.embed_text() for c in todo], model=self.model)
+            if vectors is None or len(vectors) != len(todo):
+                raise RuntimeError(f"Embedding with {self.model} failed; is the model pulled?")
+            fresh = dict(zip((c.sha1 for c in todo), _normalize(np.asarray(vectors, dtype=np.float32))))
+
+        if not chunks:
+            return {"chunks": 0, "embedded": 0, "reused": 0}
+        dim = len(next(iter(fresh.values()))) if fresh else self.vectors.shape[1]
+        matrix = np.empty((len(chunks), dim), dtype=np.float16)
+        for row, chunk in enumerate(chunks):
+            matrix[row] = fresh[chunk.sha1] if chunk.sha1 in fresh else self.vectors[previous[chunk.sha1]]
+        entries = [{k: v for k, v in asdict(c).items() if k != 'text'} for c in chunks]
+        self._save(entries, matrix)
+
+        if verbose:
+            size = (self.index_dir / VECTORS_FILE).stat().st_size
+            print(f"   [OK] {len(chunks)} x {dim} float16 ({size / 1024:.0f} KB) "
+                  f"in {time.perf_counter() - start:.1f}s")
+        return {"chunks": len(chunks), "embedded": len(todo), "reused": len(chunks) - len(fresh)}
+
+    # --- Search ---
+
+    def search_vector(self, query: np.ndarray, k: int = 8) -> List[Tuple[float, Dict[str, Any]]]:
+        if self.vectors is None or not len(self.entries):
+            return []
+        query = _normalize(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+        best_scores = np.empty(0, dtype=np.float32)
+        best_rows = np.empty(0, dtype=np.int64)
+        for offset in range(0, len(self.entries), SEARCH_BLOCK_ROWS):
+            block = np.asarray(self.vectors[offset:offset + SEARCH_BLOCK_ROWS], dtype=np.float32)
+            scores = block @ query
+            take = min(k, len(scores))
+            top = np.argpartition(-scores, take - 1)[:take]
+            best_scores = np.concatenate([best_scores, scores[top]])
+            best_rows = np.concatenate([best_rows, top + offset])
+        order = np.argsort(-best_scores)[:k]
+        return [(float(best_scores[i]), self.entries[best_rows[i]]) for i in order]
+
+    def search(self, query: str, k: int = 8) -> List[Tuple[float, Dict[str, Any]]]:
+        """Top-k chunks by cosine similarity to a natural-language query"""
+        vectors = self.client.embed([query], model=self.model)
+        if not vectors:
+            raise RuntimeError(f"Embedding the query with {self.model} failed")
+        return self.search_vector(np.asarray(vectors[0]), k)
+
+    def chunk_source(self, entry: Dict[str, Any]) -> str:
+        """Current source lines of an indexed chunk"""
+        path = self.project_root / entry['path'][len("res://"):]
+        lines = path.read_text(encoding='utf-8', errors='replace').splitlines()
+        return '\n'.join(lines[entry['line'] - 1:entry['end_line']])
+
+
+def main():
+    from godot_ai_connector import GodotProjectAnalyzer
+
+    parser = argparse.ArgumentParser(description="Semantic search over the project's GDScript functions")
+    parser.add_argument("command", choices=("build", "search"))
+    parser.add_argument("query", nargs="?", help="Search text")
+    parser.add_argument("--root", default=os.getcwd(), help="Project root")
+    parser.add_argument("--model", default=DEFAULT_EMBED_MODEL,
+                        help=f"Ollama embedding model (default: {DEFAULT_EMBED_MODEL})")
+    parser.add_argument("--url", default="http://localhost:11434", help="Ollama API URL")
+    parser.add_argument("-k", type=int, default=8, help="Results to show")
+    parser.add_argument("--include-vendor", action="store_true", help="Index addons/ too")
+    args = parser.parse_args()
+
+    index = SemanticIndex(args.root, OllamaClient(args.url), args.model)
+    try:
+        if args.command == "build" or index.vectors is None:
+            functions = GodotProjectAnalyzer(args.root).function_sources()
+            index.build(functions, include_vendor=args.include_vendor)
+        if args.command == "search":
+            if not args.query:
+                parser.error("search needs a query")
+            start = time.perf_counter()
+            results = index.search(args.query, args.k)
+            print(f"\nTop {len(results)} for: {args.query} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+            for score, entry in results:
+                print(f"   {score:.3f}  {entry['path']}:{entry['line']}  {entry['function']}")
+    except RuntimeError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
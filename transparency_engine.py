@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Transparency Engine - Shared NumPy keying rules for the cleanup scripts
+Replaces per-pixel `pixels[x, y]` loops with whole-array mask operations.
+Every rule reproduces the original loop output byte for byte.
+
+Run directly to benchmark against the original loops:
+    python transparency_engine.py [image.png]
+"""
+
+from functools import lru_cache
+from pathlib import Path
+import sys
+import time
+
+from PIL import Image
+import numpy as np
+
+
+def load_rgba(image: Image.Image) -> np.ndarray:
+    """Return a writable (H, W, 4) uint8 copy of an RGBA image"""
+    return np.array(image.convert('RGBA'), dtype=np.uint8)
+
+
+def store_rgba(image: Image.Image, rgba: np.ndarray):
+    """
+    Write an (H, W, 4) array back into an existing RGBA image in place.
+    Keeping the original Image object preserves its info (ICC profile etc.)
+    so the saved PNG matches what the loop version produced.
+    """
+    image.frombytes(np.ascontiguousarray(rgba, dtype=np.uint8).tobytes())
+
+
+def _channels(rgba: np.ndarray):
+    """Split into signed int32 R, G, B, A planes so differences can't wrap"""
+    planes = rgba.astype(np.int32)
+    return planes[..., 0], planes[..., 1], planes[..., 2], planes[..., 3]
+
+
+def _is_grayish(r, g, b, tolerance: int) -> np.ndarray:
+    """All pairwise channel differences below tolerance"""
+    return ((np.abs(r - g) < tolerance)
+            & (np.abs(g - b) < tolerance)
+            & (np.abs(r - b) < tolerance))
+
+
+def corner_background(rgba: np.ndarray) -> tuple:
+    """Average the four corner pixels (integer division, as the scripts do)"""
+    corners = rgba[[0, 0, -1, -1], [0, -1, 0, -1], :3].astype(np.int32)
+    return tuple(int(c) for c in corners.sum(axis=0) // 4)
+
+
+@lru_cache(maxsize=8)
+def _ramp_lut(threshold: int) -> np.ndarray:
+    """
+    Alpha for each squared distance in the partial band, evaluated with the
+    exact expression the loop used so float rounding can never differ.
+    """
+    band = range(threshold * threshold, (threshold * 2) ** 2)
+    return np.array([int(((d2 ** 0.5) / (threshold * 2)) * 255) for d2 in band],
+                    dtype=np.uint8)
+
+
+def key_by_distance(rgba: np.ndarray, bg_color: tuple, threshold: int = 50) -> int:
+    """
+    Corner-average distance key (make_transparent_smart rule), in place.
+
+    distance < threshold      -> alpha 0
+    distance < threshold * 2  -> alpha ramps with distance
+    otherwise                 -> alpha 255
+    RGB is left untouched. Returns the number of fully transparent pixels.
+    """
+    threshold = int(threshold)
+    r, g, b, _ = _channels(rgba)
+    d2 = (r - bg_color[0]) ** 2 + (g - bg_color[1]) ** 2 + (b - bg_color[2]) ** 2
+
+    inner = d2 < threshold * threshold
+    band = ~inner & (d2 < (threshold * 2) ** 2)
+
+    alpha = np.full(d2.shape, 255, dtype=np.uint8)
+    alpha[inner] = 0
+    alpha[band] = _ramp_lut(threshold)[d2[band] - threshold * threshold]
+    rgba[..., 3] = alpha
+    return int(np.count_nonzero(inner))
+
+
+def key_black(rgba: np.ndarray, threshold: int = 30) -> int:
+    """
+    Near-black key (convert_black_to_transparent rule), in place.
+    Pixels with every channel below threshold become (0, 0, 0, 0);
+    everything else is forced opaque. Returns the transparent count.
+    """
+    mask = np.all(rgba[..., :3] < threshold, axis=2)
+    rgba[..., 3] = 255
+    rgba[mask] = 0
+    return int(np.count_nonzero(mask))
+
+
+def key_dark_or_gray(rgba: np.ndarray, min_brightness: int = 80,
+                     gray_tolerance: int = 30) -> int:
+    """
+    Brightness/grayness key (fix_gravity_core rule), in place.
+    Dark pixels (mean below min_brightness) and desaturated pixels become
+    (0, 0, 0, 0); colored pixels are forced opaque. Returns the transparent count.
+    """
+    r, g, b, _ = _channels(rgba)
+    # (r + g + b) / 3 < n  is exactly  r + g + b < 3n  for integer channels
+    mask = ((r + g + b) < min_brightness * 3) | _is_grayish(r, g, b, gray_tolerance)
+    rgba[..., 3] = 255
+    rgba[mask] = 0
+    return int(np.count_nonzero(mask))
+
+
+def key_checkerboard(rgba: np.ndarray, alpha_cutoff: int = 128,
+                     gray_tolerance: int = 10, min_level: int = 100) -> int:
+    """
+    Baked checkerboard removal (process_orb_transparency rule), in place.
+    Mostly transparent pixels and light-gray checker squares become
+    (0, 0, 0, 0); all other pixels keep their original alpha.
+    Returns the number of cleaned pixels.
+    """
+    r, g, b, a = _channels(rgba)
+    mask = (a < alpha_cutoff) | (_is_grayish(r, g, b, gray_tolerance) & (r > min_level))
+    rgba[mask] = 0
+    return int(np.count_nonzero(mask))
+
+
+# ---------------------------------------------------------------------------
+# Benchmark: original per-pixel loops vs. the vectorized rules
+# ---------------------------------------------------------------------------
+
+def _loop_distance(img, threshold=50):
+    pixels = img.load()
+    width, height = img.size
+    corners = [pixels[0, 0][:3], pixels[width-1, 0][:3],
+               pixels[0, height-1][:3], pixels[width-1, height-1][:3]]
+    bg = tuple(sum(c[i] for c in corners) // 4 for i in range(3))
+    for y in range(height):
+        for x in range(width):
+            r, g, b, a = pixels[x, y]
+            diff = ((r - bg[0])**2 + (g - bg[1])**2 + (b - bg[2])**2) ** 0.5
+            if diff < threshold:
+                pixels[x, y] = (r, g, b, 0)
+            elif diff < threshold * 2:
+                pixels[x, y] = (r, g, b, int((diff / (threshold * 2)) * 255))
+            else:
+                pixels[x, y] = (r, g, b, 255)
+
+
+def _loop_black(img, threshold=30):
+    pixels = img.load()
+    width, height = img.size
+    for y in range(height):
+        for x in range(width):
+            r, g, b, a = pixels[x, y]
+            if r < threshold and g < threshold and b < threshold:
+                pixels[x, y] = (0, 0, 0, 0)
+            else:
+                pixels[x, y] = (r, g, b, 255)
+
+
+def _loop_dark_or_gray(img):
+    pixels = img.load()
+    width, height = img.size
+    for y in range(height):
+        for x in range(width):
+            r, g, b, a = pixels[x, y]
+            if (r + g + b) / 3 < 80:
+                pixels[x, y] = (0, 0, 0, 0)
+            elif abs(r - g) < 30 and abs(g - b) < 30 and abs(r - b) < 30:
+                pixels[x, y] = (0, 0, 0, 0)
+            else:
+                pixels[x, y] = (r, g, b, 255)
+
+
+def _loop_checkerboard(img):
+    pixels = img.load()
+    width, height = img.size
+    for y in range(height):
+        for x in range(width):
+            r, g, b, a = pixels[x, y]
+            if a < 128 or (abs(r - g) < 10 and abs(g - b) < 10 and abs(b - r) < 10 and r > 100):
+                pixels[x, y] = (0, 0, 0, 0)
+
+
+def benchmark(image_path: str = None, size: tuple = (1024, 1024)):
+    """Time every rule both ways and verify the outputs are identical"""
+    if image_path:
+        source = Image.open(image_path).convert('RGBA')
+        label = Path(image_path).name
+    else:
+        # Same dimensions as cosmo_spritesheet.png, full-range noise so every
+        # branch of every rule is exercised
+        rng = np.random.default_rng(1234)
+        noise = rng.integers(0, 256, (size[1], size[0], 4), dtype=np.uint8)
+        source = Image.fromarray(noise, 'RGBA')
+        label = f"random {size[0]}x{size[1]}"
+
+    rules = [
+        ('distance key', _loop_distance,
+         lambda a: key_by_distance(a, corner_background(a), 50)),
+        ('black key', _loop_black, lambda a: key_black(a, 30)),
+        ('dark/gray key', _loop_dark_or_gray, key_dark_or_gray),
+        ('checkerboard', _loop_checkerboard, key_checkerboard),
+    ]
+
+    print("=" * 60)
+    print(f"Transparency Engine Benchmark - {label}")
+    print("=" * 60)
+
+    all_match = True
+    for name, loop_fn, vector_fn in rules:
+        loop_img = source.copy()
+        start = time.perf_counter()
+        loop_fn(loop_img)
+        loop_time = time.perf_counter() - start
+
+        vector_img = source.copy()
+        start = time.perf_counter()
+        rgba = load_rgba(vector_img)
+        vector_fn(rgba)
+        store_rgba(vector_img, rgba)
+        vector_time = time.perf_counter() - start
+
+        match = loop_img.tobytes() == vector_img.tobytes()
+        all_match &= match
+        print(f"  {name:<14} loop {loop_time * 1000:9.1f} ms  "
+              f"numpy {vector_time * 1000:7.1f} ms  "
+              f"x{loop_time / max(vector_time, 1e-9):6.0f}  "
+              f"{'[OK] identical' if match else '[FAIL] mismatch'}")
+
+    print("=" * 60)
+    return all_match
+
+
+if __name__ == "__main__":
+    ok = benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
+    sys.exit(0 if ok else 1)